@@ -0,0 +1,127 @@
+"""Benchmarks the import time of p2obt's modules against a budget.
+
+Each module is imported in a fresh interpreter (the interpreter's own
+startup is not included) and the fastest of several repeats is compared
+to the module's budget. Additionally, the heavy dependencies a module
+must not import are checked. The exit code is 1 if any budget is
+exceeded.
+
+Usage
+-----
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --repeats 10 --details 15
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+ROOT_DIR = Path(__file__).parents[1]
+HEAVY_MODULES = ["astropy", "astroquery", "pandas", "p2api", "keyring", "pkg_resources"]
+
+# NOTE: The budgets (in seconds) and the heavy modules not to be imported
+BUDGETS = {"p2obt": (0.1, HEAVY_MODULES + ["numpy"]),
+           "p2obt.backend.parse": (0.1, HEAVY_MODULES + ["numpy"]),
+           "p2obt.backend.compose": (0.2, HEAVY_MODULES)}
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start
+print(json.dumps([duration, sorted(name for name in sys.modules
+                                   if name.split(".")[0] in {heavy_modules})]))
+"""
+
+
+def get_environment() -> Dict[str, str]:
+    """Gets the environment in which the working tree's p2obt is imported."""
+    environment = os.environ.copy()
+    environment["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(ROOT_DIR), environment.get("PYTHONPATH")]))
+    return environment
+
+
+def measure_import(module: str, heavy_modules: List[str]) -> Tuple[float, List[str]]:
+    """Imports a module in a fresh interpreter.
+
+    Parameters
+    ----------
+    module : str
+    heavy_modules : list of str
+        The modules whose import is checked.
+
+    Returns
+    -------
+    duration : float
+        The import's duration (in seconds).
+    imported : list of str
+        The heavy modules (and their submodules) that were imported.
+    """
+    script = SCRIPT.format(module=module, heavy_modules=set(heavy_modules))
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True,
+                            text=True, check=True, env=get_environment()).stdout
+    duration, imported = json.loads(output.splitlines()[-1])
+    return duration, imported
+
+
+def get_import_times(statement: str) -> Dict[str, float]:
+    """Gets the cumulative import times (in seconds) of all modules
+    imported by a statement (see `python -X importtime`)."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            capture_output=True, text=True, check=True,
+                            env=get_environment()).stderr
+    import_times = {}
+    for line in stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        import_times[name.strip()] = int(cumulative)/1e6
+    return import_times
+
+
+def print_details(module: str, number: int) -> None:
+    """Prints the slowest (cumulative) imports of a module, excluding
+    the ones of the interpreter's startup."""
+    startup = get_import_times("pass")
+    imports = [(cumulative, name) for name, cumulative
+               in get_import_times(f"import {module}").items() if name not in startup]
+    for cumulative, name in sorted(imports, reverse=True)[:number]:
+        print(f"    {cumulative:8.4f} s  {name}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="The number of fresh imports per module.")
+    parser.add_argument("--details", type=int, default=0,
+                        help="The number of slowest imports shown per module.")
+    args = parser.parse_args(argv)
+
+    failed = False
+    print(f"{'module':<24} {'seconds':>9} {'budget':>8}  status")
+    for module, (budget, heavy_modules) in BUDGETS.items():
+        measurements = [measure_import(module, heavy_modules)
+                        for _ in range(max(args.repeats, 1))]
+        duration = min(duration for duration, _ in measurements)
+        imported = sorted({name.split(".")[0] for _, names in measurements
+                           for name in names})
+        statuses = []
+        if duration > budget:
+            statuses.append("over budget")
+        if imported:
+            statuses.append(f"imports {', '.join(imported)}")
+        status = "; ".join(statuses) or "ok"
+        failed |= bool(statuses)
+        print(f"{module:<24} {duration:9.4f} {budget:8.2f}  {status}")
+        if args.details:
+            print_details(module, args.details)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
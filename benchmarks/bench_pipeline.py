@@ -0,0 +1,283 @@
+"""Benchmarks the night plan to OB throughput of p2obt.
+
+The parse, query, compose, (.obx)-write and upload stages are timed
+separately for synthetic night plans. The upload stage runs the pipeline
+(see :func:`run_pipeline <p2obt.backend.pipeline.run_pipeline>`) for the
+already resolved targets without writing the (.obx)-files. The catalogs are replaced by their
+stand-ins (see `OPTIONS.catalogs.mock`) and p2 by the
+:class:`MockApiConnection <p2obt.backend.mock.MockApiConnection>`, so
+the benchmark runs offline.
+
+Usage
+-----
+    python benchmarks/bench_pipeline.py --sizes 10 100 1000
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/<file>.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from p2obt.automate import get_blocks_from_dict
+from p2obt.backend import OPTIONS
+from p2obt.backend.compose import FORMATTED_COORDINATES, format_coordinates, write_obs
+from p2obt.backend.parse import stream_night_plan
+from p2obt.backend.pipeline import compose_block, resolve_targets, run_pipeline
+from p2obt.backend.query import LOCAL_CATALOGS
+from p2obt.backend.upload import login
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+STAGES = ["parse", "query", "compose", "write", "upload", "pipeline"]
+BLOCKS_PER_NIGHT = 8
+LINE_SUFFIX = "11 33 05.57 -54 19 28.5 7.1 5.2 3.3 1.5"
+
+
+def get_commit() -> str:
+    """Gets the current git commit (or "unknown")."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True,
+                              cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def get_group_sizes(number_of_obs: int) -> List[int]:
+    """Gets the sizes of the CAL-SCI-CAL (3) and SCI-CAL (2) groups
+    that add up to the number of OBs."""
+    if number_of_obs < 2:
+        raise ValueError("A night plan needs at least two OBs!")
+    triplets, remainder = divmod(number_of_obs, 3)
+    if remainder == 1:
+        return [3]*(triplets-1) + [2, 2]
+    return [3]*triplets + [2]*(remainder // 2)
+
+
+def make_night_plan(number_of_obs: int, night_plan: Path) -> None:
+    """Writes a synthetic night plan in the format of the
+    `calibrator_find`-tool.
+
+    Calibrators are shared between groups, so the plan contains
+    repeated targets like a real one.
+
+    Parameters
+    ----------
+    number_of_obs : int
+        The number of OBs (science targets and calibrators) in the plan.
+    night_plan : path
+        The file to write the night plan to.
+    """
+    group_sizes = get_group_sizes(number_of_obs)
+    number_of_calibrators = max(len(group_sizes) // 2, 1)
+    lines = ["run 1, 110.2474.004, UTs, MATISSE, LR\n"]
+    for index, group_size in enumerate(group_sizes):
+        if index % BLOCKS_PER_NIGHT == 0:
+            night = index // BLOCKS_PER_NIGHT + 1
+            lines.append(f"night {night} - {night % 28 + 1} Mar\n\n")
+
+        calibrator = f"HD {200000 + index % number_of_calibrators}"
+        group = [f"HD {100000 + index}",
+                 f"cal_LN_{calibrator}"]
+        if group_size == 3:
+            group.insert(0, f"cal_L_HD {300000 + index % number_of_calibrators}")
+        lines.extend(f"{line_index} {name} {LINE_SUFFIX}\n"
+                     for line_index, name in enumerate(group, start=1))
+        lines.append("\n")
+
+    with open(night_plan, "w", encoding="utf-8") as night_plan_file:
+        night_plan_file.writelines(lines)
+
+
+def measure(function: Callable, *args: Any,
+            memory: Optional[bool] = True) -> Tuple[Any, float, Optional[int]]:
+    """Measures the duration and peak memory of a function call.
+
+    The function's output to the console is suppressed.
+
+    Parameters
+    ----------
+    function : callable
+    *args : any
+        The function's arguments.
+    memory : bool, optional
+        If 'True' the peak memory is traced.
+
+    Returns
+    -------
+    result : any
+        The function's return value.
+    duration : float
+        The duration (in seconds).
+    peak_memory : int, optional
+        The peak memory allocated during the call (in bytes).
+    """
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function(*args)
+        duration = time.perf_counter() - start
+        peak_memory = tracemalloc.get_traced_memory()[1] if memory else None
+    finally:
+        if memory:
+            tracemalloc.stop()
+    return result, duration, peak_memory
+
+
+def run_benchmark(number_of_obs: int, directory: Path,
+                  memory: Optional[bool] = True) -> Dict[str, Dict]:
+    """Runs the benchmark for a synthetic night plan.
+
+    Parameters
+    ----------
+    number_of_obs : int
+        The number of OBs in the night plan.
+    directory : path
+        The directory for the night plan and the (.obx)-files.
+    memory : bool, optional
+        If 'True' the peak memory of each stage is traced.
+
+    Returns
+    -------
+    stages : dict of dict
+        The duration, throughput and peak memory of each stage.
+    """
+    night_plan = directory / f"night_plan_{number_of_obs}.txt"
+    make_night_plan(number_of_obs, night_plan)
+    LOCAL_CATALOGS.clear()
+
+    connection = login(server="mock")
+    run_id = connection.getRuns()[0][0]["containerId"]
+
+    def parse():
+        with open(night_plan, "r", encoding="utf-8") as night_plan_file:
+            return list(get_blocks_from_dict(stream_night_plan(night_plan_file),
+                                             "st", "vm", None, run_id, connection))
+
+    def compose(blocks, targets):
+        FORMATTED_COORDINATES.clear()
+        format_coordinates(targets.values())
+        return [compose_block(block, targets) for block in blocks]
+
+    def write(blocks, composed_blocks):
+        output_dir = directory / f"obx_{number_of_obs}"
+        write_obs([(ob, ob_name, output_dir / str(index))
+                   for index, obs in enumerate(composed_blocks)
+                   for ob, ob_name in obs])
+
+    def upload(blocks, targets):
+        FORMATTED_COORDINATES.clear()
+        return run_pipeline(blocks, connection, targets)
+
+    def pipeline(blocks, targets):
+        FORMATTED_COORDINATES.clear()
+        output_dir = directory / f"pipeline_{number_of_obs}"
+        return run_pipeline([block._replace(output_dir=output_dir / str(index))
+                             for index, block in enumerate(blocks)],
+                            connection, targets)
+
+    stages = {}
+    blocks, *stages["parse"] = measure(parse, memory=memory)
+    targets, *stages["query"] = measure(resolve_targets, blocks, memory=memory)
+    composed_blocks, *stages["compose"] = measure(compose, blocks, targets, memory=memory)
+    _, *stages["write"] = measure(write, blocks, composed_blocks, memory=memory)
+    _, *stages["upload"] = measure(upload, blocks, targets, memory=memory)
+    _, *stages["pipeline"] = measure(pipeline, blocks, targets, memory=memory)
+
+    number_of_obs = sum(len(obs) for obs in composed_blocks)
+    return {stage: {"seconds": duration,
+                    "obs_per_second": number_of_obs/duration if duration else None,
+                    "peak_memory": peak_memory}
+            for stage, (duration, peak_memory) in stages.items()}
+
+
+def print_results(results: Dict, reference: Optional[Dict] = None) -> None:
+    """Prints the benchmark's results and, if given, the speed-up
+    relative to a reference result."""
+    header = f"{'OBs':>6} {'stage':<9} {'seconds':>9} {'OBs/s':>10} {'peak MiB':>9}"
+    if reference is not None:
+        header += f" {'speed-up':>9}"
+    print(header)
+    print(f"{'':-^{len(header)}}")
+    for size, stages in results["sizes"].items():
+        for stage in STAGES:
+            result = stages[stage]
+            peak_memory = result["peak_memory"]
+            peak_memory = f"{peak_memory/1024**2:9.2f}" if peak_memory is not None else f"{'-':>9}"
+            line = (f"{size:>6} {stage:<9} {result['seconds']:9.4f}"
+                    f" {result['obs_per_second'] or 0:10.1f} {peak_memory}")
+            if reference is not None:
+                try:
+                    speedup = reference["sizes"][size][stage]["seconds"]/result["seconds"]
+                    line += f" {speedup:8.2f}x"
+                except (KeyError, ZeroDivisionError):
+                    line += f" {'-':>9}"
+            print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000],
+                        help="The number of OBs of the synthetic night plans.")
+    parser.add_argument("--catalog-latency", type=float, default=0.,
+                        help="The latency of each catalog query (in seconds).")
+    parser.add_argument("--p2-latency", type=float, default=0.,
+                        help="The latency of each p2 call (in seconds).")
+    parser.add_argument("--fixtures", type=Path, default=None,
+                        help="A directory of recorded catalog responses.")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Do not trace the peak memory (faster timings).")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="The file the results are saved to. By default"
+                        " 'benchmarks/results/<date>_<commit>.json'.")
+    parser.add_argument("--compare", type=Path, default=None,
+                        help="A previous results file to compare against.")
+    args = parser.parse_args(argv)
+
+    OPTIONS.catalogs.mock.active = True
+    OPTIONS.catalogs.mock.path = args.fixtures
+    OPTIONS.catalogs.mock.latency = args.catalog_latency
+    OPTIONS.upload.mock.latency = args.p2_latency
+    OPTIONS.catalogs.cache.active = False
+
+    commit = get_commit()
+    results = {"commit": commit, "date": datetime.now().isoformat(timespec="seconds"),
+               "python": platform.python_version(), "platform": platform.platform(),
+               "catalog_latency": args.catalog_latency, "p2_latency": args.p2_latency,
+               "sizes": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            print(f"Benchmarking a night plan of {size} OBs...", file=sys.stderr)
+            results["sizes"][str(size)] = run_benchmark(
+                    size, Path(directory), not args.no_memory)
+
+    reference = None
+    if args.compare is not None:
+        with open(args.compare, "r", encoding="utf-8") as reference_file:
+            reference = json.load(reference_file)
+        print(f"Compared to commit {reference['commit']} ({reference['date']})")
+    print_results(results, reference)
+
+    output = args.output
+    if output is None:
+        date = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{date}_{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"Results saved to '{output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ the `query`-function of p2obt to get information on a target.
 # %%
 from pprint import pprint
 
-from p2obt import OPTIONS, query
+from p2obt import OPTIONS, query, query_many
 
 
 # %%
@@ -76,3 +76,14 @@ target = query("YLW 16A")
 print("Query of target present in local 'ciao' catalog:")
 print(f"{'':-^50}")
 pprint(target)
+
+# %%
+# Querying multiple targets
+# ------------------------
+# Multiple targets can be resolved at once, which queries each catalog
+# only once for all of the targets
+OPTIONS.catalogs.local.active = "standard"
+targets = query_many(["HD 142666", "Beta Leo", "HD 100453"])
+print("Query of multiple targets:")
+print(f"{'':-^50}")
+pprint(targets)
@@ -1,7 +1,25 @@
-from .automate import create_ob, create_obs
+from importlib import import_module
 
 # TODO: Fix this import so all the subpackages can be directly imported
-from .backend import *
+from .backend import OPTIONS
 
 
 __version__ = "3.0.0"
+
+# NOTE: These are imported on first access, as their modules import heavy
+# dependencies (e.g., astropy, astroquery or p2api)
+LAZY_ATTRIBUTES = {"create_ob": ".automate", "create_obs": ".automate",
+                   "query": ".backend.query", "query_many": ".backend.query"}
+__all__ = ["OPTIONS", *LAZY_ATTRIBUTES]
+
+
+def __getattr__(name: str):
+    if name not in LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *LAZY_ATTRIBUTES])
@@ -1,17 +1,24 @@
 import logging
+from itertools import chain
 from pathlib import Path
-from typing import Union, Optional, Any, Dict, List, Tuple
+from typing import Union, Optional, Any, Dict, Iterable, Iterator, List, Tuple
 from warnings import warn
 
 import numpy as np
 import p2api
 
 from .backend import OPTIONS
+from .backend.bundle import Bundle, get_output_format
 from .backend.compose import set_ob_name, write_ob, compose_ob
-from .backend.parse import parse_array_config, parse_operational_mode,\
-    parse_run_resolution, parse_run_prog_id, parse_night_name, parse_night_plan
-from .backend.upload import login, get_remote_run,\
-    create_remote_container, upload_ob
+from .backend.instrumentation import dump_measurements, print_measurements
+from .backend.journal import Journal
+from .backend.logger import get_log_file, setup_logging
+from .backend.parse import NightPlanEvent, RunSettings, classify_runs,\
+    get_night_plan_events, get_run_names, parse_array_config,\
+    parse_night_name, stream_night_plan
+from .backend.pipeline import ObBlock, ObSpecification, run_pipeline
+from .backend.upload import login, get_remote_run, upload_ob,\
+    print_upload_summary
 
 
 # TODO: Make this shorter? Or into an option even?
@@ -36,14 +43,8 @@ def copy_list_and_replace_values(input_list: List[Any], value: Any) -> List:
     output_list : list
         The input_list with all its values replaced by the given value.
     """
-    output_list = input_list.copy()
-    for index, element in enumerate(input_list):
-        if isinstance(element, list):
-            for sub_index, _ in enumerate(element):
-                output_list[index][sub_index] = value
-        else:
-            output_list[index] = value
-    return output_list
+    return [[value]*len(element) if isinstance(element, list) else value
+            for element in input_list]
 
 
 def read_dict_to_lists(night: Dict) -> Tuple[List[Any]]:
@@ -112,7 +113,7 @@ def create_ob(target: str,
               remove_password: Optional[bool] = False,
               user_name: Optional[str] = None,
               server: Optional[str] = "production",
-              output_dir: Optional[Path] = None) -> None:
+              output_dir: Optional[Path] = None) -> Optional[Dict]:
     """Creates a singular OB either locally or on P2.
 
     Parameters
@@ -134,7 +135,13 @@ def create_ob(target: str,
     user_name : str, optional
     server : str, optional
     output_dir : path, optional
+
+    Returns
+    -------
+    ob : dict, optional
+        The composed OB. If the OB could not be created return "None".
     """
+    setup_logging()
     try:
         if container_id is not None:
             if connection is None:
@@ -153,11 +160,13 @@ def create_ob(target: str,
             ob_name = set_ob_name(target, observational_type, sci_name, tag)
             write_ob(ob, ob_name, output_dir)
     except KeyError:
-        print(f"[ERROR]: Failed creating OB '{target}'! See 'p2obt.log'.")
+        print(f"[ERROR]: Failed creating OB '{target}'! See '{get_log_file()}'.")
         logging.error("[ERROR]: Failed creating OB '{target}'!", exc_info=True)
+        return None
+    return ob
 
 
-def create_obs_from_lists(targets: List[str],
+def get_blocks_from_lists(targets: List[str],
                           calibrators: Union[List[str], List[List[str]]],
                           orders: Union[List[str], List[List[str]]],
                           tags: Union[List[str], List[List[str]]],
@@ -165,10 +174,12 @@ def create_obs_from_lists(targets: List[str],
                           observational_type: str,
                           array_configuration: str,
                           resolution: Dict,
-                          connection: p2api,
-                          container_id: int,
-                          output_dir: Path) -> None:
-    """
+                          container_id: Optional[int] = None,
+                          output_dir: Optional[Path] = None,
+                          containers: Optional[Tuple[Tuple[str, str], ...]] = ()
+                          ) -> Iterator[ObBlock]:
+    """Gets the blocks of OBs (a science target and its calibrators)
+    from the four lists (targets, calibrators, orders and tags).
 
     Parameters
     ----------
@@ -185,19 +196,21 @@ def create_obs_from_lists(targets: List[str],
         Mode (SM). Default is "vm".
     array_configuration : str
     resolution: dict, optional
-        The default spectral resolutions for the obs in L-band. This is
-        a dictionary containing as keys the individual science targets
-        (the calibrators will be matched) and as values the resolution
-        of the specific target. The values have to be either "low", "med"
-        or "high". Default resolution is "low" and can be set via
-        options["resolution"].
-    connection : p2api
-        The P2 python api.
-    container_id : int
-        The id that specifies the ob on p2.
-    output_dir : path
+        The default spectral resolutions for the obs in L-band (see
+        :func:`create_obs_from_lists`).
+    container_id : int, optional
+        The id that specifies the container on p2 in which the
+        blocks' containers are created.
+    output_dir : path, optional
         The output directory, where the (.obx)-files will be created in.
         If left at "None" no files will be created.
+    containers : tuple of tuple, optional
+        The containers (their names and observational modes) that
+        precede the blocks' containers below the container id.
+
+    Yields
+    ------
+    block : ObBlock
     """
     if observational_type == "sm":
         OPTIONS.resolution.overwrite = True
@@ -214,55 +227,270 @@ def create_obs_from_lists(targets: List[str],
         if not orders:
             orders = copy_list_and_replace_values(calibrators, "a")
 
-        if output_dir is not None:
-            mode_out_dir = output_dir / mode
-            if not mode_out_dir.exists():
-                mode_out_dir.mkdir(parents=True, exist_ok=True)
-        else:
-            mode_out_dir = output_dir
-
-        if observational_type == "vm" and container_id is not None:
-            mode_id = create_remote_container(
-                    connection, mode, container_id, observational_type)
-        else:
-            mode_id = None
+        mode_out_dir = output_dir / mode if output_dir is not None else None
+        mode_containers = containers
+        if observational_type == "vm":
+            mode_containers += ((mode, observational_type),)
 
         for target, calibrator, order, tag \
                 in zip(targets, calibrators, orders, tags):
-            if mode_out_dir is not None:
-                target_dir = mode_out_dir / target
-                if not target_dir.exists():
-                    target_dir.mkdir(parents=True, exist_ok=True)
-            else:
-                target_dir = mode_out_dir
+            target_dir = mode_out_dir / target if mode_out_dir is not None else None
 
-            if container_id is not None:
-                if mode_id is not None:
-                    target_id = create_remote_container(
-                            connection, target, mode_id, observational_type)
-                else:
-                    target_id = create_remote_container(
-                            connection, target, container_id, observational_type)
-            else:
-                target_id = None
-
-            if observational_type == "sm":
-                res = OPTIONS.resolution.active
-            else:
+            res = OPTIONS.resolution.active
+            if observational_type != "sm":
                 if resolution is not None and target in resolution:
                     res = resolution[target]
 
+            obs = []
             unwrapped_lists = unwrap_lists(target, calibrator, order, tag)
             for (name, sci_cal_flag, tag) in unwrapped_lists:
                 sci_name = target if sci_cal_flag == "cal" else None
                 if not name:
                     continue
-                create_ob(name, sci_cal_flag, array_configuration,
-                          mode, sci_name, tag, res,
-                          connection, target_id, output_dir=target_dir)
+                obs.append(ObSpecification(name, sci_cal_flag, sci_name, tag))
+
+            yield ObBlock(obs, array_configuration, mode, res, container_id,
+                          mode_containers + ((target, observational_type),),
+                          target_dir)
+
+
+def create_obs_from_blocks(blocks: Iterable[ObBlock],
+                           connection: Optional[p2api.p2api.ApiConnection],
+                           output_dir: Optional[Path],
+                           output_format: Optional[str] = "obx",
+                           sync: Optional[bool] = False,
+                           journal: Optional[Journal] = None
+                           ) -> List[Tuple[str, Optional[int]]]:
+    """Creates the OBs of the blocks, writes them in the output format
+    and uploads them (see :func:`run_pipeline
+    <p2obt.backend.pipeline.run_pipeline>`).
+
+    The blocks are read as they are composed and their targets are
+    resolved per night (or per run) as they are read.
+
+    Parameters
+    ----------
+    blocks : iterable of ObBlock
+    connection : p2api.p2api.ApiConnection, optional
+        The P2 python api connection. If "None" the OBs are not uploaded.
+    output_dir : path, optional
+        The output directory. If the output format is not "obx", the
+        bundles (see :class:`Bundle <p2obt.backend.bundle.Bundle>`) are
+        created in it.
+    output_format : str, optional
+        The format the OBs are written in (see :func:`create_obs`).
+    sync : bool, optional
+        If 'True' the OBs are synchronized with the ones already on p2
+        (see :func:`create_obs`).
+    journal : Journal, optional
+        The checkpoint journal (see :class:`Journal <p2obt.backend.journal.Journal>`).
+
+    Returns
+    -------
+    results : list of tuple
+        The uploaded OBs' names and ids (or "None" if the upload failed).
+    """
+    if output_dir is None or get_output_format(output_format) == "obx":
+        return run_pipeline(blocks, connection, sync=sync, journal=journal)
+
+    with Bundle(output_dir, output_format) as bundle:
+        return run_pipeline(blocks, connection, sync=sync,
+                            journal=journal, bundle=bundle)
+
+
+def create_obs_from_lists(targets: List[str],
+                          calibrators: Union[List[str], List[List[str]]],
+                          orders: Union[List[str], List[List[str]]],
+                          tags: Union[List[str], List[List[str]]],
+                          operational_mode: str,
+                          observational_type: str,
+                          array_configuration: str,
+                          resolution: Dict,
+                          connection: p2api,
+                          container_id: int,
+                          output_dir: Path,
+                          sync: Optional[bool] = False,
+                          resume: Optional[bool] = False,
+                          output_format: Optional[str] = "obx",
+                          clear_journal: Optional[bool] = False
+                          ) -> List[Tuple[str, Optional[int]]]:
+    """Creates the OBs from the four lists (targets, calibrators, orders and
+    tags). Each unique target is resolved only once, the OBs are composed
+    ahead of their upload and the OBs of each science target's block are
+    uploaded concurrently to the other blocks (see
+    :func:`run_pipeline <p2obt.backend.pipeline.run_pipeline>`).
+
+    Parameters
+    ----------
+    targets : list of str
+    calibrators : list of str or list of list of str
+    orders : list of str or list of list of str
+    tags : list of str or list of list of str
+    operational_mode : str
+        The mode MATISSE is operated in and for which the OBs are created.
+        Either "st" for standalone, "gr" for GRA4MAT_ft_vis or "both",
+        if obs for both are to be created. Default is "st".
+    observational_mode : str, optional
+        Can either be "vm" for Visitor Mode (VM) or "sm" for Service
+        Mode (SM). Default is "vm".
+    array_configuration : str
+    resolution: dict, optional
+        The default spectral resolutions for the obs in L-band. This is
+        a dictionary containing as keys the individual science targets
+        (the calibrators will be matched) and as values the resolution
+        of the specific target. The values have to be either "low", "med"
+        or "high". Default resolution is "low" and can be set via
+        options["resolution"].
+    connection : p2api
+        The P2 python api.
+    container_id : int
+        The id that specifies the ob on p2.
+    output_dir : path
+        The output directory, where the (.obx)-files will be created in.
+        If left at "None" no files will be created.
+    sync : bool, optional
+        If 'True' the OBs are synchronized with the ones already on p2,
+        i.e., existing containers are reused and only the changed OBs are
+        created, updated or deleted. Default is 'False'.
+    resume : bool, optional
+        If 'True' an interrupted upload is resumed from the checkpoint
+        journal (see `OPTIONS.upload.journal`), i.e., the already created
+        containers and uploaded OBs are skipped. Default is 'False'.
+    output_format : str, optional
+        The format the OBs are written in (see :func:`create_obs`).
+    clear_journal : bool, optional
+        If 'True' the container's checkpoint journal is cleared
+        (see :func:`create_obs`). Default is 'False'.
+
+    Returns
+    -------
+    results : list of tuple
+        The uploaded OBs' names and ids (or "None" if the upload failed).
+    """
+    blocks = get_blocks_from_lists(targets, calibrators, orders, tags,
+                                   operational_mode, observational_type,
+                                   array_configuration, resolution,
+                                   container_id, output_dir)
+    journal = None
+    if connection is not None:
+        journal = Journal(resume=resume, key=f"container {container_id}",
+                          clear=clear_journal)
+    return create_obs_from_blocks(blocks, connection, output_dir,
+                                  output_format, sync, journal)
+
+
+def get_blocks_from_dict(night_plan: Union[Dict, Iterable[NightPlanEvent]],
+                         operational_mode: str,
+                         observational_mode: str,
+                         resolution: Dict,
+                         container_id: Optional[int] = None,
+                         connection: Optional[p2api.p2api.ApiConnection] = None,
+                         output_dir: Optional[Path] = None,
+                         run_settings: Optional[Dict[str, RunSettings]] = None
+                         ) -> Iterator[ObBlock]:
+    """Gets the blocks of OBs (a science target and its calibrators)
+    from a night-plan parsed dictionary.
+
+    Also automatically gets the operational mode, the array_config,
+    the resolution and the run's program id from the run name and if
+    it cannot be detected, it will then prompts the user to input it
+    manually.
+
+    Parameters
+    ----------
+    night_plan : dict or iterable of NightPlanEvent
+        A dictionary containing a parsed night plan or the events of
+        a streamed night plan (see :func:`stream_night_plan
+        <p2obt.backend.parse.stream_night_plan>`). The blocks of each
+        night are yielded as soon as the night was read.
+    operational_mode : str
+        The mode MATISSE is operated in and for which the OBs are created.
+        Either "st" for standalone, "gr" for GRA4MAT_ft_vis or "both",
+        if obs for both are to be created. Default is "st".
+    observational_mode : str, optional
+        Can either be "vm" for Visitor Mode (VM) or "sm" for Service
+        Mode (SM). Default is "vm".
+    resolution: dict, optional
+        The default spectral resolutions for the obs in L-band (see
+        :func:`create_obs_from_dict`).
+    container_id : int, optional
+    connection : p2api.p2api.ApiConnection, optional
+        The P2 python api connection. If "None" the blocks are not
+        assigned to containers on p2.
+    output_dir : path, optional
+        The output directory, where the (.obx)-files will be created in.
+        If left at "None" no files will be created.
+    run_settings : dict of RunSettings, optional
+        The runs' already determined settings (see :func:`classify_runs
+        <p2obt.backend.parse.classify_runs>`). The settings of other runs
+        are detected from their names when they are read.
+
+    Yields
+    ------
+    block : ObBlock
+    """
+    if isinstance(night_plan, dict):
+        night_plan = get_night_plan_events(night_plan)
+
+    run_id, run_dir, night_key, night = None, None, None, {}
+    for event in chain(night_plan, [None]):
+        # NOTE: The blocks of a night are yielded as soon as the night was read
+        if event is None or event.science_target is None:
+            night = {science_target: calibrators for science_target, calibrators
+                     in night.items() if calibrators}
+            if night:
+                print(f"{'':-^50}")
+                night_name = parse_night_name(night_key)
+                if observational_mode == "vm" and connection is not None:
+                    containers = ((night_name, observational_mode),)
+                else:
+                    containers = ()
 
+                if run_dir is not None:
+                    night_dir = run_dir / night_name
+                    print(f"Creating folder '{night_dir.name}...'")
+                else:
+                    night_dir = None
+
+                yield from get_blocks_from_lists(
+                    *read_dict_to_lists(night), operational_mode,
+                    observational_mode, array_config, resolution,
+                    run_id, night_dir, containers)
+            night_key, night = None if event is None else event.night, {}
+
+        if event is None:
+            break
+        if event.science_target is not None:
+            night[event.science_target] = event.calibrators
+            continue
+        if event.night is not None:
+            continue
+
+        run_key = event.run
+        if run_settings is None or run_key not in run_settings:
+            settings = classify_runs([run_key], output_dir is None
+                                     and container_id is None)[run_key]
+        else:
+            settings = run_settings[run_key]
+        array_config = settings.array_configuration
+        operational_mode = settings.operational_mode
+        OPTIONS.resolution.active = settings.resolution
 
-def create_obs_from_dict(night_plan: Dict,
+        if output_dir is None:
+            run_dir = None
+            if container_id is None:
+                run_id = get_remote_run(connection, settings.prog_id)
+            else:
+                run_id = container_id
+        else:
+            run_name = ''.join(run_key.split(",")[0].strip().split())
+            run_dir = output_dir / run_name
+
+        print(f"{'':-^50}")
+        print(f"Creating OBs for {run_key}...")
+
+
+def create_obs_from_dict(night_plan: Union[Dict, Iterable[NightPlanEvent]],
                          operational_mode: str,
                          observational_mode: str,
                          resolution: Dict,
@@ -271,7 +499,14 @@ def create_obs_from_dict(night_plan: Dict,
                          store_password: Optional[bool] = True,
                          remove_password: Optional[bool] = False,
                          server: Optional[str] = "production",
-                         output_dir: Optional[Path] = None) -> None:
+                         output_dir: Optional[Path] = None,
+                         sync: Optional[bool] = False,
+                         resume: Optional[bool] = False,
+                         run_settings: Optional[Dict[str, RunSettings]] = None,
+                         output_format: Optional[str] = "obx",
+                         journal_key: Optional[str] = None,
+                         clear_journal: Optional[bool] = False
+                         ) -> List[Tuple[str, Optional[int]]]:
     """Creates the OBs from a night-plan parsed dictionary.
 
     Also automatically gets the operational mode, the array_config,
@@ -279,11 +514,19 @@ def create_obs_from_dict(night_plan: Dict,
     it cannot be detected, it will then prompts the user to input it
     manually.
 
+    The settings of all runs are determined before logging in, so the
+    user is prompted for all undetected settings at once. The night plan
+    is read as its OBs are composed, the targets of each night are resolved
+    as the night is read (each unique target only once) and the OBs are
+    composed ahead of their upload (see :func:`run_pipeline
+    <p2obt.backend.pipeline.run_pipeline>`).
+
     Parameters
     ----------
-    night_plan : dict
-        A dictionary containing a parsed night plan. If given
-        it will automatically upload the obs to p2.
+    night_plan : dict or iterable of NightPlanEvent
+        A dictionary containing a parsed night plan or the events of
+        a streamed night plan (see :func:`stream_night_plan
+        <p2obt.backend.parse.stream_night_plan>`).
     operational_mode : str
         The mode MATISSE is operated in and for which the OBs are created.
         Either "st" for standalone, "gr" for GRA4MAT_ft_vis or "both",
@@ -310,53 +553,54 @@ def create_obs_from_dict(night_plan: Dict,
     output_dir : path
         The output directory, where the (.obx)-files will be created in.
         If left at "None" no files will be created.
+    sync : bool, optional
+        If 'True' the OBs are synchronized with the ones already on p2,
+        i.e., existing containers are reused and only the changed OBs are
+        created, updated or deleted. Default is 'False'.
+    resume : bool, optional
+        If 'True' an interrupted upload is resumed from the checkpoint
+        journal (see `OPTIONS.upload.journal`), i.e., the already created
+        containers and uploaded OBs are skipped. Default is 'False'.
+    run_settings : dict of RunSettings, optional
+        The runs' already determined settings (see :func:`classify_runs
+        <p2obt.backend.parse.classify_runs>`). If "None" and a dictionary
+        is given, they are determined from its run names.
+    output_format : str, optional
+        The format the OBs are written in (see :func:`create_obs`).
+    journal_key : str, optional
+        The key of the checkpoint journal (e.g., the night plan's path).
+        By default the container id or, if not given, the runs' names.
+    clear_journal : bool, optional
+        If 'True' the checkpoint journal is cleared (see :func:`create_obs`).
+        Default is 'False'.
+
+    Returns
+    -------
+    results : list of tuple
+        The uploaded OBs' names and ids (or "None" if the upload failed).
     """
+    if run_settings is None and isinstance(night_plan, dict):
+        run_settings = classify_runs(night_plan, output_dir is None
+                                     and container_id is None)
+
     if output_dir is None:
         connection = login(user_name, store_password, remove_password, server)
     else:
         connection = None
-        run_id = None
 
-    for run_key, run in night_plan.items():
-        array_config = parse_array_config(run_key)
-        operational_mode = parse_operational_mode(run_key)
-        OPTIONS.resolution.active = parse_run_resolution(run_key)
+    journal = None
+    if connection is not None:
+        if journal_key is None:
+            journal_key = f"container {container_id}" if container_id is not None\
+                else f"runs {sorted(run_settings or {})}"
+        journal = Journal(resume=resume, key=journal_key, clear=clear_journal)
 
-        if output_dir is None:
-            run_dir = None
-            if container_id is None:
-                run_prog_id = parse_run_prog_id(run_key)
-                run_id = get_remote_run(connection, run_prog_id)
-            else:
-                run_id = container_id
-        else:
-            run_name = ''.join(run_key.split(",")[0].strip().split())
-            run_dir = output_dir / run_name
-            if not run_dir.exists():
-                run_dir.mkdir(parents=True, exist_ok=True)
-
-        print(f"{'':-^50}")
-        print(f"Creating OBs for {run_key}...")
-        for night_key, night in run.items():
-            print(f"{'':-^50}")
-            night_name = parse_night_name(night_key)
-            if observational_mode == "vm" and connection is not None:
-                night_id = create_remote_container(connection, night_name,
-                                                   run_id, observational_mode)
-            else:
-                night_id = run_id
-
-            if run_dir is not None:
-                night_dir = run_dir / night_name
-                print(f"Creating folder '{night_dir.name}...'")
-                if not night_dir.exists():
-                    night_dir.mkdir(parents=True, exist_ok=True)
-            else:
-                night_dir = None
-
-            create_obs_from_lists(*read_dict_to_lists(night), operational_mode,
-                                  observational_mode, array_config, resolution,
-                                  connection, night_id, night_dir)
+    blocks = get_blocks_from_dict(night_plan, operational_mode,
+                                  observational_mode, resolution,
+                                  container_id, connection, output_dir,
+                                  run_settings)
+    return create_obs_from_blocks(blocks, connection, output_dir,
+                                  output_format, sync, journal)
 
 
 def create_obs(night_plan: Optional[Path] = None,
@@ -369,7 +613,11 @@ def create_obs(night_plan: Optional[Path] = None,
                store_password: Optional[bool] = True,
                remove_password: Optional[bool] = False,
                server: Optional[str] = "production",
-               output_dir: Optional[Path] = None) -> None:
+               output_dir: Optional[Path] = None,
+               sync: Optional[bool] = False,
+               resume: Optional[bool] = False,
+               output_format: Optional[str] = "obx",
+               clear_journal: Optional[bool] = False) -> None:
     """Creates the OBs from a night-plan parsed dictionary or from
     a manual input of the four needed lists.
 
@@ -405,10 +653,33 @@ def create_obs(night_plan: Optional[Path] = None,
     output_dir: path, optional
         The output directory, where the (.obx)-files will be created in.
         If left at "None" no files will be created.
+    sync : bool, optional
+        If 'True' the OBs are synchronized with the ones already on p2,
+        i.e., existing containers are reused and only the changed OBs are
+        created, updated or deleted. Default is 'False'.
+    resume : bool, optional
+        If 'True' an interrupted upload is resumed from the checkpoint
+        journal (see `OPTIONS.upload.journal`), i.e., the already created
+        containers and uploaded OBs are skipped. Default is 'False'.
+    output_format : str, optional
+        The format the OBs are written to the output directory in. Either
+        "obx" for an (.obx)-file per OB in a directory tree (run/night/
+        mode/target), "zip" or "tar" for an archive per run containing
+        this tree or "jsonl" for a (.jsonl)-file per run with a line of
+        json per OB (see :class:`Bundle <p2obt.backend.bundle.Bundle>`).
+        Default is "obx".
+    clear_journal : bool, optional
+        If 'True' the checkpoint journal of the night plan (or of the
+        container id for a manual input) is cleared before the upload.
+        Otherwise the upload is appended to it, so an interrupted upload
+        can still be resumed later. Default is 'False'.
     """
     if night_plan is None and output_dir is None and container_id is None:
         raise IOError("Either output directory, container id or"
                       " night plan must be set!")
+    output_format = get_output_format(output_format)
+
+    print(f"[INFO]: Logging to '{setup_logging()}'.")
 
     if output_dir is not None:
         output_dir = Path(output_dir, "manualOBs")\
@@ -428,17 +699,30 @@ def create_obs(night_plan: Optional[Path] = None,
         else:
             connection = None
 
-        create_obs_from_lists(targets, calibrators, orders, tags,
-                              operational_mode, observational_mode, array_config,
-                              resolution, connection, container_id, output_dir)
+        results = create_obs_from_lists(
+                targets, calibrators, orders, tags,
+                operational_mode, observational_mode, array_config,
+                resolution, connection, container_id, output_dir, sync, resume,
+                output_format, clear_journal)
 
     elif night_plan is not None:
-        night_plan = parse_night_plan(night_plan)
-        create_obs_from_dict(night_plan, operational_mode,
-                             observational_mode, resolution, container_id,
-                             user_name, store_password, remove_password,
-                             server, output_dir)
+        # NOTE: The runs' settings are determined (and prompted for) up front,
+        # while the night plan itself is parsed as its blocks are composed
+        with open(night_plan, "r", encoding="utf-8") as night_plan_file:
+            run_settings = classify_runs(get_run_names(night_plan_file),
+                                         output_dir is None and container_id is None)
+            night_plan_file.seek(0)
+            results = create_obs_from_dict(
+                    stream_night_plan(night_plan_file), operational_mode,
+                    observational_mode, resolution, container_id,
+                    user_name, store_password, remove_password,
+                    server, output_dir, sync, resume, run_settings, output_format,
+                    str(Path(night_plan).resolve()), clear_journal)
     else:
         raise IOError("Neither manul input list or input"
                       " night plan path has been detected!")
+    print_upload_summary(results)
+    if OPTIONS.instrumentation.active:
+        print_measurements()
+        print(f"[INFO]: Measurements saved to '{dump_measurements()}'.")
     print("[INFO]: Done!")
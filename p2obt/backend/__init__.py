@@ -1,2 +1,37 @@
+import sys
+from importlib import import_module
+from types import ModuleType
+
 from .options import OPTIONS
-from .query import query
+
+
+# NOTE: These are imported on first access, as their module imports heavy
+# dependencies (e.g., astropy, astroquery or pandas)
+LAZY_ATTRIBUTES = {"query": ".query", "query_many": ".query"}
+__all__ = ["OPTIONS", *LAZY_ATTRIBUTES]
+
+
+def __getattr__(name: str):
+    if name not in LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *LAZY_ATTRIBUTES])
+
+
+class BackendModule(ModuleType):
+    """The backend package, whose lazily imported functions are not
+    replaced by their equally named submodules (e.g., "query") once
+    these are imported."""
+
+    def __setattr__(self, name: str, value) -> None:
+        if name in LAZY_ATTRIBUTES and isinstance(value, ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = BackendModule
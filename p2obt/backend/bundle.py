@@ -0,0 +1,128 @@
+import io
+import json
+import os
+import tarfile
+import time
+import zipfile
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional
+
+from .compose import format_ob
+
+
+# NOTE: The output formats and the bundles' file extensions. For "obx" each
+# OB is written to its own (.obx)-file (see `p2obt.backend.compose.write_obs`)
+OUTPUT_FORMATS = {"obx": None, "zip": ".zip", "tar": ".tar", "jsonl": ".jsonl"}
+
+
+def get_output_format(output_format: str) -> str:
+    """Gets the output format and checks if it is valid."""
+    if output_format.lower() not in OUTPUT_FORMATS:
+        raise IOError(f"Output format '{output_format}' is not supported!"
+                      f" Either {', '.join(map(repr, OUTPUT_FORMATS))}.")
+    return output_format.lower()
+
+
+class Bundle:
+    """A sink that streams OBs into bundles instead of writing each
+    to its own (.obx)-file.
+
+    The OBs are written to one bundle per directory directly below the
+    root directory (e.g., per run for a night plan) with their paths
+    relative to the root directory, so extracting the bundles into the
+    root directory yields the same files as writing the (.obx)-files.
+    A bundle is either a zip- or a tar-archive of the (.obx)-files or
+    a (.jsonl)-file with a line of json (the OB's path, name and
+    content) per OB. The bundles are written to temporary files that
+    replace the bundles when closed.
+
+    Parameters
+    ----------
+    root : path
+        The directory the bundles are created in.
+    output_format : str
+        Either "zip", "tar" or "jsonl".
+    """
+
+    def __init__(self, root: Path, output_format: str) -> None:
+        self.root, self.output_format = Path(root), get_output_format(output_format)
+        if self.output_format == "obx":
+            raise IOError("A bundle's output format must not be 'obx'!")
+        self.lock, self.bundles = Lock(), {}
+
+    def __enter__(self) -> "Bundle":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close(discard=exc_type is not None)
+
+    def get_file(self, name: str) -> Path:
+        """Gets the bundle's file by its name."""
+        return self.root / f"{name}{OUTPUT_FORMATS[self.output_format]}"
+
+    def open_bundle(self, name: str):
+        """Opens the temporary file of a bundle."""
+        file = self.get_file(name)
+        tmp_file = file.with_name(f".{file.name}.{os.getpid()}.tmp")
+        self.root.mkdir(parents=True, exist_ok=True)
+        if self.output_format == "zip":
+            bundle = zipfile.ZipFile(tmp_file, "w", compression=zipfile.ZIP_DEFLATED)
+        elif self.output_format == "tar":
+            bundle = tarfile.open(tmp_file, "w")
+        else:
+            bundle = open(tmp_file, "w", encoding="utf-8")
+        self.bundles[name] = (bundle, tmp_file, file)
+        return bundle
+
+    def write(self, ob: Dict, ob_name: str, output_dir: Path) -> None:
+        """Writes an OB to its bundle.
+
+        Parameters
+        ----------
+        ob : dict
+        ob_name : str
+        output_dir : path
+            The directory the OB's (.obx)-file would be written to.
+            Must be below the root directory.
+        """
+        path = Path(output_dir).relative_to(self.root) / f"{ob_name}.obx"
+        if self.output_format == "jsonl":
+            content = json.dumps({"path": path.as_posix(), "name": ob_name, "ob": ob},
+                                 default=str) + "\n"
+        else:
+            content = format_ob(ob).encode("utf-8")
+
+        with self.lock:
+            name = path.parts[0] if len(path.parts) > 1 else self.root.name
+            if name in self.bundles:
+                bundle = self.bundles[name][0]
+            else:
+                bundle = self.open_bundle(name)
+            if self.output_format == "zip":
+                bundle.writestr(path.as_posix(), content)
+            elif self.output_format == "tar":
+                info = tarfile.TarInfo(path.as_posix())
+                info.size, info.mtime = len(content), time.time()
+                bundle.addfile(info, io.BytesIO(content))
+            else:
+                bundle.write(content)
+        print(f"Created OB: '{ob_name}'.")
+
+    def close(self, discard: Optional[bool] = False) -> None:
+        """Closes the bundles and replaces the bundles' files.
+
+        Parameters
+        ----------
+        discard : bool, optional
+            If 'True' the bundles are discarded instead.
+        """
+        with self.lock:
+            for bundle, tmp_file, file in self.bundles.values():
+                bundle.close()
+                if discard:
+                    tmp_file.unlink(missing_ok=True)
+                else:
+                    os.replace(tmp_file, file)
+                    print(f"[INFO]: Saved OBs to '{file}'.")
+            self.bundles = {}
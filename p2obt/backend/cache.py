@@ -0,0 +1,251 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+from pathlib import Path
+from threading import Lock, get_ident
+from types import SimpleNamespace
+from typing import Any, List, Optional, Tuple
+
+from .options import OPTIONS
+
+
+STATISTICS = SimpleNamespace(hits=0, misses=0, writes=0, evictions=0)
+STATISTICS_LOCK = Lock()
+
+# NOTE: The cache's estimated size (in bytes) and the writes since the last
+# eviction. The cache's directory is only scanned for the eviction if the
+# estimated size exceeds the maximum size or after a number of writes (as
+# other processes may write to the cache as well). The files written during
+# a scan are recorded, so they are counted once
+EVICTION = SimpleNamespace(size=None, writes=0, scan_writes=None)
+EVICTION_LOCK, EVICTING_LOCK = Lock(), Lock()
+EVICTION_INTERVAL = 100
+
+# NOTE: The fraction of the maximum size to which the cache is evicted, so
+# not every following write exceeds the maximum size again
+EVICTION_TARGET = 0.9
+
+
+def count(statistic: str, increment: Optional[int] = 1) -> None:
+    """Increments one of the cache's statistics."""
+    with STATISTICS_LOCK:
+        setattr(STATISTICS, statistic,
+                getattr(STATISTICS, statistic) + increment)
+
+
+def get_statistics() -> SimpleNamespace:
+    """Returns a copy of the cache's hit/miss statistics."""
+    with STATISTICS_LOCK:
+        return SimpleNamespace(**vars(STATISTICS))
+
+
+def reset_statistics() -> None:
+    """Resets the cache's hit/miss statistics."""
+    with STATISTICS_LOCK:
+        for statistic in vars(STATISTICS):
+            setattr(STATISTICS, statistic, 0)
+
+
+def normalize_name(name: str) -> str:
+    """Normalizes a target's name (e.g., 'HD  142666' -> 'hd 142666')."""
+    return " ".join(name.split()).lower()
+
+
+def get_cache_key(name: str, catalog: str,
+                  match_radius: float, fields: List[str],
+                  catalog_id: Optional[str] = None) -> str:
+    """Gets the key under which a catalog query is cached.
+
+    Parameters
+    ----------
+    name : str
+        The target's name.
+    catalog : str
+        The catalog's name.
+    match_radius : float
+        The radius in which is queried (in arcsec).
+    fields : list of str
+        The fields queried from the catalog.
+    catalog_id : str, optional
+        The catalog's (Vizier) identifier.
+
+    Returns
+    -------
+    key : str
+    """
+    key = json.dumps([normalize_name(name), catalog, catalog_id,
+                      round(float(match_radius), 6), list(fields)])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def get_cache_file(key: str) -> Path:
+    """Gets the file in which a cache entry is stored."""
+    return Path(OPTIONS.catalogs.cache.path) / f"{key}.pkl"
+
+
+def read_cache(key: str) -> Tuple[bool, Any]:
+    """Reads an entry from the cache.
+
+    Expired entries are only returned in the "offline"-mode and
+    in the "refresh"-mode the cache is never read.
+
+    Parameters
+    ----------
+    key : str
+        The cache key (see :func:`get_cache_key`).
+
+    Returns
+    -------
+    found : bool
+        'True' if the entry was found, otherwise 'False'.
+    value : any
+        The cached value.
+    """
+    cache = OPTIONS.catalogs.cache
+    if not cache.active or cache.mode == "refresh":
+        count("misses")
+        return False, None
+
+    cache_file = get_cache_file(key)
+    try:
+        with open(cache_file, "rb") as pickle_file:
+            entry = pickle.load(pickle_file)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        count("misses")
+        return False, None
+
+    if cache.mode != "offline" and time.time() - entry["time"] > cache.ttl:
+        count("misses")
+        return False, None
+
+    # NOTE: Touch the file so the eviction is least recently used
+    try:
+        os.utime(cache_file)
+    except OSError:
+        pass
+    count("hits")
+    return True, entry["value"]
+
+
+def write_cache(key: str, value: Any) -> None:
+    """Writes an entry to the cache and evicts old entries
+    if the cache's (estimated) maximum size is exceeded.
+
+    If the cache can not be written to, the entry is not cached.
+
+    Parameters
+    ----------
+    key : str
+        The cache key (see :func:`get_cache_key`).
+    value : any
+        The value to be cached.
+    """
+    cache = OPTIONS.catalogs.cache
+    if not cache.active:
+        return
+
+    cache_file = get_cache_file(key)
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.{get_ident()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, "wb") as pickle_file:
+            pickle.dump({"time": time.time(), "value": value}, pickle_file)
+            file_size = pickle_file.tell()
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        logging.warning(f"[WARNING]: Could not write to the cache '{cache_file.parent}'!",
+                        exc_info=True)
+        try:
+            tmp_file.unlink(missing_ok=True)
+        except OSError:
+            pass
+        return
+    count("writes")
+
+    with EVICTION_LOCK:
+        EVICTION.writes += 1
+        if EVICTION.size is not None:
+            EVICTION.size += file_size
+        if EVICTION.scan_writes is not None:
+            EVICTION.scan_writes[cache_file] = file_size
+    if is_eviction_due():
+        try:
+            evict_cache(force=False)
+        except OSError:
+            logging.warning("[WARNING]: Could not evict the cache!", exc_info=True)
+
+
+def is_eviction_due() -> bool:
+    """Checks if the cache's directory needs to be scanned for the eviction,
+    i.e., if its estimated size exceeds the maximum size, its size is not
+    known yet or a number of writes happened since the last eviction."""
+    with EVICTION_LOCK:
+        return EVICTION.size is None\
+            or EVICTION.size > OPTIONS.catalogs.cache.max_size\
+            or EVICTION.writes >= EVICTION_INTERVAL
+
+
+def evict_cache(max_size: Optional[int] = None,
+                force: Optional[bool] = True) -> None:
+    """Removes the least recently used entries from the cache until
+    it is smaller than a fraction (`EVICTION_TARGET`) of its maximum size.
+
+    Only one thread evicts at a time.
+
+    Parameters
+    ----------
+    max_size : int, optional
+        The maximum size of the cache in bytes. By default it is
+        taken from the options.
+    force : bool, optional
+        If 'False' the cache is only evicted if it is still due after
+        another thread's eviction (see :func:`is_eviction_due`).
+    """
+    max_size = OPTIONS.catalogs.cache.max_size if max_size is None else max_size
+    cache_dir = Path(OPTIONS.catalogs.cache.path)
+    with EVICTING_LOCK:
+        if not force and not is_eviction_due():
+            return
+
+        with EVICTION_LOCK:
+            EVICTION.writes, EVICTION.scan_writes = 0, {}
+
+        entries = []
+        try:
+            for cache_file in cache_dir.glob("*.pkl"):
+                try:
+                    stat = cache_file.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, cache_file))
+        except OSError:
+            with EVICTION_LOCK:
+                EVICTION.scan_writes = None
+            raise
+
+        size = sum(entry[1] for entry in entries)
+        for _, file_size, cache_file in sorted(entries, key=lambda x: x[0]):
+            if size <= max_size*EVICTION_TARGET:
+                break
+            try:
+                cache_file.unlink()
+            except OSError:
+                continue
+            size -= file_size
+            count("evictions")
+
+        # NOTE: Only the files written during the scan that the scan
+        # missed are added to the scanned size
+        scanned_files = {entry[2] for entry in entries}
+        with EVICTION_LOCK:
+            scan_writes, EVICTION.scan_writes = EVICTION.scan_writes, None
+            EVICTION.size = size + sum(file_size for cache_file, file_size in scan_writes.items()
+                                       if cache_file not in scanned_files)
+
+
+def clear_cache() -> None:
+    """Removes all entries from the cache."""
+    evict_cache(max_size=0)
@@ -1,18 +1,22 @@
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
 from pathlib import Path
-from typing import Union, Optional, Dict, Tuple
+from threading import Lock, get_ident
+from typing import Union, Optional, Dict, Iterable, List, Mapping, Tuple
 
-import astropy.units as u
-import pkg_resources
+import numpy as np
 import toml
-from astropy.coordinates import SkyCoord
 
-from .query import query
+from .instrumentation import measure
 from .options import OPTIONS
-from .utils import convert_proper_motions, remove_parenthesis, remove_spaces
+from .utils import Traversable, convert_proper_motions, get_modification_time,\
+    get_resource, parse_sexagesimal, remove_parenthesis, remove_spaces
 
-# TODO: Exchange, possibly slow function?
-TEMPLATE_FILE = Path(pkg_resources.resource_filename("p2obt", "data/templates.toml"))
+# NOTE: `astropy` and the queries are imported where they are used, as they are
+# slow to import and not needed to write (.obx)-files
+TEMPLATE_FILE = get_resource("config/templates.toml")
 
 TURBULENCE = {10: "10%  (Seeing < 0.6 arcsec, t0 > 5.2 ms)",
               30: "30%  (Seeing < 0.8 arcsec, t0 > 4.1 ms)",
@@ -22,8 +26,57 @@ SKY_TRANSPARENCY = {"photometric": "Photometric",
                     "thin": "Variable, thin cirrus",
                     "thick": "Variable, thick cirrus"}
 
+# NOTE: The flux keys in order of precedence and the zero points of the magnitudes
+LBAND_KEYS, NBAND_KEYS = ["Lflux", "med-Lflux", "W1mag"], ["Nflux", "med-Nflux", "W3mag"]
+ZERO_POINTS = {"W1mag": 309.54, "W3mag": 31.674}
 
-def load_template(file: Path,
+
+TEMPLATES = {}
+TEMPLATES_LOCK = Lock()
+
+# NOTE: The formatted coordinates by their unformatted right ascension and declination
+FORMATTED_COORDINATES = {}
+FORMATTED_COORDINATES_LOCK = Lock()
+
+
+def get_template_file() -> Union[Path, Traversable]:
+    """Gets the templates' file. Either the user-supplied one
+    (`OPTIONS.templates.file`) or the default one."""
+    if OPTIONS.templates.file is None:
+        return TEMPLATE_FILE
+    return Path(OPTIONS.templates.file)
+
+
+def load_templates(file: Union[Path, Traversable]) -> Dict:
+    """Loads all templates from a (.toml)-file.
+
+    The file is only parsed once and is reparsed
+    if it was modified.
+
+    Parameters
+    ----------
+    file : path or importlib.resources.abc.Traversable
+        A (.toml)-file containing templates or one of
+        p2obt's data files (see :func:`get_resource <p2obt.backend.utils.get_resource>`).
+
+    Returns
+    -------
+    templates : dict
+        A dictionary containing all templates.
+    """
+    if not isinstance(file, Traversable):
+        file = Path(file)
+    key, modification_time = str(file), get_modification_time(file)
+    with TEMPLATES_LOCK:
+        if key in TEMPLATES and TEMPLATES[key][0] == modification_time:
+            return TEMPLATES[key][1]
+
+        templates = toml.loads(file.read_text(encoding="utf-8"))
+        TEMPLATES[key] = (modification_time, templates)
+    return templates
+
+
+def load_template(file: Union[Path, Traversable],
                   header: str,
                   sub_header: Optional[str] = None,
                   operational_mode: Optional[str] = None) -> Dict:
@@ -44,36 +97,113 @@ def load_template(file: Path,
     Returns
     -------
     template : dict
-        A dictionary that is the template.
+        A dictionary that is the template. This is a copy
+        and can be freely modified.
     """
-    with open(file, "r+", encoding="utf-8") as toml_file:
+    with measure("template", header):
+        templates = load_templates(file)
         if operational_mode is not None:
-            return toml.load(toml_file)[operational_mode][header]
-        return toml.load(toml_file)[header][sub_header]
+            return deepcopy(templates[operational_mode][header])
+        return deepcopy(templates[header][sub_header])
+
+
+def format_dict(dictionary: Dict) -> str:
+    """Formats the key and value pairs of a dictionary
+    as the lines of an (.obx)-file."""
+    return "".join(f'{key.ljust(40)}"{str(value)}"\n'
+                   for key, value in dictionary.items())
 
 
 def write_dict(file, dictionary: Dict):
     """Iterates over the key and value pairs of a
     dictionary and writes them."""
-    for key, value in dictionary.items():
-        file.write(f'{key.ljust(40)}"{str(value)}"'+"\n")
+    file.write(format_dict(dictionary))
+
+
+def format_ob(ob: Dict) -> str:
+    """Formats an OB as the content of its (.obx)-file."""
+    sections = []
+    for dictionary in ob.values():
+        if any(isinstance(value, dict) for value in dictionary.values()):
+            sections.extend(format_dict(sub_dict) for sub_dict in dictionary.values())
+        else:
+            sections.append(format_dict(dictionary))
+    return "".join(f"{section}\n\n" for section in sections)
+
+
+def write_obx(ob: Dict, ob_name: str, output_dir: Path) -> Path:
+    """Writes the (.obx)-file to the specified directory.
+
+    The file's content is formatted at once and written to a temporary
+    file that then replaces the (.obx)-file, so an (.obx)-file is
+    never partially written.
+
+    Parameters
+    ----------
+    ob : dict
+    ob_name : str
+    output_dir : path
+        The (existing) directory of the (.obx)-file.
+
+    Returns
+    -------
+    out_file : path
+        The (.obx)-file.
+    """
+    out_file = Path(output_dir) / f"{ob_name}.obx"
+    tmp_file = out_file.with_name(f".{out_file.name}.{os.getpid()}.{get_ident()}.tmp")
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as obx_file:
+            obx_file.write(format_ob(ob))
+        os.replace(tmp_file, out_file)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+    return out_file
 
 
 def write_ob(ob: Dict, ob_name: str, output_dir: Path) -> None:
     """Writes the (.obx)-file to the specified directory"""
-    out_file = Path(output_dir) / f"{ob_name}.obx"
-    with open(out_file, "w+", encoding="utf-8") as obx_file:
-        for dictionary in ob.values():
-            if any(isinstance(value, dict) for value in dictionary.values()):
-                for sub_dict in dictionary.values():
-                    write_dict(obx_file, sub_dict)
-                    obx_file.write("\n\n")
-            else:
-                write_dict(obx_file, dictionary)
-                obx_file.write("\n\n")
+    write_obx(ob, ob_name, output_dir)
     print(f"Created OB: '{ob_name}'.")
 
 
+def write_obs(obs: Iterable[Tuple[Dict, str, Path]],
+              max_workers: Optional[int] = None) -> List[Path]:
+    """Writes the (.obx)-files of many OBs concurrently.
+
+    The output directories are created once beforehand and the
+    OBs are written by a thread pool (see :func:`write_obx`).
+
+    Parameters
+    ----------
+    obs : iterable of tuple
+        The OBs, their names and their output directories.
+    max_workers : int, optional
+        The maximum number of files written concurrently.
+        By default `OPTIONS.output.workers`.
+
+    Returns
+    -------
+    out_files : list of path
+        The (.obx)-files in the order of the OBs.
+    """
+    obs = [(ob, ob_name, Path(output_dir)) for ob, ob_name, output_dir in obs]
+    for output_dir in dict.fromkeys(output_dir for _, _, output_dir in obs):
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    max_workers = OPTIONS.output.workers if max_workers is None else max_workers
+    if max_workers <= 1 or len(obs) <= 1:
+        out_files = [write_obx(*ob) for ob in obs]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            out_files = list(executor.map(write_obx, *zip(*obs)))
+
+    if obs:
+        print("\n".join(f"Created OB: '{ob_name}'." for _, ob_name, _ in obs))
+    return out_files
+
+
 # TODO: 'add_space' makes to many spaces. Fix at some point.
 def set_ob_name(target: Union[Dict, str],
                 observation_type: str,
@@ -107,6 +237,48 @@ def set_ob_name(target: Union[Dict, str],
     return ob_name if tag is None else f"{ob_name}_{tag}"
 
 
+def get_array_configuration(array_configuration: str) -> str:
+    """Checks and normalizes the array configuration."""
+    array_configuration = array_configuration.lower()
+    if array_configuration not in ["uts", "small", "medium", "large", "extended"]:
+        raise IOError("Unknown array configuration provided!"
+                      " Choose from 'UTs', 'small', 'medium',"
+                      " 'large' or 'extended'.")
+    return array_configuration
+
+
+def get_observational_type(observational_type: str) -> str:
+    """Checks and normalizes the observational type."""
+    observational_type = observational_type.lower()
+    if observational_type not in ["sci", "cal"]:
+        raise IOError("Unknown observation type provided!"
+                      " Choose from 'SCI' or 'CAL', for "
+                      "a science target or a calibrator.")
+    return observational_type
+
+
+def get_operational_mode(operational_mode: str) -> str:
+    """Checks the operational mode and converts it to
+    either "matisse" or "gra4mat"."""
+    operational_mode = operational_mode.lower()
+    if operational_mode in ["st", "standalone"]:
+        return "matisse"
+    if operational_mode in ["gr", "gra4mat"]:
+        return "gra4mat"
+    raise IOError("Unknown operational mode provided!"
+                  " Choose from 'st'/'standalone' or"
+                  " 'gr'/'gra4mat'.")
+
+
+def get_resolution(resolution: str) -> str:
+    """Checks and normalizes the resolution."""
+    resolution = resolution.lower()
+    if resolution not in ["low", "med", "high"]:
+        raise IOError("Unknown resolution provided!"
+                      " Choose from 'low', 'med' or 'high'.")
+    return resolution
+
+
 def get_observation_settings(target: Dict,
                              resolution: str,
                              operational_mode: str,
@@ -138,6 +310,8 @@ def get_observation_settings(target: Dict,
             resolution = target["LResAT"]\
                     if target["LResAT"] != "TBD" else resolution
 
+    # NOTE: The local catalog's resolutions are upper case
+    resolution = resolution.lower()
     integration_time = getattr(getattr(
         getattr(OPTIONS.dit, operational_mode), array), resolution)
     central_wl = getattr(getattr(
@@ -150,29 +324,114 @@ def format_proper_motions(target: Dict) -> Tuple[float, float]:
     """Correctly formats the right ascension's and declination's
     proper motions."""
     propRa, propDec = 0, 0
-    if "local.propRA" in target:
+    if "local.propRa" in target:
         propRa = target["local.propRa"]
     if "local.propDec" in target:
         propDec = target["local.propDec"]
     if "PMRA" in target and "PMDEC" in target:
         propRa, propDec = convert_proper_motions(target["PMRA"], target["PMDEC"])
     elif "PMRA" in target:
-        propRa = convert_proper_motions(target["PMRA"])
+        propRa = convert_proper_motions(target["PMRA"])[0]
     elif "PMDEC" in target:
-        propDec = convert_proper_motions(target["PMDEC"])
+        propDec = convert_proper_motions(target["PMDEC"])[0]
     return propRa, propDec
 
 
+def get_proper_motions(targets: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Gets the right ascensions' and declinations' proper motions of
+    many targets at once (see :func:`format_proper_motions`).
+
+    Parameters
+    ----------
+    targets : list of dict
+
+    Returns
+    -------
+    prop_ras : numpy.ndarray
+    prop_decs : numpy.ndarray
+    """
+    import astropy.units as u
+
+    proper_motions = []
+    for key, local_key in [("PMRA", "local.propRa"), ("PMDEC", "local.propDec")]:
+        local_values = np.array([target.get(local_key, 0) for target in targets],
+                                dtype=float)
+        has_value = np.array([key in target for target in targets], dtype=bool)
+        values = np.array([target.get(key, 0) for target in targets], dtype=float)
+        values = (values*u.mas).to_value(u.arcsec)
+        proper_motions.append(np.where(has_value, values, local_values))
+    return tuple(proper_motions)
+
+
+def format_coordinates(targets: Iterable[Dict]) -> None:
+    """Formats the right ascensions and declinations of many targets
+    at once and stores them for :func:`format_ra_and_dec`.
+
+    All coordinates are converted with one (vectorized) `SkyCoord`.
+    Targets from the local catalog or without coordinates are skipped.
+
+    Parameters
+    ----------
+    targets : iterable of dict
+        The resolved targets.
+    """
+    import astropy.units as u
+    from astropy.coordinates import SkyCoord
+
+    keys = list(dict.fromkeys(
+        (str(target["RA"]), str(target["DEC"])) for target in targets
+        if "local.RA" not in target and "RA" in target and "DEC" in target))
+    with FORMATTED_COORDINATES_LOCK:
+        keys = [key for key in keys if key not in FORMATTED_COORDINATES]
+    if not keys:
+        return
+
+    ras, decs = map(list, zip(*keys))
+    with measure("format", "coordinates (batch)"):
+        ra_hours, dec_degrees = parse_sexagesimal(ras), parse_sexagesimal(decs)
+        try:
+            if ra_hours is None or dec_degrees is None:
+                coordinates = SkyCoord(ras, decs, unit=(u.hourangle, u.deg))
+            else:
+                coordinates = SkyCoord(ra_hours, dec_degrees, unit=(u.hourangle, u.deg))
+        except ValueError:
+            # NOTE: Malformed coordinates are left to the individual formatting
+            return
+        ra_hms = coordinates.ra.to_string(unit=u.hourangle, sep=":",
+                                          pad=True, precision=3)
+        dec_dms = coordinates.dec.to_string(sep=":", pad=True,
+                                            precision=3)
+    with FORMATTED_COORDINATES_LOCK:
+        FORMATTED_COORDINATES.update(zip(keys, zip(ra_hms.tolist(),
+                                                   dec_dms.tolist())))
+
+
 def format_ra_and_dec(target: Dict) -> Tuple[str, str]:
-    """Correctly formats the right ascension and declination."""
+    """Correctly formats the right ascension and declination.
+
+    Coordinates already formatted (see :func:`format_coordinates`)
+    are not converted again.
+    """
     if "local.RA" in target:
         return target["local.RA"], target["local.DEC"]
-    coordinates = SkyCoord(f"{target['RA']} {target['DEC']}",
-                           unit=(u.hourangle, u.deg))
-    ra_hms = coordinates.ra.to_string(unit=u.hourangle, sep=":",
-                                      pad=True, precision=3)
-    dec_dms = coordinates.dec.to_string(sep=":", pad=True,
-                                        precision=3)
+
+    key = (str(target["RA"]), str(target["DEC"]))
+    with FORMATTED_COORDINATES_LOCK:
+        if key in FORMATTED_COORDINATES:
+            return FORMATTED_COORDINATES[key]
+
+    import astropy.units as u
+    from astropy.coordinates import SkyCoord
+
+    with measure("format", "coordinates"):
+        coordinates = SkyCoord(f"{target['RA']} {target['DEC']}",
+                               unit=(u.hourangle, u.deg))
+        ra_hms = coordinates.ra.to_string(unit=u.hourangle, sep=":",
+                                          pad=True, precision=3)
+        dec_dms = coordinates.dec.to_string(sep=":", pad=True,
+                                            precision=3)
+    with FORMATTED_COORDINATES_LOCK:
+        FORMATTED_COORDINATES[key] = (ra_hms, dec_dms)
     return ra_hms, dec_dms
 
 
@@ -196,11 +455,41 @@ def format_fluxes(target: Dict) -> Tuple[float, float]:
         round(flux_nband, 2) if flux_nband is not None else 0.
 
 
+def get_fluxes(targets: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Gets the L- and N-band fluxes of many targets at once
+    (see :func:`format_fluxes`).
+
+    Parameters
+    ----------
+    targets : list of dict
+
+    Returns
+    -------
+    fluxes_lband : numpy.ndarray
+    fluxes_nband : numpy.ndarray
+    """
+    fluxes = []
+    for keys in [LBAND_KEYS, NBAND_KEYS]:
+        flux = np.zeros(len(targets))
+        has_flux = np.zeros(len(targets), dtype=bool)
+        # NOTE: The keys are applied in reverse, so the ones of higher precedence overwrite
+        for key in reversed(keys):
+            has_value = np.array([key in target for target in targets], dtype=bool)
+            values = np.array([target.get(key, 0) for target in targets], dtype=float)
+            if key in ZERO_POINTS:
+                values = ZERO_POINTS[key] * 10.0**(-values/2.5)
+            flux = np.where(has_value, values, flux)
+            has_flux |= has_value
+        fluxes.append(np.where(has_flux, np.round(flux, 2), 0.))
+    return tuple(fluxes)
+
+
 def fill_header(target: Dict,
                 observation_type: str,
                 array_configuration: str,
                 sci_name: Optional[str] = None,
-                tag: Optional[str] = None) -> Dict:
+                tag: Optional[str] = None,
+                proper_motions: Optional[Tuple[float, float]] = None) -> Dict:
     """Fills in the header dictionary with the information from the query.
 
     Parameters
@@ -210,6 +499,9 @@ def fill_header(target: Dict,
     array_configuration : str
     sci_name : str, optional
     tag : str, optional
+    proper_motions : tuple of float, optional
+        The already formatted proper motions (see
+        :func:`get_proper_motions`).
 
     Returns
     -------
@@ -217,16 +509,18 @@ def fill_header(target: Dict,
     """
     header = {}
     header_user = load_template(
-            TEMPLATE_FILE, "header", sub_header="user")
+            get_template_file(), "header", sub_header="user")
     header_target = load_template(
-            TEMPLATE_FILE, "header", sub_header="target")
+            get_template_file(), "header", sub_header="target")
     header_constraints = load_template(
-            TEMPLATE_FILE, "header", sub_header="constraints")
+            get_template_file(), "header", sub_header="constraints")
     header_observation = load_template(
-            TEMPLATE_FILE, "header", sub_header="observation")
+            get_template_file(), "header", sub_header="observation")
     ob_name = set_ob_name(target, observation_type, sci_name, tag)
     ra_hms, dec_dms = format_ra_and_dec(target)
-    prop_ra, prop_dec = format_proper_motions(target)
+    if proper_motions is None:
+        proper_motions = format_proper_motions(target)
+    prop_ra, prop_dec = proper_motions
 
     header_user["name"] = ob_name
     user_comments = []
@@ -257,7 +551,8 @@ def fill_header(target: Dict,
 
 def fill_acquisition(target: Dict,
                      operational_mode: str,
-                     array_configuration: str) -> Dict:
+                     array_configuration: str,
+                     fluxes: Optional[Tuple[float, float]] = None) -> Dict:
     """Gets the for the operational mode correct acquisition template
     and then fills it in with the information from the query.
 
@@ -266,15 +561,20 @@ def fill_acquisition(target: Dict,
     target : dict
     operational_mode : str
     array_configuration : str
+    fluxes : tuple of float, optional
+        The already formatted L- and N-band fluxes (see
+        :func:`get_fluxes`).
 
     Returns
     -------
     acquisition : dict
     """
-    acquisition = load_template(TEMPLATE_FILE, "acquisition",
+    acquisition = load_template(get_template_file(), "acquisition",
                                 operational_mode=operational_mode)
 
-    flux_lband, flux_nband = format_fluxes(target)
+    if fluxes is None:
+        fluxes = format_fluxes(target)
+    flux_lband, flux_nband = fluxes
 
     if "GSRa" in target:
         acquisition["COU.AG.ALPHA"] = target["GSRa"]
@@ -320,7 +620,8 @@ def fill_observation(target: Dict,
                      resolution: str,
                      observation_type: str,
                      operational_mode: str,
-                     array_configuration: str) -> Dict:
+                     array_configuration: str,
+                     settings: Optional[Tuple] = None) -> Dict:
     """Gets the for the operational mode correct acquisition template
     and then fills it in with the information from the query.
 
@@ -331,15 +632,20 @@ def fill_observation(target: Dict,
     observation_type : str
     operational_mode : str
     array_configuration : str
+    settings : tuple, optional
+        The already determined observation settings (see
+        :func:`get_observation_settings`).
 
     Returns
     -------
     acquisition : dict
     """
-    observation = load_template(TEMPLATE_FILE, "observation",
+    observation = load_template(get_template_file(), "observation",
                                 operational_mode=operational_mode)
-    resolution, dit, w0, photometry = get_observation_settings(
-            target, resolution, operational_mode, array_configuration)
+    if settings is None:
+        settings = get_observation_settings(
+                target, resolution, operational_mode, array_configuration)
+    resolution, dit, w0, photometry = settings
     observation_type = "SCIENCE" if observation_type == "sci" else "CALIB"
     observation["DPR.CATG"] = observation_type
     observation["INS.DIL.NAME"] = resolution
@@ -355,7 +661,8 @@ def compose_ob(target_name: str,
                operational_mode: Optional[str] = "st",
                sci_name: Optional[str] = None,
                tag: Optional[str] = None,
-               resolution: Optional[str] = "low") -> Dict:
+               resolution: Optional[str] = "low",
+               target: Optional[Dict] = None) -> Dict:
     """Composes the dictionary
 
     Parameters
@@ -374,47 +681,127 @@ def compose_ob(target_name: str,
     tag : str, optional
     resolution : str, optional
         The target's resolution.
+    target : dict, optional
+        The target's already queried information (see
+        :func:`query_many <p2obt.backend.query.query_many>`).
+        If not given, the target is queried.
 
     Returns
     -------
     target : dict
         A dictionary containg all the target's information.
     """
-    array_configuration = array_configuration.lower()
-    if array_configuration not in ["uts", "small", "medium", "large", "extended"]:
-        raise IOError("Unknown array configuration provided!"
-                      " Choose from 'UTs', 'small', 'medium',"
-                      " 'large' or 'extended'.")
+    array_configuration = get_array_configuration(array_configuration)
+    observational_type = get_observational_type(observational_type)
+    operational_mode = get_operational_mode(operational_mode)
+    resolution = get_resolution(resolution)
 
-    observational_type = observational_type.lower()
-    if observational_type not in ["sci", "cal"]:
-        raise IOError("Unknown observation type provided!"
-                      " Choose from 'SCI' or 'CAL', for "
-                      "a science target or a calibrator.")
+    if target is None:
+        from .query import query
+        target = query(target_name)
 
-    operational_mode = operational_mode.lower()
-    if operational_mode in ["st", "standalone"]:
-        operational_mode = "matisse"
-    elif operational_mode in ["gr", "gra4mat"]:
-        operational_mode = "gra4mat"
-    else:
-        raise IOError("Unknown operational mode provided!"
-                      " Choose from 'st'/'standalone' or"
-                      " 'gr'/'gra4mat'.")
+    with measure("compose", observational_type):
+        header = fill_header(target, observational_type,
+                             array_configuration, sci_name, tag)
 
-    resolution = resolution.lower()
-    if resolution not in ["low", "med", "high"]:
-        raise IOError("Unknown resolution provided!"
-                      " Choose from 'low', 'med' or 'high'.")
-
-    target = query(target_name)
-    header = fill_header(target, observational_type,
-                         array_configuration, sci_name, tag)
-
-    acquisition = fill_acquisition(target, operational_mode,
-                                   array_configuration)
+        acquisition = fill_acquisition(target, operational_mode,
+                                       array_configuration)
 
-    observation = fill_observation(target, resolution, observational_type,
-                                   operational_mode, array_configuration)
+        observation = fill_observation(target, resolution, observational_type,
+                                       operational_mode, array_configuration)
     return {"header": header,
             "acquisition": acquisition, "observation": observation}
+
+
+def get_table_column(targets_table: Mapping, column: str,
+                     default: Optional[str] = None) -> List:
+    """Gets a column of the targets' table as a list (or the
+    default for each row if the column does not exist)."""
+    number_of_rows = len(targets_table["name"])
+    if column not in getattr(targets_table, "colnames", targets_table):
+        return [default]*number_of_rows
+    return [None if value is np.ma.masked else value
+            for value in targets_table[column]]
+
+
+def compose_obs(targets_table: Mapping,
+                targets: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+    """Composes the dictionaries of many OBs at once.
+
+    In contrast to :func:`compose_ob` the inputs are validated once per
+    unique value and the fluxes, proper motions, coordinates and
+    observation settings are determined column-wise.
+
+    Parameters
+    ----------
+    targets_table : astropy.table.Table or dict of list
+        A table with one row per OB. It needs the columns "name",
+        "observational_type" and "array_configuration" and can
+        contain the columns "operational_mode" (default "st"),
+        "resolution" (default "low"), "sci_name" and "tag" (see
+        :func:`compose_ob` for their values).
+    targets : dict of dict, optional
+        The targets' already queried information with their names as
+        keys (see :func:`query_many <p2obt.backend.query.query_many>`).
+        Targets not contained are queried.
+
+    Returns
+    -------
+    obs : list of dict
+        The OBs' dictionaries in the order of the table's rows.
+    """
+    names = get_table_column(targets_table, "name")
+    columns = {"observational_type": (get_table_column(
+                   targets_table, "observational_type"), get_observational_type),
+               "array_configuration": (get_table_column(
+                   targets_table, "array_configuration"), get_array_configuration),
+               "operational_mode": (get_table_column(
+                   targets_table, "operational_mode", "st"), get_operational_mode),
+               "resolution": (get_table_column(
+                   targets_table, "resolution", "low"), get_resolution)}
+    for column, (values, validate) in columns.items():
+        validated = {value: validate(str(value)) for value in set(values)}
+        columns[column] = [validated[value] for value in values]
+    sci_names = get_table_column(targets_table, "sci_name")
+    tags = get_table_column(targets_table, "tag")
+
+    targets = {} if targets is None else targets
+    missing_names = [name for name in dict.fromkeys(names) if name not in targets]
+    if missing_names:
+        from .query import query_many
+        targets = {**targets, **query_many(missing_names)}
+    rows = [targets[name] for name in names]
+
+    format_coordinates(rows)
+    with measure("compose", "columns"):
+        prop_ras, prop_decs = get_proper_motions(rows)
+        fluxes_lband, fluxes_nband = get_fluxes(rows)
+
+    settings, obs = {}, []
+    for index, target in enumerate(rows):
+        observational_type = columns["observational_type"][index]
+        array_configuration = columns["array_configuration"][index]
+        operational_mode = columns["operational_mode"][index]
+        resolution = columns["resolution"][index]
+
+        # NOTE: The settings only depend on the target's resolution (if any)
+        resolution_key = "LResUT" if "ut" in array_configuration else "LResAT"
+        settings_key = (target.get(resolution_key), resolution,
+                        operational_mode, array_configuration)
+        if settings_key not in settings:
+            settings[settings_key] = get_observation_settings(
+                    target, resolution, operational_mode, array_configuration)
+
+        with measure("compose", observational_type):
+            header = fill_header(target, observational_type, array_configuration,
+                                 sci_names[index], tags[index],
+                                 (prop_ras[index], prop_decs[index]))
+            acquisition = fill_acquisition(
+                    target, operational_mode, array_configuration,
+                    (fluxes_lband[index].item(), fluxes_nband[index].item()))
+            observation = fill_observation(
+                    target, resolution, observational_type, operational_mode,
+                    array_configuration, settings[settings_key])
+        obs.append({"header": header,
+                    "acquisition": acquisition, "observation": observation})
+    return obs
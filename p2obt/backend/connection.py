@@ -0,0 +1,248 @@
+import logging
+import random
+import time
+from concurrent.futures import Future
+from copy import deepcopy
+from threading import Lock
+from typing import Any, Callable, List, Optional
+
+import p2api
+import requests
+
+from .options import OPTIONS
+
+
+# NOTE: The read-only calls of which identical concurrent calls are coalesced
+COALESCED_METHODS = {"getRuns", "getContainer", "getItems",
+                     "getOB", "getTemplates", "getTemplate"}
+# NOTE: The calls that can be repeated without changing their result and
+# which are retried. Other calls (e.g., unknown posts) are not retried
+IDEMPOTENT_METHODS = COALESCED_METHODS | {
+        "saveOB", "saveTemplate", "setTemplateParams",
+        "deleteOB", "deleteTemplate", "deleteContainer"}
+# NOTE: The calls that create an item (with the created item's type), which
+# are only retried if the item is not found to have been created
+CREATE_METHODS = {"createOB": "OB", "createFolder": "Folder",
+                  "createConcatenation": "Concatenation", "createTemplate": None}
+RETRYABLE_ERRORS = (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout)
+
+
+def get_status_code(error: p2api.P2Error) -> Optional[int]:
+    """Gets the http status code of a `p2api.P2Error`."""
+    if error.args and isinstance(error.args[0], int):
+        return error.args[0]
+    return None
+
+
+def disable_transport_retries(connection: p2api.p2api.ApiConnection) -> None:
+    """Disables the retries of the `p2api.ApiConnection`'s session, as the
+    calls are retried by the :class:`ResilientConnection` instead."""
+    session = getattr(connection, "session", None)
+    if isinstance(session, requests.Session):
+        session.mount("https://", requests.adapters.HTTPAdapter(max_retries=0))
+
+
+def is_retryable(error: Exception) -> bool:
+    """Checks if a failed call can be retried, i.e., if it failed due
+    to a server error (5xx), too many requests (429) or the network."""
+    if isinstance(error, p2api.P2Error):
+        status_code = get_status_code(error)
+        return status_code is not None and (status_code >= 500 or status_code == 429)
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+class ResilientConnection:
+    """A wrapper around the `p2api.ApiConnection` that retries failed calls.
+
+    Calls failing due to server errors, too many requests or the network
+    are retried with an exponential backoff and jitter until the call's
+    deadline. Only the calls that are safe to repeat are retried (see
+    `IDEMPOTENT_METHODS`), while a failed creation is first looked up by
+    its name (as the response might have been lost after the item was
+    created) and only created again if it was not found. If the session
+    expired (401) the connection logs in again.
+    Identical concurrent read-only calls are coalesced into one call.
+    The settings are taken from `OPTIONS.upload.retry`.
+
+    Parameters
+    ----------
+    connection : p2api.p2api.ApiConnection
+        The P2 python api connection.
+    relogin : callable, optional
+        A function returning a newly logged in connection. If "None"
+        an expired session is not renewed.
+    seed : int, optional
+        The seed for the backoff's jitter.
+    """
+
+    def __init__(self, connection: p2api.p2api.ApiConnection,
+                 relogin: Optional[Callable[[], p2api.p2api.ApiConnection]] = None,
+                 seed: Optional[int] = None) -> None:
+        self.connection, self.relogin = connection, relogin
+        self.lock, self.in_flight = Lock(), {}
+        disable_transport_retries(connection)
+        self.generator = random.Random(seed)
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.connection, name)
+        if not callable(attribute) or name.startswith("_"):
+            return attribute
+        return lambda *args: self.call(name, *args)
+
+    def renew(self, connection: p2api.p2api.ApiConnection) -> None:
+        """Logs in again, unless the connection was already renewed."""
+        with self.lock:
+            if connection is not self.connection:
+                return
+            print("[INFO]: Session expired. Logging in again...")
+            self.connection = self.relogin()
+            disable_transport_retries(self.connection)
+
+    def get_backoff(self, attempt: int) -> float:
+        """Gets the delay before a retry (exponential backoff with full jitter)."""
+        retry = OPTIONS.upload.retry
+        with self.lock:
+            return self.generator.uniform(0, min(retry.max_backoff,
+                                                 retry.backoff*2**attempt))
+
+    def get_item_ids(self, method: str, container_id: int, name: str) -> List[int]:
+        """Gets the ids of the items in a container that have the name and the
+        type of the items created by the method."""
+        items, _ = self.call("getItems", container_id)
+        id_key = "obId" if CREATE_METHODS[method] == "OB" else "containerId"
+        return [item[id_key] for item in items
+                if item["itemType"] == CREATE_METHODS[method] and item["name"] == name]
+
+    def find_created(self, method: str, existing_ids: List[int], *args) -> Optional[Any]:
+        """Finds the item that a failed call of a create method created.
+
+        Parameters
+        ----------
+        method : str
+            The name of the create method.
+        existing_ids : list of int
+            The ids of the items with the same name that existed before.
+        *args
+            The method's arguments.
+
+        Returns
+        -------
+        response : any, optional
+            The created item and its version as if returned by the method
+            or "None" if the item was not created.
+        """
+        if method == "createTemplate":
+            ob_id, name = args
+            templates, _ = self.call("getTemplates", ob_id)
+            template_ids = [template["templateId"] for template in templates
+                            if template["templateName"] == name]
+            if not template_ids:
+                return None
+            return self.call("getTemplate", ob_id, template_ids[-1])
+
+        item_ids = [item_id for item_id in self.get_item_ids(method, *args)
+                    if item_id not in existing_ids]
+        if not item_ids:
+            return None
+        if CREATE_METHODS[method] == "OB":
+            return self.call("getOB", item_ids[-1])
+        return self.call("getContainer", item_ids[-1])
+
+    def retry(self, method: str, *args) -> Any:
+        """Calls a method of the connection and retries it on failure,
+        if it is safe to repeat or, for a create method, if the item was
+        not created.
+
+        Parameters
+        ----------
+        method : str
+            The name of the connection's method.
+        *args
+            The method's arguments.
+
+        Returns
+        -------
+        response : any
+            The method's response.
+        """
+        retry = OPTIONS.upload.retry
+        deadline = time.monotonic() + retry.deadlines.get(method, retry.deadline)
+        attempt, renewed = 0, False
+
+        # NOTE: Containers of the same name can already exist (e.g., from an
+        # earlier upload), so these are excluded when looking up a created one
+        existing_ids = []
+        if method in CREATE_METHODS and CREATE_METHODS[method] not in [None, "OB"]:
+            existing_ids = self.get_item_ids(method, *args)
+
+        while True:
+            connection = self.connection
+            try:
+                if attempt > 0 and method in CREATE_METHODS:
+                    response = self.find_created(method, existing_ids, *args)
+                    if response is not None:
+                        logging.warning(f"[WARNING]: '{method}' succeeded despite"
+                                        " its failure. Not created again.")
+                        return response
+                return getattr(connection, method)(*args)
+            except (p2api.P2Error, *RETRYABLE_ERRORS) as error:
+                if isinstance(error, p2api.P2Error) and get_status_code(error) == 401\
+                        and self.relogin is not None and not renewed:
+                    self.renew(connection)
+                    renewed = True
+                    continue
+                # NOTE: A repeated deletion fails if the first one succeeded
+                if attempt > 0 and method.startswith("delete")\
+                        and isinstance(error, p2api.P2Error) and get_status_code(error) == 404:
+                    return None, None
+                if not is_retryable(error) or attempt >= retry.attempts\
+                        or method not in IDEMPOTENT_METHODS | CREATE_METHODS.keys():
+                    raise
+                delay = self.get_backoff(attempt)
+                if time.monotonic() + delay > deadline:
+                    raise
+                logging.warning(f"[WARNING]: Retrying '{method}' in {delay:.2f} s"
+                                f" after: {error}")
+                time.sleep(delay)
+                attempt += 1
+
+    def call(self, method: str, *args) -> Any:
+        """Calls a method of the connection with retries and coalesces
+        identical concurrent read-only calls.
+
+        Parameters
+        ----------
+        method : str
+            The name of the connection's method.
+        *args
+            The method's arguments.
+
+        Returns
+        -------
+        response : any
+            The method's response.
+        """
+        if method not in COALESCED_METHODS:
+            return self.retry(method, *args)
+
+        key = (method, args)
+        with self.lock:
+            future = self.in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self.in_flight[key] = Future()
+
+        if not is_owner:
+            return deepcopy(future.result())
+
+        try:
+            response = self.retry(method, *args)
+            future.set_result(response)
+            return deepcopy(response)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
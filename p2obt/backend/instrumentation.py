@@ -0,0 +1,136 @@
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterator, Optional
+
+from .options import OPTIONS
+
+
+# NOTE: The upper bounds of the latency histograms' bins (in seconds)
+BINS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1., 5., 10., 30., float("inf")]
+MEASUREMENTS = {}
+MEASUREMENTS_LOCK = Lock()
+
+
+def record(stage: str, label: str, duration: float) -> None:
+    """Records the duration of a call.
+
+    Parameters
+    ----------
+    stage : str
+        The stage of the call (e.g., "catalog" or "p2").
+    label : str
+        The label of the call within the stage (e.g., the catalog's
+        name or the p2 endpoint).
+    duration : float
+        The duration of the call (in seconds).
+    """
+    with MEASUREMENTS_LOCK:
+        measurement = MEASUREMENTS.setdefault(stage, {}).setdefault(
+                label, {"count": 0, "total": 0., "min": float("inf"),
+                        "max": 0., "histogram": [0]*len(BINS)})
+        measurement["count"] += 1
+        measurement["total"] += duration
+        measurement["min"] = min(measurement["min"], duration)
+        measurement["max"] = max(measurement["max"], duration)
+        measurement["histogram"][next(index for index, upper_bound in enumerate(BINS)
+                                      if duration <= upper_bound)] += 1
+
+
+@contextmanager
+def measure(stage: str, label: Optional[str] = None) -> Iterator[None]:
+    """Measures the duration of the enclosed block, if the
+    instrumentation is active (see `OPTIONS.instrumentation.active`).
+
+    Failed calls are recorded as well.
+
+    Parameters
+    ----------
+    stage : str
+        The stage of the call (e.g., "catalog" or "p2").
+    label : str, optional
+        The label of the call within the stage. By default "all".
+    """
+    if not OPTIONS.instrumentation.active:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, "all" if label is None else str(label),
+               time.perf_counter() - start)
+
+
+def get_measurements() -> Dict[str, Dict[str, Dict]]:
+    """Gets the recorded measurements.
+
+    Returns
+    -------
+    measurements : dict of dict
+        The count, total, mean, minimum and maximum duration (in seconds)
+        as well as the latency histogram of each stage and label. The
+        histogram's keys are the bins' upper bounds.
+    """
+    measurements = {}
+    with MEASUREMENTS_LOCK:
+        for stage, labels in MEASUREMENTS.items():
+            measurements[stage] = {}
+            for label, measurement in labels.items():
+                measurements[stage][label] = {
+                        "count": measurement["count"],
+                        "total": measurement["total"],
+                        "mean": measurement["total"]/measurement["count"],
+                        "min": measurement["min"], "max": measurement["max"],
+                        "histogram": {str(upper_bound): count for upper_bound, count
+                                      in zip(BINS, measurement["histogram"])}}
+    return measurements
+
+
+def reset_measurements() -> None:
+    """Removes all recorded measurements."""
+    with MEASUREMENTS_LOCK:
+        MEASUREMENTS.clear()
+
+
+def dump_measurements(file: Optional[Path] = None) -> Path:
+    """Dumps the recorded measurements as a (.json)-file.
+
+    Parameters
+    ----------
+    file : path, optional
+        The (.json)-file. By default `OPTIONS.instrumentation.file`
+        or, if not set, "p2obt_instrumentation.json" in the log's
+        directory.
+
+    Returns
+    -------
+    file : path
+    """
+    if file is None:
+        file = OPTIONS.instrumentation.file
+    if file is None:
+        file = Path(OPTIONS.log.path) / "p2obt_instrumentation.json"
+    file = Path(file)
+    file.parent.mkdir(parents=True, exist_ok=True)
+    with open(file, "w", encoding="utf-8") as json_file:
+        json.dump(get_measurements(), json_file, indent=2)
+    return file
+
+
+def print_measurements() -> None:
+    """Prints a summary of the recorded measurements."""
+    measurements = get_measurements()
+    if not measurements:
+        return
+
+    print(f"{'':-^50}")
+    print(f"{'stage':<12} {'label':<18} {'count':>6} {'total [s]':>10} {'mean [s]':>9}")
+    for stage, labels in measurements.items():
+        for label, measurement in sorted(labels.items(),
+                                         key=lambda x: -x[1]["total"]):
+            print(f"{stage:<12} {label[:18]:<18} {measurement['count']:>6}"
+                  f" {measurement['total']:>10.3f} {measurement['mean']:>9.4f}")
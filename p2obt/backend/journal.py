@@ -0,0 +1,135 @@
+import hashlib
+import json
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional, Tuple
+from warnings import warn
+
+from .options import OPTIONS
+
+
+def get_journal_file(key: Optional[str] = None) -> Path:
+    """Gets the journal file. Either the user-supplied one
+    (`OPTIONS.upload.journal`) or one per key (e.g., the night plan
+    or the container id) in the log's directory."""
+    if OPTIONS.upload.journal is not None:
+        return Path(OPTIONS.upload.journal)
+    if key is None:
+        return Path(OPTIONS.log.path) / "p2obt_journal.jsonl"
+    key_hash = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return Path(OPTIONS.log.path) / f"p2obt_journal_{key_hash}.jsonl"
+
+
+def get_ob_hash(ob: Dict) -> str:
+    """Gets the hash of a composed OB."""
+    content = json.dumps(ob, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class Journal:
+    """A checkpoint journal of the containers and OBs created on p2.
+
+    Each created container and uploaded OB is appended as a line of
+    json to the journal file as soon as it is completed. When resuming,
+    the already journaled containers are reused and the already uploaded
+    OBs are skipped (or updated if their input changed).
+
+    The journal file is only cleared if explicitly asked for. Runs that
+    do not resume append to it, so an interrupted run's entries are
+    kept until it is resumed.
+
+    Parameters
+    ----------
+    file : path, optional
+        The journal file. By default the one of the key
+        (see :func:`get_journal_file`).
+    resume : bool, optional
+        If 'True' the existing journal is read and continued.
+    key : str, optional
+        The key of the journal file (e.g., the night plan or the
+        container id), so unrelated uploads do not share a journal.
+    clear : bool, optional
+        If 'True' the existing journal is cleared and a new one is started.
+
+    Notes
+    -----
+    If the journal file can not be accessed, the journal is deactivated,
+    i.e., the upload continues without writing checkpoints.
+    """
+
+    def __init__(self, file: Optional[Path] = None,
+                 resume: Optional[bool] = False,
+                 key: Optional[str] = None,
+                 clear: Optional[bool] = False) -> None:
+        self.file = get_journal_file(key) if file is None else Path(file)
+        self.lock, self.containers, self.obs = Lock(), {}, {}
+        self.active = True
+        try:
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            if clear:
+                self.file.write_text("", encoding="utf-8")
+            elif resume and self.file.exists():
+                self.read()
+        except OSError:
+            self.deactivate()
+
+    def deactivate(self) -> None:
+        """Deactivates the journal, if its file can not be accessed."""
+        self.active = False
+        warn(f"[WARNING]: Could not access the journal '{self.file}'!"
+             " Continuing without checkpoints.")
+
+    def read(self) -> None:
+        """Reads the entries of the journal file."""
+        with open(self.file, "r", encoding="utf-8") as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # NOTE: The last line may be incomplete if the process died
+                    continue
+                if entry["type"] == "container":
+                    self.containers[(entry["parent"], entry["name"],
+                                     entry["mode"])] = entry["id"]
+                elif entry["type"] == "ob":
+                    self.obs[(entry["container"], entry["name"])] = (entry["id"],
+                                                                    entry["hash"])
+
+    def write(self, entry: Dict) -> None:
+        """Appends an entry to the journal file."""
+        if not self.active:
+            return
+        try:
+            with open(self.file, "a", encoding="utf-8") as journal_file:
+                journal_file.write(json.dumps(entry) + "\n")
+        except OSError:
+            self.deactivate()
+
+    def get_container(self, parent_id: int, name: str,
+                      observational_mode: str) -> Optional[int]:
+        """Gets the id of an already created container (or "None")."""
+        with self.lock:
+            return self.containers.get((parent_id, name, observational_mode))
+
+    def add_container(self, parent_id: int, name: str,
+                      observational_mode: str, container_id: int) -> None:
+        """Journals a created container."""
+        with self.lock:
+            self.containers[(parent_id, name, observational_mode)] = container_id
+            self.write({"type": "container", "parent": parent_id, "name": name,
+                        "mode": observational_mode, "id": container_id})
+
+    def get_ob(self, container_id: int, ob_name: str) -> Tuple[Optional[int], Optional[str]]:
+        """Gets the id and the input hash of an already uploaded OB
+        (or "None" for both)."""
+        with self.lock:
+            return self.obs.get((container_id, ob_name), (None, None))
+
+    def add_ob(self, container_id: int, ob_name: str,
+               ob_id: int, ob_hash: Optional[str]) -> None:
+        """Journals an uploaded OB. Incomplete OBs are journaled
+        without a hash."""
+        with self.lock:
+            self.obs[(container_id, ob_name)] = (ob_id, ob_hash)
+            self.write({"type": "ob", "container": container_id,
+                        "name": ob_name, "id": ob_id, "hash": ob_hash})
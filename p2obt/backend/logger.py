@@ -0,0 +1,100 @@
+import atexit
+import logging
+import os
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from queue import SimpleQueue
+from threading import RLock
+from types import SimpleNamespace
+from typing import Optional
+
+from .options import OPTIONS
+
+
+# NOTE: The set up log file, its handler and (if non-blocking) the queue's listener
+LOGGING = SimpleNamespace(file=None, handler=None, listener=None)
+LOGGING_LOCK = RLock()
+
+
+def get_log_file() -> Path:
+    """Gets the log file. Either the user-supplied one (`OPTIONS.log.file`)
+    or one per process in the log's directory (`OPTIONS.log.path`).
+
+    The file is determined once and does not need to exist yet
+    (see :func:`setup_logging`).
+    """
+    with LOGGING_LOCK:
+        if LOGGING.file is None:
+            if OPTIONS.log.file is not None:
+                LOGGING.file = Path(OPTIONS.log.file)
+            else:
+                timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+                LOGGING.file = Path(OPTIONS.log.path)\
+                    / f"p2obt_{timestamp}_{os.getpid()}.log"
+        return LOGGING.file
+
+
+def setup_logging(file: Optional[Path] = None,
+                  queue: Optional[bool] = None) -> Path:
+    """Sets up the logging to a file.
+
+    Nothing is written to disk before this is called. Calling it again
+    has no effect, unless the logging was stopped (see :func:`stop_logging`).
+
+    Parameters
+    ----------
+    file : path, optional
+        The log file. By default :func:`get_log_file`.
+    queue : bool, optional
+        If 'True' the records are written by a background thread, so
+        logging does not block. By default `OPTIONS.log.queue`.
+
+    Returns
+    -------
+    file : path
+        The log file.
+    """
+    with LOGGING_LOCK:
+        if LOGGING.handler is not None:
+            return LOGGING.file
+
+        if file is not None:
+            LOGGING.file = Path(file)
+        file = get_log_file()
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(file, mode="w", encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter(OPTIONS.log.format))
+
+        queue = OPTIONS.log.queue if queue is None else queue
+        if queue:
+            records = SimpleQueue()
+            LOGGING.listener = QueueListener(records, file_handler)
+            LOGGING.listener.start()
+            LOGGING.handler = QueueHandler(records)
+        else:
+            LOGGING.handler = file_handler
+
+        root_logger = logging.getLogger()
+        root_logger.addHandler(LOGGING.handler)
+        root_logger.setLevel(OPTIONS.log.level)
+        return file
+
+
+def stop_logging() -> None:
+    """Stops the logging to the file and flushes the
+    remaining records (see :func:`setup_logging`)."""
+    with LOGGING_LOCK:
+        if LOGGING.handler is None:
+            return
+
+        logging.getLogger().removeHandler(LOGGING.handler)
+        if LOGGING.listener is not None:
+            LOGGING.listener.stop()
+            for handler in LOGGING.listener.handlers:
+                handler.close()
+        LOGGING.handler.close()
+        LOGGING.file = LOGGING.handler = LOGGING.listener = None
+
+
+atexit.register(stop_logging)
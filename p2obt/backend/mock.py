@@ -0,0 +1,366 @@
+import hashlib
+import pickle
+import random
+import time
+from copy import deepcopy
+from functools import wraps
+from pathlib import Path
+from threading import Lock, local
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import p2api
+from astropy.table import Table
+
+from .cache import normalize_name
+from .options import OPTIONS
+
+
+def get_random_generator(*keys: str) -> random.Random:
+    """Gets a random generator that is seeded by the given keys."""
+    seed = hashlib.sha256("/".join(keys).encode("utf-8")).hexdigest()
+    return random.Random(int(seed[:16], 16))
+
+
+def make_mock_catalog(name: str, catalog: str) -> Table:
+    """Makes a synthetic, but deterministic, table for a target's
+    catalog query.
+
+    The table contains the columns queried from the catalog
+    (see `OPTIONS.catalogs.<catalog>.query`).
+
+    Parameters
+    ----------
+    name : str
+        The target's name.
+    catalog : str
+        The catalog's name.
+
+    Returns
+    -------
+    catalog_table : Table
+    """
+    generator = get_random_generator(normalize_name(name), catalog)
+    if catalog == "simbad":
+        ra, dec = generator.uniform(0, 24), generator.uniform(-89, 89)
+        ra_hms = (int(ra), int(ra % 1*60), ra*3600 % 60)
+        dec_dms = (abs(int(dec)), int(abs(dec) % 1*60), abs(dec)*3600 % 60)
+        return Table({"MAIN_ID": [name],
+                      "RA": ["{:02d} {:02d} {:07.4f}".format(*ra_hms)],
+                      "DEC": ["{}{:02d} {:02d} {:06.3f}".format(
+                          "-" if dec < 0 else "+", *dec_dms)],
+                      "SP_TYPE": [generator.choice(["A0V", "G2V", "K0III", "M1III"])],
+                      "PMRA": [generator.uniform(-50, 50)],
+                      "PMDEC": [generator.uniform(-50, 50)],
+                      "FLUX_V": [generator.uniform(2, 12)],
+                      "FLUX_H": [generator.uniform(0, 8)],
+                      "FLUX_K": [generator.uniform(0, 8)]})
+
+    # NOTE: The entries are placed within 2 arcsec of the target's Simbad position
+    nrows = generator.randint(1, 3)
+    position = get_random_generator(normalize_name(name), "simbad")
+    ra, dec = position.uniform(0, 24)*15, position.uniform(-89, 89)
+    columns = {"_RAJ2000": [ra + generator.uniform(-2, 2)/3600/np.cos(np.radians(dec))
+                            for _ in range(nrows)],
+               "_DEJ2000": [dec + generator.uniform(-2, 2)/3600 for _ in range(nrows)]}
+    for query_key in getattr(OPTIONS.catalogs, catalog).query:
+        if "mag" in query_key:
+            columns[query_key] = [generator.uniform(0, 12) for _ in range(nrows)]
+        else:
+            columns[query_key] = [generator.uniform(-50, 50) for _ in range(nrows)]
+    return Table(columns)
+
+
+def get_fixture_file(name: str, catalog: str) -> Path:
+    """Gets the file of a recorded catalog query."""
+    name = normalize_name(name).replace(" ", "_").replace("/", "_")
+    return Path(OPTIONS.catalogs.mock.path) / catalog / f"{name}.pkl"
+
+
+def record_catalog(name: str, catalog: str, catalog_table: Optional[Table]) -> None:
+    """Records a catalog query as a fixture, if the recording
+    is activated (see `OPTIONS.catalogs.mock.record`)."""
+    if not OPTIONS.catalogs.mock.record or OPTIONS.catalogs.mock.path is None:
+        return
+    fixture_file = get_fixture_file(name, catalog)
+    fixture_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(fixture_file, "wb") as pickle_file:
+        pickle.dump(catalog_table if catalog_table else None, pickle_file)
+
+
+def query_mock_catalog(name: str, catalog: str) -> Optional[Table]:
+    """Queries the stand-in for a catalog.
+
+    Recorded fixtures (see `OPTIONS.catalogs.mock.path`) are returned if
+    they exist, otherwise a synthetic table (see :func:`make_mock_catalog`).
+    The stand-in's latency can be set via `OPTIONS.catalogs.mock.latency`.
+
+    Parameters
+    ----------
+    name : str
+        The target's name.
+    catalog : str
+        The catalog's name.
+
+    Returns
+    -------
+    catalog_table : Table, optional
+    """
+    time.sleep(OPTIONS.catalogs.mock.latency)
+    if OPTIONS.catalogs.mock.path is not None:
+        try:
+            with open(get_fixture_file(name, catalog), "rb") as pickle_file:
+                return pickle.load(pickle_file)
+        except OSError:
+            pass
+    return make_mock_catalog(name, catalog)
+
+
+def api_call(method: Callable) -> Callable:
+    """Raises the failure of a call that is injected after its side
+    effect (see :meth:`MockApiConnection.request`)."""
+    @wraps(method)
+    def wrapper(self, *args):
+        try:
+            response = method(self, *args)
+        finally:
+            error, self.pending.error = getattr(self.pending, "error", None), None
+        if error is not None:
+            raise error
+        return response
+    return wrapper
+
+
+class MockApiConnection:
+    """An in-process stand-in for the `p2api.ApiConnection`.
+
+    It keeps the runs, containers, OBs and templates in memory and
+    supports the calls made by p2obt. Each call can be slowed down
+    by a latency and fail randomly with a `p2api.P2Error`, either before
+    or after its side effect (e.g., a lost response to a created OB).
+
+    Parameters
+    ----------
+    latency : float, optional
+        The latency of each call (in seconds).
+    failure_rate : float, optional
+        The probability (0 to 1) of a call failing.
+    runs : list of str, optional
+        The runs' program ids. By default one run "110.2474.004".
+    seed : int, optional
+        The seed for the failure injection.
+    failure_mode : str, optional
+        Either "before" (the default) or "after", if the calls fail
+        before or after their side effect.
+    """
+
+    def __init__(self, latency: Optional[float] = 0.,
+                 failure_rate: Optional[float] = 0.,
+                 runs: Optional[List[str]] = None,
+                 seed: Optional[int] = None,
+                 failure_mode: Optional[str] = "before") -> None:
+        if failure_mode not in ["before", "after"]:
+            raise ValueError(f"Failure mode '{failure_mode}' is not supported!")
+        self.latency, self.failure_rate = latency, failure_rate
+        self.failure_mode, self.pending = failure_mode, local()
+        self.request_count, self.lock = 0, Lock()
+        self.generator = random.Random(seed)
+        self.ids, self.runs = 0, []
+        self.containers, self.items, self.obs, self.templates = {}, {}, {}, {}
+        for prog_id in ["110.2474.004"] if runs is None else runs:
+            container_id = self.new_id()
+            self.containers[container_id] = {"containerId": container_id,
+                                             "itemType": "Run", "name": prog_id,
+                                             "parentContainerId": None}
+            self.items[container_id] = []
+            self.runs.append({"progId": prog_id, "containerId": container_id,
+                              "runId": container_id, "instrument": "MATISSE"})
+
+    def new_id(self) -> int:
+        """Gets a new unique id."""
+        self.ids += 1
+        return self.ids
+
+    def request(self, method: str, url: str) -> None:
+        """Simulates a request's latency and failure.
+
+        If the calls fail after their side effect, the failure is
+        raised once the call is done (see :func:`api_call`).
+        """
+        time.sleep(self.latency)
+        with self.lock:
+            self.request_count += 1
+            if self.generator.random() < self.failure_rate:
+                error = p2api.P2Error(503, method, url, "injected failure")
+                if self.failure_mode == "before":
+                    raise error
+                self.pending.error = error
+
+    def get_container(self, container_id: int) -> Dict:
+        """Gets a container or raises a `p2api.P2Error`."""
+        if container_id not in self.containers:
+            raise p2api.P2Error(404, "GET", f"/containers/{container_id}",
+                                "container not found")
+        return self.containers[container_id]
+
+    def get_ob(self, ob_id: int) -> Dict:
+        """Gets an OB or raises a `p2api.P2Error`."""
+        if ob_id not in self.obs:
+            raise p2api.P2Error(404, "GET", f"/obsBlocks/{ob_id}", "OB not found")
+        return self.obs[ob_id]
+
+    @api_call
+    def getRuns(self) -> Tuple[List[Dict], str]:
+        self.request("GET", "/obsRuns")
+        return deepcopy(self.runs), "0"
+
+    @api_call
+    def getContainer(self, containerId: int) -> Tuple[Dict, str]:
+        self.request("GET", f"/containers/{containerId}")
+        with self.lock:
+            return deepcopy(self.get_container(containerId)), "0"
+
+    @api_call
+    def deleteContainer(self, containerId: int, version: str) -> Tuple[None, None]:
+        self.request("DELETE", f"/containers/{containerId}")
+        with self.lock:
+            container = self.get_container(containerId)
+            if self.items[containerId]:
+                raise p2api.P2Error(409, "DELETE", f"/containers/{containerId}",
+                                    "container is not empty")
+            self.items[container["parentContainerId"]].remove(containerId)
+            del self.items[containerId]
+            del self.containers[containerId]
+        return None, None
+
+    @api_call
+    def createItem(self, itemType: str, containerId: int, name: str) -> Tuple[Dict, str]:
+        self.request("POST", f"/containers/{containerId}/items")
+        with self.lock:
+            self.get_container(containerId)
+            item_id = self.new_id()
+            if itemType == "OB":
+                item = {"obId": item_id, "itemType": itemType, "name": name,
+                        "parentContainerId": containerId, "instrument": "MATISSE",
+                        "obsDescription": {"name": name, "userComments": "",
+                                           "instrumentComments": ""},
+                        "target": {}, "constraints": {}, "version": 1}
+                self.obs[item_id] = item
+                self.templates[item_id] = []
+            else:
+                item = {"containerId": item_id, "itemType": itemType,
+                        "name": name, "parentContainerId": containerId}
+                self.containers[item_id] = item
+                self.items[item_id] = []
+            self.items[containerId].append(item_id)
+            return deepcopy(item), "1"
+
+    @api_call
+    def createOB(self, containerId: int, name: str) -> Tuple[Dict, str]:
+        return self.createItem("OB", containerId, name)
+
+    @api_call
+    def createFolder(self, containerId: int, name: str) -> Tuple[Dict, str]:
+        return self.createItem("Folder", containerId, name)
+
+    @api_call
+    def createConcatenation(self, containerId: int, name: str) -> Tuple[Dict, str]:
+        return self.createItem("Concatenation", containerId, name)
+
+    @api_call
+    def getItems(self, containerId: int) -> Tuple[List[Dict], str]:
+        self.request("GET", f"/containers/{containerId}/items")
+        with self.lock:
+            self.get_container(containerId)
+            items = [self.obs[item_id] if item_id in self.obs
+                     else self.containers[item_id]
+                     for item_id in self.items[containerId]]
+            return deepcopy(items), "0"
+
+    @api_call
+    def getOB(self, obId: int) -> Tuple[Dict, str]:
+        self.request("GET", f"/obsBlocks/{obId}")
+        with self.lock:
+            ob = self.get_ob(obId)
+            return deepcopy(ob), str(ob["version"])
+
+    @api_call
+    def saveOB(self, ob: Dict, version: str) -> Tuple[Dict, str]:
+        self.request("PUT", f"/obsBlocks/{ob['obId']}")
+        with self.lock:
+            saved_ob = self.get_ob(ob["obId"])
+            saved_ob.update(deepcopy(ob))
+            saved_ob["version"] += 1
+            return deepcopy(saved_ob), str(saved_ob["version"])
+
+    @api_call
+    def deleteOB(self, obId: int, version: str) -> Tuple[None, None]:
+        self.request("DELETE", f"/obsBlocks/{obId}")
+        with self.lock:
+            ob = self.get_ob(obId)
+            self.items[ob["parentContainerId"]].remove(obId)
+            del self.obs[obId], self.templates[obId]
+        return None, None
+
+    @api_call
+    def createTemplate(self, obId: int, name: str) -> Tuple[Dict, str]:
+        self.request("POST", f"/obsBlocks/{obId}/templates")
+        with self.lock:
+            self.get_ob(obId)
+            template = {"templateId": self.new_id(), "templateName": name,
+                        "type": "acquisition" if "acq" in name else "science",
+                        "parameters": []}
+            self.templates[obId].append(template)
+            return deepcopy(template), "1"
+
+    @api_call
+    def getTemplates(self, obId: int) -> Tuple[List[Dict], str]:
+        self.request("GET", f"/obsBlocks/{obId}/templates")
+        with self.lock:
+            self.get_ob(obId)
+            return deepcopy(self.templates[obId]), "0"
+
+    @api_call
+    def getTemplate(self, obId: int, templateId: int) -> Tuple[Dict, str]:
+        self.request("GET", f"/obsBlocks/{obId}/templates/{templateId}")
+        with self.lock:
+            self.get_ob(obId)
+            for template in self.templates[obId]:
+                if template["templateId"] == templateId:
+                    return deepcopy(template), "0"
+        raise p2api.P2Error(404, "GET", f"/obsBlocks/{obId}/templates/{templateId}",
+                            "template not found")
+
+    @api_call
+    def saveTemplate(self, obId: int, template: Dict, version: str) -> Tuple[Dict, str]:
+        self.request("PUT", f"/obsBlocks/{obId}/templates/{template['templateId']}")
+        with self.lock:
+            self.get_ob(obId)
+            for index, saved_template in enumerate(self.templates[obId]):
+                if saved_template["templateId"] == template["templateId"]:
+                    self.templates[obId][index] = deepcopy(template)
+                    return deepcopy(template), "1"
+        raise p2api.P2Error(404, "PUT", f"/obsBlocks/{obId}/templates",
+                            "template not found")
+
+    @api_call
+    def setTemplateParams(self, obId: int, template: Dict,
+                          params: Dict[str, Any], version: str) -> Tuple[Dict, str]:
+        template = deepcopy(template)
+        parameters = {parameter["name"]: parameter for parameter in template["parameters"]}
+        for key, value in params.items():
+            if isinstance(value, np.generic):
+                value = value.item()
+            parameters.setdefault(key, {"name": key, "type": type(value).__name__})
+            parameters[key]["value"] = value
+        template["parameters"] = list(parameters.values())
+        return self.saveTemplate(obId, template, version)
+
+    @api_call
+    def deleteTemplate(self, obId: int, templateId: int, version: str) -> Tuple[None, None]:
+        self.request("DELETE", f"/obsBlocks/{obId}/templates/{templateId}")
+        with self.lock:
+            self.get_ob(obId)
+            self.templates[obId] = [template for template in self.templates[obId]
+                                    if template["templateId"] != templateId]
+        return None, None
@@ -2,11 +2,16 @@ import logging
 from types import SimpleNamespace
 from pathlib import Path
 
-# NOTE: General settings for the logging
+# NOTE: General settings for the logging. The logging is set up by `create_obs`
+# and `create_ob` (see `p2obt.backend.logger.setup_logging`). If the file is
+# "None", a file per process is created in the path. If queue is 'True', the
+# records are written by a background thread
 log = SimpleNamespace(
         path=Path.home() / "Documents" / "logs",
+        file=None,
         level=logging.DEBUG,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        queue=False
         )
 
 # NOTE: The settings for the `create_obs` and `create_ob`-scripts.
@@ -44,6 +49,12 @@ dit = SimpleNamespace(
             uts=SimpleNamespace(low=0.6, med=0.6, high=0.6))
         )
 
+# NOTE: Set a user-supplied templates (.toml)-file. If "None", the
+# templates shipped with p2obt are used.
+templates = SimpleNamespace(
+        file=None
+        )
+
 # NOTE: Set the weather constraints.
 constraints = SimpleNamespace(
         pwv=10,
@@ -51,6 +62,53 @@ constraints = SimpleNamespace(
         transparency="clear"
         )
 
+# NOTE: The in-process stand-in for p2 (used with the server "mock")
+# with a latency (in seconds) and a failure rate (0 to 1) per call.
+mock_p2 = SimpleNamespace(
+        latency=0.,
+        failure_rate=0.,
+        # NOTE: If the calls fail "before" or "after" their side effect
+        failure_mode="before",
+        seed=None
+        )
+
+# NOTE: The retries of failed p2 calls (server errors, too many requests
+# or network errors). Only the calls that are safe to repeat (reads, updates
+# and deletions) and the creations (once the item was not found to be
+# created) are retried. The calls are retried with an exponential backoff
+# (in seconds) and jitter until the number of attempts or the call's
+# deadline (in seconds, can be set per method) is exceeded. The OBs that
+# still failed are retried (for a number of rounds) at the end of the run.
+retry = SimpleNamespace(
+        attempts=5,
+        backoff=0.5,
+        max_backoff=30.,
+        deadline=120.,
+        deadlines={},
+        rounds=1
+        )
+
+# NOTE: The settings for the upload to p2
+upload = SimpleNamespace(
+        # NOTE: The maximum number of blocks (OBs in one container) that are
+        # uploaded concurrently and with it the maximum number of requests in flight
+        workers=4,
+        # NOTE: The maximum number of blocks composed ahead of their upload
+        queue_size=8,
+        # NOTE: The checkpoint journal of the created containers and uploaded OBs
+        # from which an interrupted upload can be resumed. If "None", a journal
+        # per night plan (or container id) is placed in the log's directory
+        journal=None,
+        retry=retry,
+        mock=mock_p2
+        )
+
+# NOTE: The settings for the (.obx)-files. The number of workers is the
+# maximum number of files that are written concurrently.
+output = SimpleNamespace(
+        workers=8
+        )
+
 # NOTE: The settings for the `query`-script
 # TODO: Implement the backup target source?
 local = SimpleNamespace(
@@ -62,37 +120,43 @@ local = SimpleNamespace(
 gaia = SimpleNamespace(
         catalog="I/345/gaia2",
         fields=["*"],
-        query=["Gmag", "pmRA", "pmDE"]
+        query=["Gmag", "pmRA", "pmDE"],
+        timeout=30.
         )
 
 tycho = SimpleNamespace(
         catalog="I/350/tyc2tdsc",
         fields=["*", "e_BTmag", "e_VTmag"],
-        query=["VTmag"]
+        query=["VTmag"],
+        timeout=30.
         )
 
 nomad = SimpleNamespace(
         catalog="I/297/out",
         fields=["*"],
-        query=["Vmag"]
+        query=["Vmag"],
+        timeout=30.
         )
 
 two_mass = SimpleNamespace(
         catalog="II/246/out",
         fields=["*"],
-        query=["Jmag", "Hmag", "Kmag"]
+        query=["Jmag", "Hmag", "Kmag"],
+        timeout=30.
         )
 
 wise = SimpleNamespace(
         catalog="II/311/wise",
         fields=["*"],
-        query=["W1mag", "W3mag", "Hmag", "Kmag"]
+        query=["W1mag", "W3mag", "Hmag", "Kmag"],
+        timeout=30.
         )
 
 mdfc = SimpleNamespace(
         catalog="II/361/mdfc-v10",
         fields=["**"],
-        query=["med-Lflux", "med-Nflux", "Hmag", "Kmag"]
+        query=["med-Lflux", "med-Nflux", "Hmag", "Kmag"],
+        timeout=30.
         )
 
 simbad = SimpleNamespace(
@@ -108,7 +172,8 @@ simbad = SimpleNamespace(
                 "flux(H)", "flux_error(H)",
                 "flux(K)", "flux_error(K)"],
         query=["SP_TYPE", "RA", "DEC", "PMRA",
-               "PMDEC", "FLUX_V", "FLUX_H", "FLUX_K"]
+               "PMDEC", "FLUX_V", "FLUX_H", "FLUX_K"],
+        timeout=30.
         )
 
 irsa = SimpleNamespace(
@@ -118,21 +183,54 @@ irsa = SimpleNamespace(
         )
 
 
+# NOTE: The on-disk cache for the catalog queries. The mode can be either
+# "default", "refresh" (always query and update the cache) or "offline"
+# (only use the cache, regardless of the entries' age).
+cache = SimpleNamespace(
+        active=True,
+        mode="default",
+        path=Path.home() / ".cache" / "p2obt",
+        ttl=7*24*60*60,
+        max_size=256*1024**2
+        )
+
+# NOTE: The stand-ins for the remote catalogs. If active, recorded
+# fixtures (in the path) or synthetic tables are returned instead of
+# querying the catalogs. If recording, the remote catalogs' results are
+# saved as fixtures in the path.
+mock_catalogs = SimpleNamespace(
+        active=False,
+        record=False,
+        path=None,
+        latency=0.
+        )
+
 catalogs = SimpleNamespace(
+        # NOTE: The number of catalogs that are queried concurrently for a
+        # target. If set to 1, the catalogs are queried sequentially.
+        workers=8,
+        # NOTE: If True, the targets are matched to the catalogs' entries nearest
+        # to their Simbad coordinates. Otherwise, the lowest magnitudes and the
+        # highest other values of all entries within the match radius are taken.
+        match_nearest=False,
         available=["gaia", "tycho", "nomad", "two_mass", "wise", "mdfc", "simbad", "local"],
         local=local, gaia=gaia, tycho=tycho, nomad=nomad, two_mass=two_mass, wise=wise,
-        mdfc=mdfc, simbad=simbad, irsa=irsa)
+        mdfc=mdfc, simbad=simbad, irsa=irsa, cache=cache,
+        mock=mock_catalogs)
+
+# NOTE: The opt-in instrumentation of the catalog queries, the templates'
+# loading, the OBs' composition and the p2 calls. The measurements are
+# dumped to the (.json)-file at the end of `create_obs`. If "None", the
+# file is placed in the log's directory.
+instrumentation = SimpleNamespace(
+        active=False,
+        file=None
+        )
 
 
 OPTIONS = SimpleNamespace(
         log=log, resolution=resolution, photometry=photometry,
-        w0=w0, dit=dit, constraints=constraints, catalogs=catalogs)
-
-
-OPTIONS.log.path.mkdir(parents=True, exist_ok=True)
-with open(OPTIONS.log.path / "p2obt.log", "w+") as log_file:
-    log_file.write("Start of log:")
+        w0=w0, dit=dit, templates=templates, constraints=constraints,
+        upload=upload, output=output, catalogs=catalogs,
+        instrumentation=instrumentation)
 
-logging.basicConfig(filename=OPTIONS.log.path / "p2obt.log",
-                    filemode="w", level=OPTIONS.log.level,
-                    format=OPTIONS.log.format)
@@ -1,7 +1,8 @@
 import re
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 from .utils import prompt_user
 
@@ -10,7 +11,79 @@ from .utils import prompt_user
 # checking if there are integers for numbers higher than last calibrator and
 # then adding these
 
-# TODO: Maybe substiute with match and cases?
+class NightPlanEvent(NamedTuple):
+    """An event of a streamed night plan (see :func:`stream_night_plan`).
+
+    The start of a run has no night, the start of a night no science
+    target and a science target/calibrator group has all fields set.
+    """
+    run: str
+    night: Optional[str] = None
+    science_target: Optional[str] = None
+    calibrators: Optional[List[Dict]] = None
+
+
+# NOTE: The keywords and program ids are matched in lookaheads at each position, so
+# overlapping matches are found as well. Keywords sharing a start (e.g., "medium"
+# and "med") are ordered by length
+RUN_KEYWORDS = ["gra4mat", "matisse", "both", "uts", "ats", "small", "medium",
+                "large", "extended", "lr", "low", "mr", "med", "hr", "high"]
+RUN_KEY_PATTERN = re.compile(rf"(?=({'|'.join(RUN_KEYWORDS)})?)"
+                             r"(?=(\b[\w\d]+\.[\w\d]+\.[\w\d]+\b)?)", re.IGNORECASE)
+
+OPERATIONAL_MODES = {"gra4mat": "gr", "matisse": "st", "both": "both"}
+ARRAY_CONFIGURATIONS = ["small", "medium", "large", "extended"]
+RESOLUTIONS = {"LOW": ["lr", "low"], "MED": ["mr", "med", "medium"],
+               "HIGH": ["hr", "high"]}
+
+
+class RunSettings(NamedTuple):
+    """The settings of a run as detected from its name
+    (see :func:`classify_run`)."""
+    array_configuration: Optional[str] = None
+    operational_mode: Optional[str] = None
+    resolution: Optional[str] = None
+    prog_id: Optional[str] = None
+
+
+@lru_cache(maxsize=None)
+def classify_run(run_name: str) -> RunSettings:
+    """Detects the array configuration, operational mode, resolution and
+    program id of a run from its name in a single pass.
+
+    Parameters
+    ----------
+    run_name : str
+        The name of the run.
+
+    Returns
+    -------
+    run_settings : RunSettings
+        The detected settings. Settings that could not be
+        detected are "None".
+    """
+    keywords, prog_id = set(), None
+    for match in RUN_KEY_PATTERN.finditer(run_name):
+        keyword, prog_id_match = match.groups()
+        if keyword is not None:
+            keywords.add(keyword.lower())
+        if prog_id is None:
+            prog_id = prog_id_match
+
+    array_configuration = None
+    if "uts" in keywords:
+        array_configuration = "UTs"
+    else:
+        array_configuration = next((config for config in ARRAY_CONFIGURATIONS
+                                    if config in keywords), None)
+    operational_mode = next((mode for keyword, mode in OPERATIONAL_MODES.items()
+                             if keyword in keywords), None)
+    resolution = next((resolution for resolution, resolution_keywords
+                       in RESOLUTIONS.items() if keywords.intersection(resolution_keywords)),
+                      None)
+    return RunSettings(array_configuration, operational_mode, resolution, prog_id)
+
+
 def parse_operational_mode(run_name: str) -> str:
     """Parses the run's used instrument from string containing it,
     either MATISSE or GRA4MAT.
@@ -28,18 +101,12 @@ def parse_operational_mode(run_name: str) -> str:
     operational_mode : str
         Either "MATISSE" or "GRA4MAT".
     """
-    run_name = run_name.lower()
-    operational_modes = ["MATISSE", "GRA4MAT", "Both"]
-    if "gra4mat" in run_name:
-        return "gr"
-    if "matisse" in run_name:
-        return "st"
-    if "both" in run_name:
-        return "both"
-    return prompt_user("instrument", operational_modes)
-
-
-# TODO: Maybe substitute with match and cases?
+    operational_mode = classify_run(run_name).operational_mode
+    if operational_mode is not None:
+        return operational_mode
+    return prompt_user("instrument", ["MATISSE", "GRA4MAT", "Both"])
+
+
 def parse_array_config(run_name: Optional[str] = None) -> str:
     """Parses the array configuration from string containing it.
 
@@ -56,21 +123,11 @@ def parse_array_config(run_name: Optional[str] = None) -> str:
     array_configuration : str
         Either "UTs", "small", "medium", "large" or "extended".
     """
-    at_configs = ["ATs", "small", "medium", "large", "extended"]
     if run_name is not None:
-        run_name = run_name.lower()
-        if "uts" in run_name:
-            return "UTs"
-        if any(config in run_name for config in at_configs):
-            if "small" in run_name:
-                return "small"
-            if "medium" in run_name:
-                return "medium"
-            if "large" in run_name:
-                return "large"
-            if "extended" in run_name:
-                return "extended"
-    return prompt_user("array_configuration", ["UTs"]+at_configs[1:])
+        array_configuration = classify_run(run_name).array_configuration
+        if array_configuration is not None:
+            return array_configuration
+    return prompt_user("array_configuration", ["UTs", *ARRAY_CONFIGURATIONS])
 
 
 def parse_run_resolution(run_name: str) -> str:
@@ -89,21 +146,17 @@ def parse_run_resolution(run_name: str) -> str:
     resolution : str
         Either "LOW", "MED" or "HIGH".
     """
-    run_name = run_name.lower()
-    if any(res in run_name for res in ["lr", "low"]):
-        return "LOW"
-    if any(res in run_name for res in ["mr", "med", "medium"]):
-        return "MED"
-    if any(res in run_name for res in ["hr", "high"]):
-        return "HIGH"
-    return prompt_user("resolution", ["LOW", "MED", "HIGH"])
+    resolution = classify_run(run_name).resolution
+    if resolution is not None:
+        return resolution
+    return prompt_user("resolution", list(RESOLUTIONS))
 
 
 def parse_run_prog_id(run_name: str) -> str:
-    """Parses the run's resolution from string containing it.
+    """Parses the run's program id from string containing it.
 
     If no match can be found it prompts the user for
-    manual resolution input.
+    manual program id input.
 
     Parameters
     ----------
@@ -116,9 +169,7 @@ def parse_run_prog_id(run_name: str) -> str:
         The run's program id in the form of
         <period>.<program>.<run> (e.g., 110.2474.004).
     """
-    pattern = r'\b[\w\d]+\.[\w\d]+\.[\w\d]+\b'
-    run_prog_id = re.findall(pattern, run_name)[0]
-
+    run_prog_id = classify_run(run_name).prog_id
     if not run_prog_id:
         print("Run's program id could not be automatically detected!")
         run_prog_id = input("Please enter the run's id in the following form"
@@ -126,6 +177,47 @@ def parse_run_prog_id(run_name: str) -> str:
     return run_prog_id
 
 
+def classify_runs(run_names: Iterable[str],
+                  prog_id: Optional[bool] = True) -> Dict[str, RunSettings]:
+    """Gets the settings of all runs at once.
+
+    The user is prompted for the settings that could not be detected
+    (see :func:`classify_run`) before any OBs are created.
+
+    Parameters
+    ----------
+    run_names : iterable of str
+        The names of the runs.
+    prog_id : bool, optional
+        If 'True' the program ids are required as well.
+
+    Returns
+    -------
+    run_settings : dict of RunSettings
+        The runs' settings with their names as keys.
+    """
+    run_settings = {}
+    for run_name in dict.fromkeys(run_names):
+        detected_settings = classify_run(run_name)
+        if any(value is None for value in detected_settings[:3])\
+                or (prog_id and detected_settings.prog_id is None):
+            print(f"Settings of '{run_name}':")
+        run_settings[run_name] = RunSettings(
+                parse_array_config(run_name), parse_operational_mode(run_name),
+                parse_run_resolution(run_name),
+                parse_run_prog_id(run_name) if prog_id else detected_settings.prog_id)
+    return run_settings
+
+
+def get_run_names(lines: Iterable[str],
+                  run_identifier: Optional[str] = "run") -> List[str]:
+    """Gets the names of the runs of a night plan without parsing it
+    (see :func:`stream_night_plan`)."""
+    run_names = [line.strip() for line in lines
+                 if line.lower().startswith(run_identifier)]
+    return run_names or [f"full_{run_identifier}"]
+
+
 def parse_night_name(night_name: str) -> str:
     """Automatically gets the night's date from a night key of
     the dictionary if the date it is included in the key.
@@ -188,6 +280,50 @@ def parse_line(parts: str) -> str:
     return " ".join(parts[1:target_name_cutoff])
 
 
+def parse_group_line(line: str,
+                     science_target: Optional[str],
+                     calibrators: List[Dict]
+                     ) -> Tuple[Optional[Tuple[str, List[Dict]]], Optional[str], List[Dict]]:
+    """Parses a line of a calibrator-science target block.
+
+    A group is completed by an empty line.
+
+    Parameters
+    ----------
+    line : str
+        A line of a night plan.
+    science_target : str, optional
+        The science target of the current group (if already read).
+    calibrators : list of dict
+        The calibrators of the current group.
+
+    Returns
+    -------
+    group : tuple, optional
+        The completed group's science target and calibrators.
+    science_target : str, optional
+        The science target of the current group.
+    calibrators : list of dict
+        The calibrators of the current group.
+    """
+    parts = line.strip().split()
+    if not parts:
+        group = (science_target, calibrators) if science_target is not None else None
+        return group, None, []
+    if line.startswith("#") or not line[0].isdigit():
+        return None, science_target, calibrators
+
+    obj_name = parse_line(parts)
+    if obj_name.startswith("cal_"):
+        tag = obj_name.split("_")[1]
+        order = "b" if science_target is None else "a"
+        calibrators.append(dict(zip(["name", "order", "tag"],
+                                    [obj_name.split("_")[2], order, tag])))
+    else:
+        science_target = obj_name
+    return None, science_target, calibrators
+
+
 def parse_groups(section: List) -> Dict:
     """Parses any combination of a calibrator-science target block
     into a dictionary containing the individual blocks' information.
@@ -203,30 +339,12 @@ def parse_groups(section: List) -> Dict:
         The individual science target/calibrator group within a section.
         Can be for instance, "SCI-CAL" or "CAL-SCI-CAL" or any combination.
     """
-    data = {}
-    calibrator_labels = ["name", "order", "tag"]
-    current_group, current_science_target = [], None
-
+    data, science_target, calibrators = {}, None, []
     for line in section:
-        parts = line.strip().split()
-
-        if not parts:
-            if current_science_target is not None:
-                data[current_science_target] = current_group
-            current_group, current_science_target = [], None
-            continue
-        if line.startswith("#") or not line[0].isdigit():
-            continue
-
-        obj_name = parse_line(parts)
-        if obj_name.startswith("cal_"):
-            tag = obj_name.split("_")[1]
-            order = "b" if current_science_target is None else "a"
-            calibrator = dict(zip(calibrator_labels,
-                                  [obj_name.split("_")[2], order, tag]))
-            current_group.append(calibrator)
-        else:
-            current_science_target = obj_name
+        group, science_target, calibrators = parse_group_line(
+                line, science_target, calibrators)
+        if group is not None:
+            data[group[0]] = group[1]
 
     # HACK: Remove all the empty parsings
     data = {key: value for key, value in data.items() if value}
@@ -264,6 +382,92 @@ def parse_file_section(lines: List, identifier: str) -> Dict:
     return dict(zip(labels, sections))
 
 
+def stream_night_plan(lines: Iterable[str],
+                      run_identifier: Optional[str] = "run",
+                      night_identifier: Optional[str] = "night"
+                      ) -> Iterator[NightPlanEvent]:
+    """Parses the lines of a night plan created with `calibrator_find.pro`
+    in a single pass and yields its runs, nights and science
+    target/calibrator groups as they are read.
+
+    The sections are split as in :func:`parse_night_plan`. Content before
+    the first run (or night) header is only kept (as "full_run" or
+    "full_night") if there is no such header at all. Therefore, only that
+    content is held back until the end of its run or the file.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        The lines of the night plan, e.g., an opened (.txt)-file.
+    run_identifier : str, optional
+        The run-identifier by which the night plan is split into
+        individual runs.
+    night_identifier : str, optional
+        The night-identifier by which the runs are split into the
+        individual nights.
+
+    Yields
+    ------
+    event : NightPlanEvent
+    """
+    full_run, full_night = f"full_{run_identifier}", f"full_{night_identifier}"
+    run, night = None, None
+    pre_run_events, pre_night_groups = [], []
+    science_target, calibrators = None, []
+
+    def get_full_night_events() -> List[NightPlanEvent]:
+        if night is not None or not pre_night_groups:
+            return []
+        run_key = full_run if run is None else run
+        return [NightPlanEvent(run_key, full_night),
+                *(NightPlanEvent(run_key, full_night, *group) for group in pre_night_groups)]
+
+    for line in lines:
+        if line.lower().startswith(run_identifier):
+            if run is not None:
+                yield from get_full_night_events()
+            run, night = line.strip(), None
+            pre_run_events, pre_night_groups = [], []
+            science_target, calibrators = None, []
+            yield NightPlanEvent(run)
+            continue
+
+        events = []
+        if line.lower().startswith(night_identifier):
+            night, pre_night_groups = line.strip(), []
+            science_target, calibrators = None, []
+            events.append(NightPlanEvent(full_run if run is None else run, night))
+        else:
+            group, science_target, calibrators = parse_group_line(
+                    line, science_target, calibrators)
+            if group is not None and night is None:
+                pre_night_groups.append(group)
+            elif group is not None:
+                events.append(NightPlanEvent(full_run if run is None else run,
+                                             night, *group))
+
+        if run is None:
+            pre_run_events.extend(events)
+        else:
+            yield from events
+
+    if run is None:
+        yield NightPlanEvent(full_run)
+        yield from pre_run_events
+    yield from get_full_night_events()
+
+
+def get_night_plan_events(night_plan: Dict[str, Dict]) -> Iterator[NightPlanEvent]:
+    """Gets the events of an already parsed night plan
+    (see :func:`stream_night_plan`)."""
+    for run_key, run in night_plan.items():
+        yield NightPlanEvent(run_key)
+        for night_key, night in run.items():
+            yield NightPlanEvent(run_key, night_key)
+            for science_target, calibrators in night.items():
+                yield NightPlanEvent(run_key, night_key, science_target, calibrators)
+
+
 def parse_night_plan(night_plan: Path,
                      run_identifier: Optional[str] = "run",
                      night_identifier: Optional[str] = "night"
@@ -299,22 +503,28 @@ def parse_night_plan(night_plan: Path,
         with their associated calibrators.
     """
     night_plan = Path(night_plan)
-    if night_plan.exists():
-        with open(night_plan, "r+", encoding="utf-8") as night_plan:
-            lines = night_plan.readlines()
-    else:
+    if not night_plan.exists():
         raise FileNotFoundError(
             f"File {night_plan.name} was not found/does not exist!")
 
-    runs = {}
-    for run_id, run in parse_file_section(lines, run_identifier).items():
-        nights = {}
-        for night_id, night in parse_file_section(run, night_identifier).items():
-            night_content = parse_groups(night)
-
-            # HACK: Only add nights that have content
-            if night_content:
-                nights[night_id] = night_content
-        runs[run_id] = nights
+    runs, nights, groups = {}, {}, {}
+    with open(night_plan, "r", encoding="utf-8") as night_plan_file:
+        for event in stream_night_plan(night_plan_file, run_identifier,
+                                       night_identifier):
+            if event.night is None:
+                nights = runs[event.run] = {}
+            elif event.science_target is None:
+                groups = nights[event.night] = {}
+            else:
+                groups[event.science_target] = event.calibrators
+
+    # HACK: Only add nights that have content
+    for nights in runs.values():
+        for night_id, groups in list(nights.items()):
+            groups = {key: value for key, value in groups.items() if value}
+            if groups:
+                nights[night_id] = groups
+            else:
+                del nights[night_id]
     # TODO: Raise error here if the parsed night plan is empty and suggest adding a white line at the end
     return runs
@@ -0,0 +1,404 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from pathlib import Path
+from queue import Full, Queue
+from threading import Event, Thread
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import p2api
+
+from .bundle import Bundle
+from .compose import compose_ob, compose_obs, format_coordinates, set_ob_name, write_obs
+from .journal import Journal
+from .logger import get_log_file
+from .options import OPTIONS
+from .query import query_many
+from .upload import create_remote_container, get_remote_container,\
+    prune_remote_containers, retry_failed_obs, sync_obs, upload_obs
+
+
+class ObSpecification(NamedTuple):
+    """The specification of a single OB within a block."""
+    name: str
+    observational_type: str
+    sci_name: Optional[str] = None
+    tag: Optional[str] = None
+
+
+class ObBlock(NamedTuple):
+    """A science target's block of OBs (the science target and its
+    calibrators) that share a container and an output directory.
+
+    The containers are the names and the observational modes ("vm"
+    or "sm") of the containers that are created below the container id
+    with the last one being the block's own container.
+    """
+    obs: List[ObSpecification]
+    array_configuration: str
+    operational_mode: str
+    resolution: str
+    container_id: Optional[int] = None
+    containers: Tuple[Tuple[str, str], ...] = ()
+    output_dir: Optional[Path] = None
+
+
+def get_target_names(blocks: Iterable[ObBlock]) -> List[str]:
+    """Gets the unique target names of all OBs in the blocks."""
+    return list(dict.fromkeys(ob.name for block in blocks for ob in block.obs))
+
+
+def get_block_group(block: ObBlock) -> Tuple:
+    """Gets the group (e.g., the night of a night plan's run) of a block,
+    which is the part of its container and output directory that it shares
+    with the other blocks of the group."""
+    output_dir = None if block.output_dir is None else block.output_dir.parent
+    return block.container_id, block.containers[:-1], output_dir
+
+
+def resolve_targets(blocks: Iterable[ObBlock],
+                    targets: Optional[Dict[str, Dict]] = None
+                    ) -> Dict[str, Dict]:
+    """Resolves the targets of all OBs in the blocks.
+
+    Each unique target is queried exactly once, regardless of how many
+    runs, nights, operational modes or calibrator slots it appears in.
+
+    Parameters
+    ----------
+    blocks : iterable of ObBlock
+    targets : dict of dict, optional
+        The already resolved targets, which are not queried again.
+
+    Returns
+    -------
+    targets : dict of dict
+        The newly resolved targets' queried information with their
+        names as keys.
+    """
+    targets = {} if targets is None else targets
+    target_names = [name for name in get_target_names(blocks) if name not in targets]
+    if not target_names:
+        return {}
+    print(f"Resolving {len(target_names)} unique targets...")
+    return query_many(target_names)
+
+
+def compose_block(block: ObBlock,
+                  targets: Optional[Dict[str, Dict]] = None
+                  ) -> List[Tuple[Dict, str]]:
+    """Composes the OBs of a block.
+
+    The OBs are composed at once (see :func:`compose_obs
+    <p2obt.backend.compose.compose_obs>`) and only if that fails
+    one by one.
+
+    Parameters
+    ----------
+    block : ObBlock
+    targets : dict of dict, optional
+        The already resolved targets (see :func:`resolve_targets`).
+        Targets not contained are queried.
+
+    Returns
+    -------
+    obs : list of tuple
+        The composed OBs and their names. OBs that could not be
+        composed are omitted.
+    """
+    targets = {} if targets is None else targets
+    ob_names = [set_ob_name(ob.name, ob.observational_type, ob.sci_name, ob.tag)
+                for ob in block.obs]
+    targets_table = {"name": [ob.name for ob in block.obs],
+                     "observational_type": [ob.observational_type for ob in block.obs],
+                     "array_configuration": [block.array_configuration]*len(block.obs),
+                     "operational_mode": [block.operational_mode]*len(block.obs),
+                     "resolution": [block.resolution]*len(block.obs),
+                     "sci_name": [ob.sci_name for ob in block.obs],
+                     "tag": [ob.tag for ob in block.obs]}
+    try:
+        return list(zip(compose_obs(targets_table, targets), ob_names))
+    except (KeyError, TypeError, ValueError):
+        # NOTE: The OBs are composed individually, so only the failing ones are omitted
+        pass
+
+    obs = []
+    for ob, ob_name in zip(block.obs, ob_names):
+        try:
+            composed_ob = compose_ob(ob.name, ob.observational_type,
+                                     block.array_configuration,
+                                     block.operational_mode,
+                                     ob.sci_name, ob.tag, block.resolution,
+                                     targets.get(ob.name))
+        except KeyError:
+            print(f"[ERROR]: Failed creating OB '{ob.name}'! See '{get_log_file()}'.")
+            logging.error(f"[ERROR]: Failed creating OB '{ob.name}'!", exc_info=True)
+            continue
+        obs.append((composed_ob, ob_name))
+    return obs
+
+
+def get_block_container(connection: p2api.p2api.ApiConnection,
+                        block: ObBlock, containers: Dict,
+                        sync: Optional[bool] = False,
+                        journal: Optional[Journal] = None) -> Optional[int]:
+    """Gets the id of the block's container and creates the containers
+    above it, if they do not exist yet on p2.
+
+    Parameters
+    ----------
+    connection : p2api.p2api.ApiConnection
+        The P2 python api connection.
+    block : ObBlock
+    containers : dict
+        The already created containers' ids by their path.
+    sync : bool, optional
+        If 'True' the containers that already exist on p2 are reused
+        (matched by their names), including the block's own container.
+    journal : Journal, optional
+        The checkpoint journal. Already journaled containers are reused
+        and created containers are journaled.
+
+    Returns
+    -------
+    container_id : int, optional
+    """
+    if block.container_id is None:
+        return None
+
+    container_id = block.container_id
+    for index, (name, observational_mode) in enumerate(block.containers):
+        path = (block.container_id, block.containers[:index+1])
+        journaled_id = None
+        if journal is not None:
+            journaled_id = journal.get_container(container_id, name, observational_mode)
+
+        # NOTE: Existing containers above the block are reused, while each
+        # block gets its own container (unless synchronizing)
+        if journaled_id is not None:
+            containers[path] = journaled_id
+        elif index == len(block.containers)-1 and not sync:
+            containers[path] = create_remote_container(
+                    connection, name, container_id, observational_mode)
+        elif path not in containers:
+            containers[path] = get_remote_container(
+                    connection, name, container_id, observational_mode)
+
+        if journal is not None and journaled_id is None:
+            journal.add_container(container_id, name, observational_mode,
+                                  containers[path])
+        container_id = containers[path]
+    return container_id
+
+
+def prune_block_containers(connection: p2api.p2api.ApiConnection,
+                           containers: Dict,
+                           incomplete_ids: Optional[Set[int]] = None) -> None:
+    """Deletes the containers on p2 that are not synchronized anymore.
+
+    Below each synchronized container, the child containers that are not
+    the ones of any block (e.g., of renamed or removed targets) are deleted
+    with their OBs (see :func:`prune_remote_containers
+    <p2obt.backend.upload.prune_remote_containers>`). The child containers
+    of the container ids (e.g., the other nights of a run) are only listed.
+
+    Parameters
+    ----------
+    connection : p2api.p2api.ApiConnection
+        The P2 python api connection.
+    containers : dict
+        The blocks' containers' ids by their path (see
+        :func:`get_block_container`).
+    incomplete_ids : set of int, optional
+        The ids of the containers above blocks whose OBs could not all be
+        composed. Their child containers are kept.
+    """
+    incomplete_ids = set() if incomplete_ids is None else incomplete_ids
+    child_ids = {}
+    for (container_id, path), child_id in containers.items():
+        parent_id = container_id if len(path) == 1\
+            else containers[(container_id, path[:-1])]
+        child_ids.setdefault(parent_id, set()).add(child_id)
+
+    container_ids = {container_id for container_id, _ in containers}
+    for parent_id, ids in child_ids.items():
+        if parent_id in incomplete_ids:
+            continue
+        prune_remote_containers(connection, parent_id, ids,
+                                parent_id not in container_ids)
+
+
+def run_pipeline(blocks: Iterable[ObBlock],
+                 connection: Optional[p2api.p2api.ApiConnection] = None,
+                 targets: Optional[Dict[str, Dict]] = None,
+                 queue_size: Optional[int] = None,
+                 max_workers: Optional[int] = None,
+                 sync: Optional[bool] = False,
+                 journal: Optional[Journal] = None,
+                 bundle: Optional[Bundle] = None
+                 ) -> List[Tuple[str, Optional[int]]]:
+    """Composes, writes and uploads blocks of OBs.
+
+    The blocks are read, resolved and composed in a separate thread
+    ahead of the upload, while the composed blocks are, in their
+    original order, written to their (.obx)-files in the background
+    (see :func:`write_obs <p2obt.backend.compose.write_obs>`), their
+    containers are created and their upload is started. The number of blocks composed
+    ahead is bounded by the queue size. The OBs whose upload failed are
+    retried at the end (see `OPTIONS.upload.retry.rounds`).
+
+    The targets are resolved per group of blocks (e.g., per night of a
+    night plan's run, see :func:`get_block_group`) as the blocks are read,
+    so the queries of a group overlap with the upload of the previous
+    groups. Each target is only resolved once and the coordinates of each
+    group's resolved targets are formatted at once (see
+    :func:`format_coordinates <p2obt.backend.compose.format_coordinates>`).
+
+    Parameters
+    ----------
+    blocks : iterable of ObBlock
+        The blocks, which are read as they are composed (e.g., from a
+        streamed night plan).
+    connection : p2api.p2api.ApiConnection, optional
+        The P2 python api connection. If "None" the OBs are not uploaded.
+    targets : dict of dict, optional
+        The already resolved targets (see :func:`resolve_targets`).
+        Targets not contained are queried.
+    queue_size : int, optional
+        The maximum number of composed blocks waiting for their upload.
+        By default `OPTIONS.upload.queue_size`.
+    max_workers : int, optional
+        The maximum number of concurrent uploads. By default
+        `OPTIONS.upload.workers`.
+    sync : bool, optional
+        If 'True' the OBs are synchronized with the ones already on p2
+        instead of uploaded anew, i.e., the existing containers are reused
+        and only the changed OBs are created, updated or deleted (see
+        :func:`sync_obs <p2obt.backend.upload.sync_obs>`). At the end, the
+        containers that hold none of the OBs anymore are deleted (see
+        :func:`prune_block_containers`).
+    journal : Journal, optional
+        The checkpoint journal (see :class:`Journal <p2obt.backend.journal.Journal>`)
+        to which the created containers and uploaded OBs are written
+        and from which an interrupted upload is resumed.
+    bundle : Bundle, optional
+        The bundles (see :class:`Bundle <p2obt.backend.bundle.Bundle>`)
+        the OBs are written to instead of their (.obx)-files.
+
+    Returns
+    -------
+    results : list of tuple
+        The uploaded OBs' names and ids (or "None" if the upload failed).
+    """
+    queue_size = OPTIONS.upload.queue_size if queue_size is None else queue_size
+    max_workers = OPTIONS.upload.workers if max_workers is None else max_workers
+    targets = {} if targets is None else dict(targets)
+    if targets:
+        format_coordinates(targets.values())
+    composed_blocks, end_of_blocks = Queue(maxsize=max(queue_size, 1)), object()
+    stopped = Event()
+
+    def put(item) -> bool:
+        """Puts an item into the queue unless the pipeline was stopped."""
+        while not stopped.is_set():
+            try:
+                composed_blocks.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def compose_blocks():
+        try:
+            for _, group in groupby(blocks, key=get_block_group):
+                group = list(group)
+                resolved_targets = resolve_targets(group, targets)
+                format_coordinates(resolved_targets.values())
+                targets.update(resolved_targets)
+                for block in group:
+                    if not put((block, compose_block(block, targets))):
+                        return
+        except BaseException as exc:
+            put(exc)
+        finally:
+            put(end_of_blocks)
+
+    producer = Thread(target=compose_blocks, daemon=True)
+    producer.start()
+
+    # NOTE: If the upload fails, the producer is stopped instead of
+    # blocking on the full queue
+    containers, futures, writes, incomplete_ids = {}, [], [], set()
+    try:
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor,\
+                ThreadPoolExecutor(max_workers=max(OPTIONS.output.workers, 1)) as writer:
+            while True:
+                item = composed_blocks.get()
+                if item is end_of_blocks:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+
+                block, obs = item
+                if block.output_dir is not None and bundle is not None:
+                    for ob, ob_name in obs:
+                        bundle.write(ob, ob_name, block.output_dir)
+                elif block.output_dir is not None:
+                    writes.append(writer.submit(
+                        write_obs, [(ob, ob_name, block.output_dir)
+                                    for ob, ob_name in obs], 1))
+
+                if connection is None:
+                    continue
+                container_id = get_block_container(connection, block, containers,
+                                                   sync, journal)
+                if container_id is None:
+                    continue
+                # NOTE: If OBs could not be composed, nothing is deleted in or
+                # above the block's container, so no OBs are lost
+                is_complete = len(obs) == len(block.obs)
+                obs = [ob for ob, _ in obs]
+                if sync:
+                    if not is_complete:
+                        incomplete_ids.add(block.container_id)
+                        incomplete_ids.update(
+                                containers[(block.container_id, block.containers[:index])]
+                                for index in range(1, len(block.containers)))
+                    ob_names = {set_ob_name(ob.name, ob.observational_type,
+                                            ob.sci_name, ob.tag) for ob in block.obs}
+                    future = executor.submit(sync_obs, connection, obs, container_id,
+                                             ob_names, is_complete)
+                else:
+                    future = executor.submit(upload_obs, connection, obs,
+                                             container_id, journal)
+                futures.append((future, obs, container_id))
+
+            for write in writes:
+                write.result()
+    finally:
+        stopped.set()
+
+    results, failed_obs = [], []
+    for future, obs, container_id in futures:
+        for ob, result in zip(obs, future.result()):
+            if result[1] is None:
+                failed_obs.append((len(results), ob, container_id))
+            results.append(result)
+
+    # NOTE: The failed OBs are retried at the end, not dropped
+    for _ in range(OPTIONS.upload.retry.rounds):
+        if not failed_obs:
+            break
+        print(f"{'':-^50}")
+        print(f"[INFO]: Retrying {len(failed_obs)} failed OBs...")
+        retried_results = retry_failed_obs(
+                connection, [(ob, container_id) for _, ob, container_id in failed_obs],
+                None if sync else journal)
+        for (index, _, _), result in zip(failed_obs, retried_results):
+            results[index] = result
+        failed_obs = [failed_ob for failed_ob, (_, ob_id)
+                      in zip(failed_obs, retried_results) if ob_id is None]
+
+    if sync and connection is not None:
+        prune_block_containers(connection, containers, incomplete_ids)
+    return results
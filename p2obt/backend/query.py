@@ -1,19 +1,33 @@
+import hashlib
+import io
+import logging
+import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional, Dict, List
+from threading import Event, Lock
+from typing import Optional, Dict, List, Tuple, Union
 
 import astropy.units as u
+import numpy as np
 import pandas as pd
-import pkg_resources
+from astropy.coordinates import SkyCoord
 from astropy.table import Table
 from astroquery.simbad import Simbad
 from astroquery.vizier import Vizier
 from astroquery.ipac.irsa.irsa_dust import IrsaDust
 
+from .cache import get_cache_key, normalize_name, read_cache, write_cache
+from .instrumentation import measure
+from .mock import query_mock_catalog, record_catalog
 from .options import OPTIONS
-from .utils import add_space, remove_parenthesis
+from .utils import add_space, get_modification_time, get_resource, remove_parenthesis
 
 
-TARGET_INFO_FILE = Path(pkg_resources.resource_filename("p2obt", "data/Extensive Target Information.xlsx"))
+# NOTE: The columns of the Vizier catalogs' entries' positions (in degrees)
+POSITION_COLUMNS = ("_RAJ2000", "_DEJ2000")
+TARGET_INFO_FILE = get_resource("config/Extensive Target Information.xlsx")
 TARGET_INFO_MAPPING = {"local.RA": "RA [hms]",
                        "local.DEC": "DEC [dms]",
                        "local.propRa": "PMA [arcsec/yr]",
@@ -56,9 +70,123 @@ def query_dust_extinction(name: str) -> Dict:
     return extinctions
 
 
+LOCAL_CATALOGS = {}
+LOCAL_CATALOGS_LOCK = Lock()
+
+
+def normalize_local_name(name: str) -> str:
+    """Normalizes a target's name for the local catalog's
+    index (e.g., 'HD  142666' -> 'hd142666')."""
+    return "".join(name.split()).lower()
+
+
+def build_local_index(catalog: Table) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Builds the index of the local catalog's target names and
+    their aliases (the "Other Names").
+
+    Parameters
+    ----------
+    catalog : Table
+        The local catalog.
+
+    Returns
+    -------
+    index : dict
+        The rows of the targets' names.
+    normalized_index : dict
+        The rows of the targets' normalized names.
+    """
+    index, normalized_index = {}, {}
+    for column_name in ["Target Name", "Other Names"]:
+        if column_name not in catalog.columns:
+            continue
+        for row_index, name in enumerate(catalog[column_name].tolist()):
+            if not isinstance(name, str):
+                continue
+            index.setdefault(name, row_index)
+            normalized_index.setdefault(normalize_local_name(name), row_index)
+    return index, normalized_index
+
+
+def read_local_sheet(sheet_name: str) -> pd.DataFrame:
+    """Reads a sheet of the local catalog.
+
+    The sheet is converted to a binary sidecar file in the cache
+    directory that is keyed by the workbook's hash and read instead
+    of the workbook as long as the workbook is unchanged.
+
+    Parameters
+    ----------
+    sheet_name : str
+        The name of the local catalog's sheet.
+
+    Returns
+    -------
+    sheet : pandas.DataFrame
+    """
+    if not OPTIONS.catalogs.cache.active:
+        with TARGET_INFO_FILE.open("rb") as workbook:
+            return pd.read_excel(workbook, sheet_name=sheet_name)
+
+    workbook = TARGET_INFO_FILE.read_bytes()
+    workbook_hash = hashlib.sha256(workbook).hexdigest()
+    sidecar_dir = Path(OPTIONS.catalogs.cache.path) / "local"
+    sheet_id = hashlib.sha256(sheet_name.encode("utf-8")).hexdigest()[:16]
+    sidecar_file = sidecar_dir / f"{sheet_id}_{workbook_hash[:32]}.pkl"
+    try:
+        return pd.read_pickle(sidecar_file)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+
+    sheet = pd.read_excel(io.BytesIO(workbook), sheet_name=sheet_name)
+    try:
+        sidecar_dir.mkdir(parents=True, exist_ok=True)
+        for old_sidecar_file in sidecar_dir.glob(f"{sheet_id}_*.pkl"):
+            old_sidecar_file.unlink()
+        tmp_file = sidecar_file.with_suffix(f".{os.getpid()}.tmp")
+        sheet.to_pickle(tmp_file)
+        os.replace(tmp_file, sidecar_file)
+    except OSError:
+        pass
+    return sheet
+
+
+def load_local_catalog(sheet_name: str) -> Tuple[Table, Tuple[Dict, Dict]]:
+    """Loads a sheet of the local catalog and its index.
+
+    The sheet is only read once and is reloaded if the file
+    was modified.
+
+    Parameters
+    ----------
+    sheet_name : str
+        The name of the local catalog's sheet.
+
+    Returns
+    -------
+    catalog : Table
+        The local catalog.
+    indices : tuple of dict
+        The index and the normalized index of the local catalog's
+        target names (see :func:`build_local_index`).
+    """
+    modification_time = get_modification_time(TARGET_INFO_FILE)
+    with LOCAL_CATALOGS_LOCK:
+        if sheet_name in LOCAL_CATALOGS:
+            cached_time, catalog, indices = LOCAL_CATALOGS[sheet_name]
+            if cached_time == modification_time:
+                return catalog, indices
+
+        catalog = Table.from_pandas(read_local_sheet(sheet_name))
+        indices = build_local_index(catalog)
+        LOCAL_CATALOGS[sheet_name] = (modification_time, catalog, indices)
+    return catalog, indices
+
+
 # TODO: Implement match statement here
 def query_local_catalog(name: str):
-    """
+    """Queries the active local catalog for a target by its name
+    or one of its other names.
 
     Parameters
     ----------
@@ -74,21 +202,17 @@ def query_local_catalog(name: str):
     elif OPTIONS.catalogs.local.active == "ciao":
         sheet_name = OPTIONS.catalogs.local.ciao
 
-    catalog = pd.read_excel(TARGET_INFO_FILE, sheet_name=sheet_name)
-    catalog = Table.from_pandas(catalog)
-    if not any(name in catalog[column_name]
-               for column_name in ["Target Name", "Other Names"]):
-        return {}
-
-    if name in catalog["Target Name"]:
-        row = catalog[catalog["Target Name"] == name]
-    elif name in catalog["Other Names"]:
-        row = catalog[catalog["Other Names"] == name]
-
-    target = {}
-    for query_key, query_mapping in TARGET_INFO_MAPPING.items():
-        if query_mapping in row.columns:
-            target[query_key] = row[query_mapping].data.tolist()[0]
+    with measure("catalog", "local"):
+        catalog, (index, normalized_index) = load_local_catalog(sheet_name)
+        row_index = index.get(name, normalized_index.get(normalize_local_name(name)))
+        if row_index is None:
+            return {}
+
+        row = catalog[row_index:row_index+1]
+        target = {}
+        for query_key, query_mapping in TARGET_INFO_MAPPING.items():
+            if query_mapping in row.columns:
+                target[query_key] = row[query_mapping].data.tolist()[0]
     return {key: value for key, value in target.items() if value is not None}
 
 
@@ -111,37 +235,169 @@ def get_best_match(target: Dict, catalog: str,
     best_match : Table
         The best match from the queried catalog's table.
     """
-    best_matches = {}
-    if not catalog_table:
+    best_match = get_best_matches(catalog, {target["name"]: catalog_table})[target["name"]]
+    target = merge_best_match(target, best_match)
+    return {query_key: target[query_key] for query_key in best_match}
+
+
+def stack_column(catalog_tables: List[Table], column: str) -> np.ma.MaskedArray:
+    """Stacks a column of multiple tables into one masked array."""
+    columns = [catalog_table.columns[column] for catalog_table in catalog_tables]
+    return np.ma.MaskedArray(
+            np.concatenate([np.asarray(column) for column in columns]),
+            np.concatenate([np.asarray(column.mask) if hasattr(column, "mask")
+                            else np.zeros(len(column), dtype=bool) for column in columns]))
+
+
+def get_best_matches(catalog: str, catalog_tables: Dict[str, Optional[Table]],
+                     coordinates: Optional[Dict[str, SkyCoord]] = None,
+                     match_radius: u.arcsec = 5.) -> Dict[str, Dict]:
+    """Gets the best matches of multiple targets from their catalog entries.
+
+    In contrast to :func:`get_best_match` the targets' tables are stacked
+    and matched at once. The lowest magnitudes and the highest other values
+    of the targets' entries are taken. If coordinates are given, the targets
+    are instead matched to their nearest entry within the match radius, if the
+    entries contain their positions (see `POSITION_COLUMNS`).
+
+    Parameters
+    ----------
+    catalog : str
+        The catalog's name.
+    catalog_tables : dict of Table
+        The tables containing the queried catalog's results per target.
+    coordinates : dict of SkyCoord, optional
+        The targets' coordinates (see :func:`get_coordinates`).
+    match_radius : astropy.units.arcsec
+        The radius in which the entries are matched. Default is 5.
+
+    Returns
+    -------
+    best_matches : dict of dict
+        The best matches from the queried catalog per target.
+    """
+    best_matches = {name: {} for name in catalog_tables}
+    names = [name for name, catalog_table in catalog_tables.items() if catalog_table]
+    if not names:
         return best_matches
-        
+
+    tables = [catalog_tables[name] for name in names]
+    lengths = np.array([len(catalog_table) for catalog_table in tables])
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+    # NOTE: The separations of all entries to their targets are computed at once
+    # and the nearest entry of each target is found by sorting them
+    nearest = {}
+    coordinates = {} if coordinates is None else coordinates
+    located = np.array([name in coordinates for name in names])
+    if located.any() and all(set(POSITION_COLUMNS) <= set(catalog_table.columns)
+                             for catalog_table in tables):
+        targets = np.repeat(np.arange(len(names)), lengths)
+        rows = np.flatnonzero(located[targets])
+        entries = SkyCoord(*[stack_column(tables, column).astype(float).filled(np.nan)[rows]
+                             for column in POSITION_COLUMNS], unit=u.deg)
+        spherical = [coordinates[name].spherical if name in coordinates else None
+                     for name in names]
+        positions = np.array([(position.lon.deg, position.lat.deg)
+                              if position is not None else (np.nan, np.nan)
+                              for position in spherical])[targets[rows]]
+        target_coordinates = SkyCoord(positions[:, 0], positions[:, 1], unit=u.deg)
+        separations = entries.separation(target_coordinates).to(u.arcsec).value
+        matched = separations <= get_match_radius(match_radius).to(u.arcsec).value
+        rows, targets, separations = rows[matched], targets[rows][matched], separations[matched]
+        order = np.lexsort((separations, targets))
+        _, first = np.unique(targets[order], return_index=True)
+        nearest = dict(zip(targets[order][first], rows[order][first]))
+
     for query_key in getattr(OPTIONS.catalogs, catalog).query:
-        if query_key in catalog_table.columns:
-            if len(catalog_table) == 1:
-                value = catalog_table[query_key][0]
-            else:
-                # NOTE: Get lowest element in case magnitude is queried
-                if "mag" in query_key:
-                    value = catalog_table[query_key].min()
-                else:
-                    value = catalog_table[query_key].max()
-
-            if query_key in target:
-                if "mag" in query_key:
-                    if target[query_key] > value:
-                        best_matches[query_key] = value
-                else:
-                    if target[query_key] < value:
-                        best_matches[query_key] = value
-            else:
-                best_matches[query_key] = value
+        if not all(query_key in catalog_table.columns for catalog_table in tables):
+            continue
+        column = stack_column(tables, query_key)
+        if column.dtype.kind in "fiu":
+            # NOTE: Get lowest element in case magnitude is queried
+            limits = np.finfo(column.dtype) if column.dtype.kind == "f"\
+                else np.iinfo(column.dtype)
+            fill_value = limits.max if "mag" in query_key else limits.min
+            values = np.ma.MaskedArray(
+                    (np.minimum if "mag" in query_key else np.maximum).reduceat(
+                        np.ma.filled(column, fill_value), starts),
+                    np.logical_and.reduceat(np.ma.getmaskarray(column), starts))
+        else:
+            values = np.ma.MaskedArray([max(entries.compressed(), default=np.ma.masked)
+                                        for entries in np.split(column, starts[1:])],
+                                       dtype=object)
+
+        if nearest:
+            values[list(nearest)] = column[list(nearest.values())]
+        data, mask = values.data, np.ma.getmaskarray(values)
+        for index, name in enumerate(names):
+            best_matches[name][query_key] = np.ma.masked if mask[index] else data[index]
     return best_matches
 
 
+def merge_best_match(target: Dict, best_match: Dict) -> Dict:
+    """Merges the best match of a catalog into the target's information.
+
+    Values already queried from other catalogs are only replaced by lower
+    magnitudes or higher other values (see :func:`get_best_match`).
+    """
+    target = dict(target)
+    for query_key, value in best_match.items():
+        if query_key not in target:
+            target[query_key] = value
+        elif "mag" in query_key:
+            if target[query_key] > value:
+                target[query_key] = value
+        elif target[query_key] < value:
+            target[query_key] = value
+    return target
+
+
+def get_match_radius(match_radius: u.arcsec) -> u.arcsec:
+    """Converts the match radius to astropy.units.arcsec."""
+    if not isinstance(match_radius, u.Quantity):
+        return match_radius*u.arcsec
+    if match_radius.unit != u.arcsec:
+        raise ValueError("The match radius has to be in"
+                         " astropy.units.arcsecond.")
+    return match_radius
+
+
+def get_query_site(catalog: str) -> Union[Simbad, Vizier]:
+    """Gets the query site (either Simbad or Vizier)
+    for the specified catalog."""
+    data = getattr(OPTIONS.catalogs, catalog)
+    if catalog == "simbad":
+        query_site = Simbad()
+        # NOTE: The timeout attribute was renamed in newer astroquery versions
+        if hasattr(query_site, "timeout"):
+            query_site.timeout = data.timeout
+        else:
+            query_site.TIMEOUT = data.timeout
+        simbad_fields = OPTIONS.catalogs.simbad.fields
+        query_site.add_votable_fields(*simbad_fields)
+        return query_site
+    # NOTE: The entries' positions are added to match them to the targets
+    return Vizier(catalog=data.catalog, columns=[*data.fields, *POSITION_COLUMNS],
+                  timeout=data.timeout)
+
+
+def get_catalog_cache_key(name: str, catalog: str,
+                          match_radius: u.arcsec) -> str:
+    """Gets the cache key of a catalog's query for a target."""
+    data = getattr(OPTIONS.catalogs, catalog)
+    return get_cache_key(name, catalog, match_radius.value,
+                         data.fields, data.catalog)
+
+
 def get_catalog(name: str, catalog: str,
-                match_radius: u.arcsec = 5.):
+                match_radius: u.arcsec = 5.,
+                abandoned: Optional[Event] = None):
     """Queries the specified catalog.
 
+    The results are cached on disk (see :mod:`p2obt.backend.cache`)
+    and only queried remotely if they are not cached already.
+
     Parameters
     ----------
     name : str
@@ -151,33 +407,295 @@ def get_catalog(name: str, catalog: str,
     match_radius : astropy.units.arcsec
         The radius in which is queried.
         Default is 5.
+    abandoned : threading.Event, optional
+        If set (e.g., as the query timed out) when the query finishes,
+        its result is not cached.
 
     Returns
     -------
     catalog_table : Table
         The table containing the queried catalog's results.
     """
-    if not isinstance(match_radius, u.Quantity):
-        match_radius *= u.arcsec
-    else:
-        if match_radius.unit != u.arcsec:
-            raise ValueError("The match radius has to be in"
-                             " astropy.units.arcsecond.")
+    match_radius = get_match_radius(match_radius)
+    key = get_catalog_cache_key(name, catalog, match_radius)
+    with measure("cache", catalog):
+        found, catalog_table = read_cache(key)
+    if found:
+        return catalog_table
+    if OPTIONS.catalogs.cache.mode == "offline":
+        return None
+
+    with measure("catalog", catalog):
+        if OPTIONS.catalogs.mock.active:
+            catalog_table = query_mock_catalog(name, catalog)
+        else:
+            query_site = get_query_site(catalog)
+            if catalog == "simbad":
+                catalog_table = query_site.query_object(name)
+            else:
+                catalog_table = query_site.query_object(name, radius=match_radius)
+
+                # NOTE: Only get table from TableList if not empty
+                if catalog_table:
+                    catalog_table = catalog_table[0]
+            record_catalog(name, catalog, catalog_table)
+
+    if abandoned is not None and abandoned.is_set():
+        return catalog_table
+
+    # NOTE: Empty results are cached as well, so they are not re-queried
+    write_cache(key, catalog_table if catalog_table else None)
+    return catalog_table
+
+
+def split_catalog_table(catalog_table: Table, names: List[str],
+                        column: str) -> Dict[str, Optional[Table]]:
+    """Splits the table of a multi-target query into the
+    individual targets' tables.
+
+    Parameters
+    ----------
+    catalog_table : Table
+        The table containing the multi-target query's results.
+    names : list of str
+        The targets' names in the order they were queried.
+    column : str
+        The column that identifies the target of a row. Either
+        the target's (one-based) index or its name.
+
+    Returns
+    -------
+    catalog_tables : dict of Table
+        The targets' tables. If no entry was found for a target
+        its table is "None".
+    """
+    catalog_tables = dict.fromkeys(names)
+    if not catalog_table:
+        return catalog_tables
+
+    normalized_names = {normalize_name(name): name for name in names}
+    grouped_table = catalog_table.group_by(column)
+    for key, group in zip(grouped_table.groups.keys[column],
+                          grouped_table.groups):
+        if isinstance(key, str):
+            name = normalized_names.get(normalize_name(key))
+        else:
+            name = names[int(key)-1] if 0 < int(key) <= len(names) else None
+        if name is not None:
+            group = group.copy()
+            group.remove_column(column)
+            catalog_tables[name] = group
+    return catalog_tables
+
+
+def get_coordinates(catalog_tables: Dict[str, Optional[Table]]
+                    ) -> Dict[str, SkyCoord]:
+    """Gets the targets' coordinates from their Simbad tables.
+
+    Parameters
+    ----------
+    catalog_tables : dict of Table
+        The targets' Simbad tables.
+
+    Returns
+    -------
+    coordinates : dict of SkyCoord
+        The targets' coordinates. Targets without coordinates
+        are omitted.
+    """
+    names, ras, decs, units = [], [], [], None
+    for name, catalog_table in catalog_tables.items():
+        if not catalog_table:
+            continue
+        # NOTE: Newer astroquery versions return the coordinates in degrees
+        if "RA" in catalog_table.columns:
+            ra, dec = catalog_table["RA"][0], catalog_table["DEC"][0]
+            units = (u.hourangle, u.deg)
+        elif "ra" in catalog_table.columns:
+            ra, dec = catalog_table["ra"][0], catalog_table["dec"][0]
+            units = (u.deg, u.deg)
+        else:
+            continue
+        if ra is np.ma.masked or dec is np.ma.masked:
+            continue
+        names.append(name)
+        ras.append(ra)
+        decs.append(dec)
+
+    if not names:
+        return {}
+    coordinates = SkyCoord(ras, decs, unit=units)
+    return dict(zip(names, coordinates))
+
+
+def query_catalog_many(names: List[str], catalog: str,
+                       match_radius: u.arcsec,
+                       coordinates: Dict[str, SkyCoord]
+                       ) -> Dict[str, Optional[Table]]:
+    """Queries the specified remote catalog for multiple targets
+    (see :func:`get_catalog_many`) without the cache.
+
+    Parameters
+    ----------
+    names : list of str
+        The targets' names.
+    catalog : str
+        The catalog's name.
+    match_radius : astropy.units.arcsec
+        The radius in which is queried.
+    coordinates : dict of SkyCoord
+        The targets' coordinates.
 
+    Returns
+    -------
+    catalog_tables : dict of Table
+        The tables containing the queried catalog's results per target.
+    """
+    catalog_tables = dict.fromkeys(names)
+    query_site = get_query_site(catalog)
     if catalog == "simbad":
-        query_site = Simbad()
-        simbad_fields = OPTIONS.catalogs.simbad.fields
-        query_site.add_votable_fields(*simbad_fields)
-        catalog_table = query_site.query_object(name)
+        catalog_table = query_site.query_objects(names)
+        # NOTE: Newer astroquery versions return the queried names
+        # instead of the script's line numbers
+        if catalog_table and "user_specified_id" in catalog_table.columns:
+            catalog_tables.update(split_catalog_table(
+                catalog_table, names, "user_specified_id"))
+        elif catalog_table and "SCRIPT_NUMBER_ID" in catalog_table.columns:
+            catalog_tables.update(split_catalog_table(
+                catalog_table, names, "SCRIPT_NUMBER_ID"))
     else:
-        data = getattr(OPTIONS.catalogs, catalog)
-        query_site = Vizier(catalog=data.catalog, columns=data.fields)
-        catalog_table = query_site.query_object(name, radius=match_radius)
+        located = [name for name in names if name in coordinates]
+        if located:
+            query_site.ROW_LIMIT = -1
+            catalog_table = query_site.query_region(
+                    SkyCoord([coordinates[name] for name in located]),
+                    radius=match_radius)
+            catalog_table = catalog_table[0] if catalog_table else None
+            if catalog_table is not None and "_q" in catalog_table.columns:
+                catalog_tables.update(split_catalog_table(
+                    catalog_table, located, "_q"))
+            elif len(located) == 1:
+                catalog_tables[located[0]] = catalog_table
+
+        for name in names:
+            if name in located:
+                continue
+            catalog_table = query_site.query_object(name, radius=match_radius)
+            catalog_tables[name] = catalog_table[0] if catalog_table else None
+
+    return catalog_tables
+
+
+def get_catalog_many(names: List[str], catalog: str,
+                     match_radius: u.arcsec = 5.,
+                     coordinates: Optional[Dict[str, SkyCoord]] = None
+                     ) -> Dict[str, Optional[Table]]:
+    """Queries the specified catalog for multiple targets in one request.
+
+    Simbad is queried by the targets' names, Vizier catalogs by the
+    targets' coordinates. Targets without coordinates are queried
+    individually by their names. Each target's results are cached
+    separately, so they are shared with :func:`get_catalog`.
 
-        # NOTE: Only get table from TableList if not empty
-        if catalog_table:
-            catalog_table = catalog_table[0]
-    return catalog_table
+    Parameters
+    ----------
+    names : list of str
+        The targets' names.
+    catalog : str
+        The catalog's name.
+    match_radius : astropy.units.arcsec
+        The radius in which is queried.
+        Default is 5.
+    coordinates : dict of SkyCoord, optional
+        The targets' coordinates (see :func:`get_coordinates`).
+        Required for the Vizier catalogs' multi-target query.
+
+    Returns
+    -------
+    catalog_tables : dict of Table
+        The tables containing the queried catalog's results per target.
+    """
+    match_radius = get_match_radius(match_radius)
+    coordinates = {} if coordinates is None else coordinates
+    catalog_tables, keys, missing = {}, {}, []
+    with measure("cache", catalog):
+        for name in names:
+            keys[name] = get_catalog_cache_key(name, catalog, match_radius)
+            found, catalog_tables[name] = read_cache(keys[name])
+            if not found and OPTIONS.catalogs.cache.mode != "offline":
+                missing.append(name)
+    if not missing:
+        return catalog_tables
+
+    with measure("catalog_many", catalog):
+        if OPTIONS.catalogs.mock.active:
+            catalog_tables.update({name: query_mock_catalog(name, catalog)
+                                   for name in missing})
+        else:
+            catalog_tables.update(query_catalog_many(missing, catalog,
+                                                     match_radius, coordinates))
+            for name in missing:
+                record_catalog(name, catalog, catalog_tables[name])
+
+    for name in missing:
+        write_cache(keys[name], catalog_tables[name] or None)
+    return catalog_tables
+
+
+def get_catalogs(name: str, catalogs: List[str],
+                 match_radius: u.arcsec = 5.) -> Dict[str, Table]:
+    """Queries the specified catalogs concurrently.
+
+    The number of concurrent queries is limited by
+    `OPTIONS.catalogs.workers` and each catalog's query is
+    given up after its `OPTIONS.catalogs.<catalog>.timeout`
+    (in seconds, measured from the queries' submission), in
+    which case no table is returned (nor cached) for it. The
+    queries thus take at most the longest of the timeouts.
+
+    Parameters
+    ----------
+    name : str
+        The target's name.
+    catalogs : list of str
+        The catalogs' names.
+    match_radius : astropy.units.arcsec
+        The radius in which is queried.
+        Default is 5.
+
+    Returns
+    -------
+    catalog_tables : dict of Table
+        The tables containing the queried catalogs' results
+        in the order of the given catalogs.
+    """
+    if OPTIONS.catalogs.workers <= 1 or len(catalogs) <= 1:
+        return {catalog: get_catalog(name, catalog, match_radius)
+                for catalog in catalogs}
+
+    catalog_tables, abandoned = {}, {catalog: Event() for catalog in catalogs}
+    executor = ThreadPoolExecutor(max_workers=OPTIONS.catalogs.workers)
+    try:
+        start = time.monotonic()
+        futures = {catalog: executor.submit(get_catalog, name, catalog,
+                                            match_radius, abandoned[catalog])
+                   for catalog in catalogs}
+        deadlines = {catalog: start + getattr(OPTIONS.catalogs, catalog).timeout
+                     for catalog in catalogs}
+        for catalog in sorted(catalogs, key=deadlines.get):
+            future = futures[catalog]
+            wait([future], timeout=max(deadlines[catalog] - time.monotonic(), 0))
+            if future.done():
+                catalog_tables[catalog] = future.result()
+                continue
+
+            abandoned[catalog].set()
+            print(f"[WARNING]: Query of '{catalog}' for '{name}' timed out!")
+            logging.warning(f"[WARNING]: Query of '{catalog}' for '{name}' timed out!")
+            catalog_tables[catalog] = None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return {catalog: catalog_tables[catalog] for catalog in catalogs}
 
 
 # TODO: Make a pretty print built in functionality for the dictionary.
@@ -222,11 +740,95 @@ def query(target_name: str,
     else:
         local_target = {}
 
+    # NOTE: The catalogs are queried concurrently, but the best matches are
+    # applied sequentially, as they depend on the previous catalogs' results
+    catalog_tables = get_catalogs(target_name, catalogs, match_radius)
+    coordinates = get_coordinates({target_name: catalog_tables.get("simbad")})\
+        if OPTIONS.catalogs.match_nearest else None
     for catalog in catalogs:
-        catalog_table = get_catalog(target_name, catalog, match_radius)
-        best_matches = get_best_match(target, catalog, catalog_table)
-        target = {**target, **best_matches}
+        best_match = get_best_matches(catalog, {target_name: catalog_tables[catalog]},
+                                      coordinates, match_radius)[target_name]
+        target = merge_best_match(target, best_match)
 
     target["name"] = remove_parenthesis(target["name"])
     dust_target = query_dust_extinction(target["name"]) if query_exinction else {}
     return {**target, **local_target, **dust_target}
+
+
+def query_many(target_names: List[str],
+               catalogs: Optional[List] = None,
+               exclude_catalogs: Optional[List] = None,
+               match_radius: Optional[float] = 5.,
+               query_exinction: Optional[bool] = False) -> Dict[str, Dict]:
+    """Queries information for multiple astronomical targets by their
+    names from various catalogs.
+
+    In contrast to :func:`query` the targets are resolved with one
+    request per catalog (Simbad by the targets' names and the Vizier
+    catalogs by the targets' Simbad coordinates) and their best matches
+    are found at once per catalog (see :func:`get_best_matches`).
+
+    Parameters
+    ----------
+    target_names : list of str
+        The targets' names.
+    catalogs : list of str, optional
+        The catalogs to query. By default the catalogs "gaia",
+        "tycho", "nomad", "2mass", "wise", "mdfc" and "simbad"
+        as well as local catalogs (with "local") are included.
+    exclude_catalogs : list of str
+        A list of catalog to be excluded. Can be any of the catalogs
+        listed as default for the catalogs parameter.
+    match_radius : float, optional
+        The radius in which the targets are queried. Default is 5.
+
+    Returns
+    -------
+    targets : dict of dict
+        The targets' queried information with the given names as keys.
+    """
+    names = {target_name: add_space(target_name) for target_name in target_names}
+    unique_names = list(dict.fromkeys(names.values()))
+    if catalogs is None:
+        catalogs = OPTIONS.catalogs.available[:]
+
+    if exclude_catalogs is not None:
+        catalogs = [catalog for catalog in catalogs
+                    if catalog not in exclude_catalogs]
+    if "local" in catalogs:
+        local_targets = {name: query_local_catalog(name) for name in unique_names}
+        catalogs = [catalog for catalog in catalogs if catalog != "local"]
+    else:
+        local_targets = {name: {} for name in unique_names}
+
+    # NOTE: Simbad is queried first, as its coordinates are needed for the
+    # Vizier catalogs' queries. If it is not selected, the Vizier catalogs
+    # are queried by the targets' names instead
+    catalog_tables = {}
+    if "simbad" in catalogs:
+        catalog_tables["simbad"] = get_catalog_many(unique_names, "simbad", match_radius)
+    coordinates = get_coordinates(catalog_tables.get("simbad", {}))
+
+    vizier_catalogs = [catalog for catalog in catalogs if catalog != "simbad"]
+    if vizier_catalogs:
+        with ThreadPoolExecutor(max_workers=max(OPTIONS.catalogs.workers, 1)) as executor:
+            futures = {catalog: executor.submit(get_catalog_many, unique_names,
+                                                catalog, match_radius, coordinates)
+                       for catalog in vizier_catalogs}
+            catalog_tables.update({catalog: future.result()
+                                   for catalog, future in futures.items()})
+
+    match_coordinates = coordinates if OPTIONS.catalogs.match_nearest else None
+    best_matches = {catalog: get_best_matches(catalog, catalog_tables[catalog],
+                                              match_coordinates, match_radius)
+                    for catalog in catalogs}
+    targets = {}
+    for name in unique_names:
+        target = {"name": name}
+        for catalog in catalogs:
+            target = merge_best_match(target, best_matches[catalog][name])
+
+        target["name"] = remove_parenthesis(target["name"])
+        dust_target = query_dust_extinction(target["name"]) if query_exinction else {}
+        targets[name] = {**target, **local_targets[name], **dust_target}
+    return {target_name: targets[name] for target_name, name in names.items()}
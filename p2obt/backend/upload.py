@@ -1,11 +1,22 @@
 import getpass
 import keyring
 import logging
-from typing import Optional, Dict
+from copy import deepcopy
+from threading import Lock, RLock
+from types import SimpleNamespace
+from typing import Optional, Dict, List, Set, Tuple
+from weakref import WeakKeyDictionary
 
 import numpy as np
 import p2api
 
+from .connection import ResilientConnection
+from .instrumentation import measure
+from .journal import Journal, get_ob_hash
+from .logger import get_log_file
+from .mock import MockApiConnection
+from .options import OPTIONS
+
 
 TARGET_MAPPING = {"TARGET.NAME": "name",
                   "ra": "ra",
@@ -59,6 +70,10 @@ TEMPLATE_MAPPING = {"ACQUISITION.TEMPLATE.NAME": str,
                     "INS.DIN.NAME": str,
                     "DPR.CATG": str}
 
+# NOTE: The session caches of the runs and containers per connection
+SESSIONS = WeakKeyDictionary()
+SESSIONS_LOCK = Lock()
+
 # TODO: Hard code this and check for upload
 README_TEMPLATE = {"Date": "", "Main observer": "",
                    "e-mail": "", "Phone number": "",
@@ -86,6 +101,28 @@ def apply_mapping(content: Dict, mapping: Dict) -> None:
         content[key] = value
 
 
+def request(connection: p2api.p2api.ApiConnection, method: str, *args) -> Tuple:
+    """Calls a method of the p2 connection (e.g., "createOB") and
+    measures its duration (see :mod:`p2obt.backend.instrumentation`).
+
+    Parameters
+    ----------
+    connection : p2api.p2api.ApiConnection
+        The P2 python api connection.
+    method : str
+        The name of the connection's method.
+    *args
+        The method's arguments.
+
+    Returns
+    -------
+    response : tuple
+        The method's response.
+    """
+    with measure("p2", method):
+        return getattr(connection, method)(*args)
+
+
 def login(user_name: Optional[str] = None,
           store_password: Optional[bool] = False,
           remove_password: Optional[bool] = False,
@@ -97,12 +134,28 @@ def login(user_name: Optional[str] = None,
         The p2 user name.
     server: str, optional
         Either "demo", "production" for paranal or "production_lasilla" for la
-        silla.
+        silla. For "mock" an in-process stand-in for p2 is returned (see
+        :class:`MockApiConnection <p2obt.backend.mock.MockApiConnection>`).
     store_password: bool, optional
         If 'True' the password will be stored in the keyring.
     remove_password: bool, optional
         If 'True' the password will be removed from the keyring.
+
+    Returns
+    -------
+    connection : ResilientConnection
+        The connection, which retries failed calls and logs in again if
+        the session expired (see
+        :class:`ResilientConnection <p2obt.backend.connection.ResilientConnection>`).
     """
+    if server == "mock":
+        return ResilientConnection(
+                MockApiConnection(OPTIONS.upload.mock.latency,
+                                  OPTIONS.upload.mock.failure_rate,
+                                  seed=OPTIONS.upload.mock.seed,
+                                  failure_mode=OPTIONS.upload.mock.failure_mode),
+                seed=OPTIONS.upload.mock.seed)
+
     if server == "demo":
         api_url = "https://www.eso.org/p2demo"
     else:
@@ -125,7 +178,62 @@ def login(user_name: Optional[str] = None,
     else:
         print("[INFO]: Password retrieved from keyring.")
 
-    return p2api.ApiConnection(server, user_name, password)
+    return ResilientConnection(p2api.ApiConnection(server, user_name, password),
+                               lambda: p2api.ApiConnection(server, user_name, password))
+
+
+def get_session(connection: p2api.p2api.ApiConnection) -> SimpleNamespace:
+    """Gets the session cache of a connection.
+
+    The session contains the runs' container ids by their program ids
+    and the child containers' ids by their names and item types for
+    each already listed parent container.
+    """
+    with SESSIONS_LOCK:
+        if connection not in SESSIONS:
+            SESSIONS[connection] = SimpleNamespace(runs=None, containers={},
+                                                   lock=RLock())
+        return SESSIONS[connection]
+
+
+def clear_session(connection: p2api.p2api.ApiConnection) -> None:
+    """Clears the session cache of a connection (e.g., if the
+    containers on p2 were changed by someone else)."""
+    with SESSIONS_LOCK:
+        SESSIONS.pop(connection, None)
+
+
+def get_child_containers(connection: p2api.p2api.ApiConnection,
+                         container_id: int) -> Dict[Tuple[str, str], int]:
+    """Gets the child containers of a container on p2.
+
+    The children are listed once per session and are updated
+    when a container is created (see :func:`create_remote_container`).
+
+    Parameters
+    ----------
+    connection : p2api.p2api.ApiConnection
+        The P2 python api connection.
+    container_id : int
+        The id that specifies the parent container on p2.
+
+    Returns
+    -------
+    child_containers : dict
+        The child containers' ids by their names and item types
+        (e.g., "Folder" or "Concatenation").
+    """
+    session = get_session(connection)
+    with session.lock:
+        if container_id not in session.containers:
+            items, _ = request(connection, "getItems", container_id)
+            children = {}
+            for item in items:
+                if item["itemType"] != "OB":
+                    children.setdefault((item["name"], item["itemType"]),
+                                        item["containerId"])
+            session.containers[container_id] = children
+        return session.containers[container_id]
 
 
 def get_remote_run(connection: p2api.p2api.ApiConnection, run_id: str) -> Optional[int]:
@@ -145,10 +253,12 @@ def get_remote_run(connection: p2api.p2api.ApiConnection, run_id: str) -> Option
         The run's id that can be used to access and modify it with the p2api.
         If not found return "None".
     """
-    for run in connection.getRuns()[0]:
-        if run_id == run["progId"]:
-            return run["containerId"]
-    return None
+    session = get_session(connection)
+    with session.lock:
+        if session.runs is None:
+            session.runs = {run["progId"]: run["containerId"]
+                            for run in request(connection, "getRuns")[0]}
+        return session.runs.get(run_id)
 
 
 def remote_container_exists(connection: p2api.p2api.ApiConnection, container_id: int) -> bool:
@@ -167,7 +277,7 @@ def remote_container_exists(connection: p2api.p2api.ApiConnection, container_id:
         'True' if container exists, otherwise 'False'.
     """
     try:
-        if connection.getContainer(container_id):
+        if request(connection, "getContainer", container_id):
             return True
     except p2api.p2api.P2Error:
         pass
@@ -197,17 +307,58 @@ def create_remote_container(connection: p2api.p2api.ApiConnection,
     """
     print(f"Creating container '{name}' on p2...")
     if observational_mode == "vm":
-        container, _ = connection.createFolder(container_id, name)
+        container, _ = request(connection, "createFolder", container_id, name)
     elif observational_mode == "sm":
-        container, _ = connection.createConcatenation(container_id, name)
+        container, _ = request(connection, "createConcatenation", container_id, name)
     else:
         raise IOError("No such operation mode exists!")
+
+    session = get_session(connection)
+    with session.lock:
+        if container_id in session.containers:
+            item_type = "Folder" if observational_mode == "vm" else "Concatenation"
+            session.containers[container_id].setdefault(
+                    (name, item_type), container["containerId"])
+        # NOTE: A newly created container is empty, so it needs no listing
+        session.containers[container["containerId"]] = {}
     return container["containerId"]
 
 
-def create_ob(connection: p2api.p2api.ApiConnection,
-              container_id: int, header: Dict) -> int:
-    """Creates an OB on p2.
+def get_remote_container(connection: p2api.p2api.ApiConnection,
+                         name: str, container_id: int,
+                         observational_mode: Optional[str] = "vm") -> int:
+    """Gets a container on p2 by its name and creates it, if it
+    does not exist yet.
+
+    The parent container's children are only listed once per session
+    (see :func:`get_child_containers`).
+
+    Parameters
+    ----------
+    connection : p2api.p2api.ApiConnection
+        The P2 python api connection.
+    name: str
+        The container's name.
+    container_id : int
+        The id that specifies the parent container on p2.
+    observational_mode : str
+        Can either be "vm" for visitor mode (VM) or "sm" for service mode (SM).
+
+    Returns
+    -------
+    container_id : int
+        The container's id.
+    """
+    item_type = "Folder" if observational_mode == "vm" else "Concatenation"
+    child_id = get_child_containers(connection, container_id).get((name, item_type))
+    if child_id is not None:
+        return child_id
+    return create_remote_container(connection, name, container_id, observational_mode)
+
+
+def delete_remote_container(connection: p2api.p2api.ApiConnection,
+                            container_id: int) -> None:
+    """Deletes a container on p2 including its OBs and containers.
 
     Parameters
     ----------
@@ -215,13 +366,89 @@ def create_ob(connection: p2api.p2api.ApiConnection,
         The P2 python api connection.
     container_id : int
         The id that specifies the container on p2.
-    header : Dict
-        The header of the OB.
+    """
+    items, _ = request(connection, "getItems", container_id)
+    for item in items:
+        if item["itemType"] == "OB":
+            delete_remote_ob(connection, item["obId"])
+        else:
+            delete_remote_container(connection, item["containerId"])
+
+    _, version = request(connection, "getContainer", container_id)
+    request(connection, "deleteContainer", container_id, version)
+    session = get_session(connection)
+    with session.lock:
+        session.containers.pop(container_id, None)
+
+
+def prune_remote_containers(connection: p2api.p2api.ApiConnection,
+                            container_id: int, child_ids: Set[int],
+                            delete: Optional[bool] = True) -> List[str]:
+    """Deletes the child containers of a container on p2 that are not
+    among the given ones (e.g., the containers of renamed or removed
+    targets and duplicates), including their OBs.
+
+    Parameters
+    ----------
+    connection : p2api.p2api.ApiConnection
+        The P2 python api connection.
+    container_id : int
+        The id that specifies the parent container on p2.
+    child_ids : set of int
+        The ids of the child containers that are kept.
+    delete : bool, optional
+        If 'False' the other child containers are only listed.
 
     Returns
     -------
+    container_names : list of str
+        The names of the other child containers.
+    """
+    try:
+        items, _ = request(connection, "getItems", container_id)
+    except p2api.P2Error:
+        logging.error("[ERROR]: Failed getting the container's items!", exc_info=True)
+        return []
+
+    container_names = []
+    for item in items:
+        if item["itemType"] == "OB" or item["containerId"] in child_ids:
+            continue
+        container_names.append(item["name"])
+        if not delete:
+            print(f"[INFO]: Kept container '{item['name']}' ({item['containerId']}),"
+                  " which contains none of the OBs.")
+            continue
+
+        print(f"\tDeleting container '{item['name']}'...")
+        try:
+            delete_remote_container(connection, item["containerId"])
+        except p2api.P2Error:
+            print(f"[ERROR]: Failed deleting container '{item['name']}'!"
+                  f" See '{get_log_file()}'.")
+            logging.error(f"[ERROR]: Failed deleting container '{item['name']}'!",
+                          exc_info=True)
+            continue
+
+        session = get_session(connection)
+        with session.lock:
+            children = session.containers.get(container_id, {})
+            for key, child_id in list(children.items()):
+                if child_id == item["containerId"]:
+                    del children[key]
+    return container_names
+
+
+def apply_header(ob: Dict, header: Dict) -> None:
+    """Applies the header of a composed OB to an OB from p2.
+
+    Parameters
+    ----------
+    ob : dict
+        The OB as returned by p2.
+    header : dict
+        The header of the composed OB.
     """
-    ob, version = connection.createOB(container_id, header["user"]["name"])
     ob["instrument"] = header["observation"]["instrument"]
     ob["obsDescription"]["name"] = header["user"]["name"]
     ob["obsDescription"]["userComments"] = header["user"]["userComments"]
@@ -237,7 +464,33 @@ def create_ob(connection: p2api.p2api.ApiConnection,
                 if sub_key not in mapping:
                     continue
                 ob[key][mapping[sub_key]] = sub_value
-    ob, version = connection.saveOB(ob, version)
+
+
+def create_ob(connection: p2api.p2api.ApiConnection,
+              container_id: int, header: Dict,
+              journal: Optional[Journal] = None) -> int:
+    """Creates an OB on p2.
+
+    Parameters
+    ----------
+    connection : p2api.p2api.ApiConnection
+        The P2 python api connection.
+    container_id : int
+        The id that specifies the container on p2.
+    header : Dict
+        The header of the OB.
+    journal : Journal, optional
+        The checkpoint journal. The OB is journaled as incomplete (without
+        its input hash) as soon as it is created.
+
+    Returns
+    -------
+    """
+    ob, version = request(connection, "createOB", container_id, header["user"]["name"])
+    if journal is not None:
+        journal.add_ob(container_id, header["user"]["name"], ob["obId"], None)
+    apply_header(ob, header)
+    ob, version = request(connection, "saveOB", ob, version)
     return ob["obId"]
 
 
@@ -257,16 +510,17 @@ def add_template(connection: p2api.p2api.ApiConnection,
     template_name = "TEMPLATE.NAME"
     if template_kind == "acquisition":
         template_name = f"ACQUISITION.{template_name}"
-    content = ob[template_kind]
+    content = dict(ob[template_kind])
     apply_mapping(content, TEMPLATE_MAPPING)
     print(f"\t\tAdding template '{content[template_name]}'...")
-    template, version = connection.createTemplate(ob_id, content[template_name])
-    template, version = connection.setTemplateParams(ob_id, template, content, version)
+    template, version = request(connection, "createTemplate", ob_id, content[template_name])
+    template, version = request(connection, "setTemplateParams", ob_id, template, content, version)
 
 
 def upload_ob(connection: p2api.p2api.ApiConnection,
-              ob: Dict, container_id: Optional[int] = None) -> None:
-    """
+              ob: Dict, container_id: Optional[int] = None,
+              journal: Optional[Journal] = None) -> Optional[int]:
+    """Uploads an OB to p2.
 
     Parameters
     ----------
@@ -275,16 +529,295 @@ def upload_ob(connection: p2api.p2api.ApiConnection,
     ob : dict
     container_id : int
         The id that specifies the container on p2.
+    journal : Journal, optional
+        The checkpoint journal. The OB is journaled as incomplete as soon
+        as it is created, so it is updated instead of created again when
+        resuming.
+
+    Returns
+    -------
+    ob_id : int, optional
+        The uploaded OB's id. If the upload failed return "None".
     """
     if connection is None or container_id is None:
-        return
+        return None
 
     ob_name = ob['header']['user']['name']
     print(f"\tCreating OB '{ob_name}'...")
     try:
-        ob_id = create_ob(connection, container_id, ob["header"])
+        ob_id = create_ob(connection, container_id, ob["header"], journal)
         add_template(connection, ob_id, ob, "acquisition")
         add_template(connection, ob_id, ob, "observation")
     except p2api.P2Error:
-        print(f"[ERROR]: Failed uploading OB '{ob_name}'! See 'p2obt.log'.")
+        print(f"[ERROR]: Failed uploading OB '{ob_name}'! See '{get_log_file()}'.")
         logging.error(f"[ERROR]: Failed uploading OB '{ob_name}'!", exc_info=True)
+        return None
+    return ob_id
+
+
+def upload_obs(connection: p2api.p2api.ApiConnection,
+               obs: List[Dict], container_id: int,
+               journal: Optional[Journal] = None) -> List[Tuple[str, Optional[int]]]:
+    """Uploads OBs sequentially to a container on p2, which keeps
+    their order within the container.
+
+    Parameters
+    ----------
+    connection : p2api.p2api.ApiConnection
+        The P2 python api connection.
+    obs : list of dict
+    container_id : int
+        The id that specifies the container on p2.
+    journal : Journal, optional
+        The checkpoint journal. The uploaded OBs are journaled and
+        already journaled OBs are skipped or, if their input changed,
+        updated.
+
+    Returns
+    -------
+    results : list of tuple
+        The OBs' names and ids (or "None" if the upload failed).
+    """
+    if journal is None:
+        return [(ob["header"]["user"]["name"], upload_ob(connection, ob, container_id))
+                for ob in obs]
+
+    results = []
+    for ob in obs:
+        ob_name, ob_hash = ob["header"]["user"]["name"], get_ob_hash(ob)
+        ob_id, journaled_hash = journal.get_ob(container_id, ob_name)
+        if ob_id is None:
+            ob_id = upload_ob(connection, ob, container_id, journal)
+        elif journaled_hash != ob_hash:
+            ob_id = update_ob(connection, ob_id, ob)
+        else:
+            print(f"\tSkipping already uploaded OB '{ob_name}'...")
+            results.append((ob_name, ob_id))
+            continue
+
+        if ob_id is not None:
+            journal.add_ob(container_id, ob_name, ob_id, ob_hash)
+        results.append((ob_name, ob_id))
+    return results
+
+
+def delete_remote_ob(connection: p2api.p2api.ApiConnection, ob_id: int) -> None:
+    """Deletes an OB on p2.
+
+    Parameters
+    ----------
+    connection : p2api.p2api.ApiConnection
+        The P2 python api connection.
+    ob_id : int
+        The id that specifies the ob on p2.
+    """
+    _, version = request(connection, "getOB", ob_id)
+    request(connection, "deleteOB", ob_id, version)
+
+
+def sync_templates(connection: p2api.p2api.ApiConnection,
+                   ob_id: int, ob: Dict) -> None:
+    """Updates the templates of an OB on p2, if they differ from
+    the composed OB's templates.
+
+    If the templates' names or their order differ, the templates
+    are replaced, otherwise only their changed parameters are set.
+
+    Parameters
+    ----------
+    connection : p2api.p2api.ApiConnection
+        The P2 python api connection.
+    ob_id : int
+        The id that specifies the ob on p2.
+    ob : dict
+    """
+    template_kinds = ["acquisition", "observation"]
+    template_names = {"acquisition": "ACQUISITION.TEMPLATE.NAME",
+                      "observation": "TEMPLATE.NAME"}
+    contents = {}
+    for template_kind in template_kinds:
+        contents[template_kind] = dict(ob[template_kind])
+        apply_mapping(contents[template_kind], TEMPLATE_MAPPING)
+
+    templates, _ = request(connection, "getTemplates", ob_id)
+    if [template["templateName"] for template in templates]\
+            != [contents[kind][template_names[kind]] for kind in template_kinds]:
+        for template in templates:
+            _, version = request(connection, "getTemplate", ob_id, template["templateId"])
+            request(connection, "deleteTemplate", ob_id, template["templateId"], version)
+        for template_kind in template_kinds:
+            add_template(connection, ob_id, ob, template_kind)
+        return
+
+    for template, template_kind in zip(templates, template_kinds):
+        content = contents[template_kind]
+        parameters = {parameter["name"]: parameter.get("value")
+                      for parameter in template["parameters"]}
+        if all(parameters.get(key) == value for key, value in content.items()
+               if key != template_names[template_kind]):
+            continue
+        print(f"\t\tUpdating template '{template['templateName']}'...")
+        template, version = request(connection, "getTemplate", ob_id, template["templateId"])
+        request(connection, "setTemplateParams", ob_id, template, content, version)
+
+
+def update_ob(connection: p2api.p2api.ApiConnection,
+              ob_id: int, ob: Dict) -> Optional[int]:
+    """Updates an OB on p2, if it differs from the composed OB.
+
+    Parameters
+    ----------
+    connection : p2api.p2api.ApiConnection
+        The P2 python api connection.
+    ob_id : int
+        The id that specifies the ob on p2.
+    ob : dict
+
+    Returns
+    -------
+    ob_id : int, optional
+        The OB's id. If the update failed return "None".
+    """
+    ob_name = ob['header']['user']['name']
+    try:
+        remote_ob, version = request(connection, "getOB", ob_id)
+        updated_ob = deepcopy(remote_ob)
+        apply_header(updated_ob, ob["header"])
+        if updated_ob != remote_ob:
+            print(f"\tUpdating OB '{ob_name}'...")
+            request(connection, "saveOB", updated_ob, version)
+        sync_templates(connection, ob_id, ob)
+    except p2api.P2Error:
+        print(f"[ERROR]: Failed updating OB '{ob_name}'! See '{get_log_file()}'.")
+        logging.error(f"[ERROR]: Failed updating OB '{ob_name}'!", exc_info=True)
+        return None
+    return ob_id
+
+
+def sync_obs(connection: p2api.p2api.ApiConnection,
+             obs: List[Dict], container_id: int,
+             ob_names: Optional[Set[str]] = None,
+             delete: Optional[bool] = True) -> List[Tuple[str, Optional[int]]]:
+    """Synchronizes the OBs of a container on p2 with the composed OBs.
+
+    The OBs already in the container are matched by their names
+    (see :func:`set_ob_name <p2obt.backend.compose.set_ob_name>`)
+    and only updated if they changed. Missing OBs are created and OBs
+    (and duplicates) that are not planned anymore are deleted.
+
+    Parameters
+    ----------
+    connection : p2api.p2api.ApiConnection
+        The P2 python api connection.
+    obs : list of dict
+    container_id : int
+        The id that specifies the container on p2.
+    ob_names : set of str, optional
+        The names of all planned OBs, including the ones that could not
+        be composed, which are kept on p2. By default the composed OBs' names.
+    delete : bool, optional
+        If 'False' no OBs are deleted (e.g., if OBs could not be composed).
+
+    Returns
+    -------
+    results : list of tuple
+        The OBs' names and ids (or "None" if the upload failed).
+    """
+    remote_obs, obsolete_obs = {}, []
+    try:
+        items, _ = request(connection, "getItems", container_id)
+    except p2api.P2Error:
+        logging.error("[ERROR]: Failed getting the container's items!", exc_info=True)
+        return upload_obs(connection, obs, container_id)
+
+    for item in items:
+        if item["itemType"] != "OB":
+            continue
+        if item["name"] in remote_obs:
+            obsolete_obs.append(item)
+        else:
+            remote_obs[item["name"]] = item
+
+    results = []
+    for ob in obs:
+        ob_name = ob["header"]["user"]["name"]
+        item = remote_obs.pop(ob_name, None)
+        if item is None:
+            results.append((ob_name, upload_ob(connection, ob, container_id)))
+        else:
+            results.append((ob_name, update_ob(connection, item["obId"], ob)))
+
+    if not delete:
+        return results
+
+    # NOTE: The planned OBs that could not be composed are kept
+    if ob_names is not None:
+        remote_obs = {name: item for name, item in remote_obs.items()
+                      if name not in ob_names}
+    for item in obsolete_obs + list(remote_obs.values()):
+        print(f"\tDeleting OB '{item['name']}'...")
+        try:
+            delete_remote_ob(connection, item["obId"])
+        except p2api.P2Error:
+            print(f"[ERROR]: Failed deleting OB '{item['name']}'! See '{get_log_file()}'.")
+            logging.error(f"[ERROR]: Failed deleting OB '{item['name']}'!", exc_info=True)
+    return results
+
+
+def retry_failed_obs(connection: p2api.p2api.ApiConnection,
+                     failed_obs: List[Tuple[Dict, int]],
+                     journal: Optional[Journal] = None) -> List[Tuple[str, Optional[int]]]:
+    """Retries the upload of failed OBs.
+
+    The OBs that were partially created during the failed upload
+    are matched by their names and completed instead of created again.
+
+    Parameters
+    ----------
+    connection : p2api.p2api.ApiConnection
+        The P2 python api connection.
+    failed_obs : list of tuple
+        The failed OBs and the ids of their containers.
+    journal : Journal, optional
+        The checkpoint journal to which the uploaded OBs are written.
+
+    Returns
+    -------
+    results : list of tuple
+        The OBs' names and ids (or "None" if the upload failed again)
+        in the order of the failed OBs.
+    """
+    remote_obs, results = {}, []
+    for ob, container_id in failed_obs:
+        ob_name, ob_hash = ob["header"]["user"]["name"], get_ob_hash(ob)
+        if container_id not in remote_obs:
+            try:
+                items, _ = request(connection, "getItems", container_id)
+            except p2api.P2Error:
+                logging.error("[ERROR]: Failed getting the container's items!",
+                              exc_info=True)
+                items = []
+            remote_obs[container_id] = {item["name"]: item["obId"]
+                                        for item in items if item["itemType"] == "OB"}
+
+        ob_id = remote_obs[container_id].get(ob_name)
+        if ob_id is None:
+            ob_id = upload_ob(connection, ob, container_id, journal)
+        else:
+            ob_id = update_ob(connection, ob_id, ob)
+        if ob_id is not None and journal is not None:
+            journal.add_ob(container_id, ob_name, ob_id, ob_hash)
+        results.append((ob_name, ob_id))
+    return results
+
+
+def print_upload_summary(results: List[Tuple[str, Optional[int]]]) -> None:
+    """Prints a summary of the uploaded and failed OBs."""
+    if not results:
+        return
+
+    failed = [ob_name for ob_name, ob_id in results if ob_id is None]
+    print(f"{'':-^50}")
+    print(f"[INFO]: Uploaded {len(results)-len(failed)}/{len(results)} OBs.")
+    for ob_name in failed:
+        print(f"[ERROR]: Failed uploading OB '{ob_name}'!")
@@ -1,7 +1,36 @@
 import re
-from typing import Optional, Tuple, List
+from importlib import resources
+from pathlib import Path
+from typing import Optional, Tuple, List, Union
 
-import astropy.units as u
+try:
+    from importlib.resources.abc import Traversable
+except ImportError:
+    from importlib.abc import Traversable
+
+# NOTE: `astropy` and `numpy` are imported where they are used, as this module
+# is needed by the night plan's parsing, which should import quickly
+
+
+def get_resource(name: str) -> Traversable:
+    """Gets one of p2obt's data files (e.g., "config/templates.toml").
+
+    The resource is not necessarily a file on disk (e.g., if p2obt
+    is installed as a zip), but can always be read via its
+    `open`, `read_text` and `read_bytes` methods.
+    """
+    resource = resources.files("p2obt")
+    for part in name.split("/"):
+        resource = resource / part
+    return resource
+
+
+def get_modification_time(file: Union[Path, Traversable]) -> Optional[float]:
+    """Gets the modification time of a file or "None" if the file is
+    a resource that is not on disk (see :func:`get_resource`)."""
+    if isinstance(file, Path):
+        return file.stat().st_mtime
+    return None
 
 
 def add_space(input_str: str) -> str:
@@ -66,12 +95,14 @@ def contains_element(list_to_search: List, element_to_search: str) -> bool:
     return any(element_to_search in element for element in list_to_search)
 
 
-def convert_proper_motions(*proper_motions: u.mas,
+def convert_proper_motions(*proper_motions: float,
                            rfloat: Optional[bool] = True) -> Tuple:
     """Converts the proper motions from [mas/yr] to [arcsec/yr].
 
     Input is assumed to be in [mas], if given as float.
     """
+    import astropy.units as u
+
     if all(not isinstance(x, u.Quantity) for x in proper_motions):
         proper_motions = map(lambda x: x*u.mas, proper_motions)
     else:
@@ -79,3 +110,34 @@ def convert_proper_motions(*proper_motions: u.mas,
                       " astropy.units.mas.")
     proper_motions = u.Quantity([x.to(u.arcsec) for x in proper_motions])
     return proper_motions.value if rfloat else proper_motions
+
+
+def parse_sexagesimal(values: List[str]) -> Optional["numpy.ndarray"]:
+    """Parses space (or colon) separated sexagesimal strings (e.g., "-05 30 12.3")
+    into decimal values (e.g., hours or degrees).
+
+    This is considerably faster than the parsing of `astropy` for
+    many values.
+
+    Parameters
+    ----------
+    values : list of str
+
+    Returns
+    -------
+    decimal_values : numpy.ndarray, optional
+        The decimal values. If any of the values is not in the
+        sexagesimal form "None".
+    """
+    import numpy as np
+
+    parts = [str(value).replace(":", " ").split() for value in values]
+    if any(not 1 <= len(part) <= 3 for part in parts):
+        return None
+    try:
+        fields = np.array([[abs(float(field)) for field in part] + [0.]*(3-len(part))
+                           for part in parts])
+    except ValueError:
+        return None
+    signs = np.array([-1. if part[0].startswith("-") else 1. for part in parts])
+    return signs*(fields[:, 0] + fields[:, 1]/60. + fields[:, 2]/3600.)
@@ -0,0 +1,88 @@
+import json
+import tarfile
+import zipfile
+
+import pytest
+
+from p2obt.automate import create_obs_from_lists
+from p2obt.backend import OPTIONS
+from p2obt.backend.bundle import Bundle
+from p2obt.backend.compose import format_ob
+
+
+@pytest.fixture(autouse=True)
+def options(monkeypatch):
+    """Uses the catalogs' stand-ins without the cache."""
+    monkeypatch.setattr(OPTIONS.catalogs.mock, "active", True)
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "active", False)
+
+
+def write(output_dir, output_format):
+    """Writes the OBs of the targets in the output format."""
+    return create_obs_from_lists(["HD 1", "HD 2"], ["HD 10", "HD 20"], [], [],
+                                 "st", "vm", "UTs", None, None, None,
+                                 output_dir, output_format=output_format)
+
+
+def get_files(directory):
+    """Gets the contents of the (.obx)-files below a directory."""
+    return {path.relative_to(directory).as_posix(): path.read_text(encoding="utf-8")
+            for path in directory.rglob("*.obx")}
+
+
+@pytest.mark.parametrize("output_format", ["zip", "tar"])
+def test_extracted_bundles_match_obx_files(tmp_path, output_format):
+    write(tmp_path / "obx", "obx")
+    write(tmp_path / "bundle", output_format)
+
+    bundles = list((tmp_path / "bundle").iterdir())
+    assert [bundle.suffix for bundle in bundles] == [f".{output_format}"]
+    for bundle in bundles:
+        if output_format == "zip":
+            with zipfile.ZipFile(bundle) as archive:
+                archive.extractall(tmp_path / "extracted")
+        else:
+            with tarfile.open(bundle) as archive:
+                archive.extractall(tmp_path / "extracted")
+    assert get_files(tmp_path / "extracted") == get_files(tmp_path / "obx")
+    assert len(get_files(tmp_path / "obx")) == 4
+
+
+def test_jsonl_bundle_contains_the_obs(tmp_path):
+    write(tmp_path / "obx", "obx")
+    write(tmp_path / "bundle", "jsonl")
+
+    (bundle,) = (tmp_path / "bundle").iterdir()
+    with open(bundle, "r", encoding="utf-8") as jsonl_file:
+        entries = [json.loads(line) for line in jsonl_file]
+    assert {entry["path"]: format_ob(entry["ob"]) for entry in entries}\
+        == get_files(tmp_path / "obx")
+    assert all(entry["path"].endswith(f"{entry['name']}.obx") for entry in entries)
+
+
+def test_bundles_are_grouped_by_directory(tmp_path):
+    ob = {"header": {"name": "OB"}}
+    with Bundle(tmp_path, "zip") as bundle:
+        bundle.write(ob, "SCI_HD_1", tmp_path / "run 1" / "night 1")
+        bundle.write(ob, "SCI_HD_2", tmp_path / "run 2")
+        bundle.write(ob, "SCI_HD_3", tmp_path)
+
+    assert sorted(path.name for path in tmp_path.iterdir())\
+        == ["run 1.zip", "run 2.zip", f"{tmp_path.name}.zip"]
+    with zipfile.ZipFile(tmp_path / "run 1.zip") as archive:
+        assert archive.namelist() == ["run 1/night 1/SCI_HD_1.obx"]
+
+
+def test_bundles_are_discarded_on_errors(tmp_path):
+    with pytest.raises(RuntimeError):
+        with Bundle(tmp_path, "tar") as bundle:
+            bundle.write({"header": {"name": "OB"}}, "SCI_HD_1", tmp_path / "run 1")
+            raise RuntimeError
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_obx_is_not_a_bundle(tmp_path):
+    with pytest.raises(IOError):
+        Bundle(tmp_path, "obx")
+    with pytest.raises(IOError):
+        Bundle(tmp_path, "rar")
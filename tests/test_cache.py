@@ -0,0 +1,119 @@
+import importlib
+import os
+from pathlib import Path
+
+import pytest
+
+from p2obt.backend import OPTIONS
+from p2obt.backend import cache
+from p2obt.backend.cache import evict_cache, get_statistics, read_cache,\
+        reset_statistics, write_cache
+from p2obt.backend.query import query
+
+query_module = importlib.import_module("p2obt.backend.query")
+
+
+@pytest.fixture(autouse=True)
+def options(tmp_path, monkeypatch):
+    """Caches the catalogs' stand-ins in a temporary directory."""
+    monkeypatch.setattr(OPTIONS.catalogs.mock, "active", True)
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "active", True)
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "mode", "default")
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "path", tmp_path / "cache")
+    monkeypatch.setattr(cache, "EVICTION", cache.SimpleNamespace(
+        size=None, writes=0, scan_writes=None))
+    reset_statistics()
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    """Counts the queries of the catalogs' stand-ins."""
+    queried = []
+
+    def query_mock_catalog(name, catalog):
+        queried.append((name, catalog))
+        return mock_catalog(name, catalog)
+
+    mock_catalog = query_module.query_mock_catalog
+    monkeypatch.setattr(query_module, "query_mock_catalog", query_mock_catalog)
+    return queried
+
+
+def get_cache_size() -> int:
+    """Gets the size of the cache's entries on disk."""
+    return sum(cache_file.stat().st_size for cache_file in
+               Path(OPTIONS.catalogs.cache.path).glob("*.pkl"))
+
+
+def test_cache_entries_expire(monkeypatch):
+    write_cache("key", 1)
+    assert read_cache("key") == (True, 1)
+
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "ttl", -1)
+    assert read_cache("key") == (False, None)
+    assert vars(get_statistics()) == {"hits": 1, "misses": 1,
+                                      "writes": 1, "evictions": 0}
+
+
+def test_offline_mode_only_uses_the_cache(monkeypatch, queries):
+    target = query("HD 142666", catalogs=["simbad", "gaia"])
+    assert len(queries) == 2
+
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "mode", "offline")
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "ttl", -1)
+    assert query("HD 142666", catalogs=["simbad", "gaia"]) == target
+    assert list(query("HD 100546", catalogs=["simbad", "gaia"])) == ["name"]
+    assert len(queries) == 2
+
+
+def test_refresh_mode_queries_and_updates_the_cache(monkeypatch, queries):
+    query("HD 142666", catalogs=["simbad"])
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "mode", "refresh")
+    query("HD 142666", catalogs=["simbad"])
+    assert len(queries) == 2
+    assert get_statistics().writes == 2
+
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "mode", "default")
+    query("HD 142666", catalogs=["simbad"])
+    assert len(queries) == 2
+
+
+def test_unwritable_cache_is_skipped(tmp_path, monkeypatch, queries):
+    target = query("HD 142666", catalogs=["simbad"])
+    reset_statistics()
+
+    (tmp_path / "file").touch()
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "path", tmp_path / "file" / "cache")
+    assert query("HD 142666", catalogs=["simbad"]) == target
+    assert get_statistics().writes == 0
+    assert list(tmp_path.glob("**/*.tmp")) == []
+
+
+def test_eviction_removes_least_recently_used(monkeypatch):
+    for index in range(10):
+        write_cache(f"key{index}", "x"*1000)
+        os.utime(cache.get_cache_file(f"key{index}"), (index, index))
+    read_cache("key0")
+
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "max_size", 5000)
+    evict_cache()
+    assert read_cache("key0")[0]
+    assert not read_cache("key1")[0]
+    assert read_cache("key9")[0]
+    assert get_cache_size() <= 5000*cache.EVICTION_TARGET
+    assert cache.EVICTION.size == get_cache_size()
+
+
+def test_writes_during_the_eviction_are_counted_once(monkeypatch):
+    write_cache("key", "x"*1000)
+    glob = Path.glob
+
+    def write_during_scan(path, pattern):
+        write_cache("before", "x"*1000)
+        yield from glob(path, pattern)
+        write_cache("after", "x"*1000)
+
+    monkeypatch.setattr(Path, "glob", write_during_scan)
+    evict_cache()
+    monkeypatch.setattr(Path, "glob", glob)
+    assert cache.EVICTION.size == get_cache_size()
@@ -0,0 +1,42 @@
+from collections import Counter
+
+import p2api
+import pytest
+
+from p2obt.backend import OPTIONS
+from p2obt.backend.connection import ResilientConnection
+from p2obt.backend.mock import MockApiConnection
+from p2obt.backend.pipeline import ObBlock, ObSpecification, run_pipeline
+
+
+@pytest.fixture(autouse=True)
+def options(monkeypatch):
+    """Uses the catalogs' stand-ins and retries without delay."""
+    monkeypatch.setattr(OPTIONS.catalogs.mock, "active", True)
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "active", False)
+    monkeypatch.setattr(OPTIONS.upload.retry, "backoff", 0.)
+
+
+def test_failed_creations_are_not_repeated():
+    mock = MockApiConnection(failure_rate=0.2, seed=3, failure_mode="after")
+    connection = ResilientConnection(mock, seed=3)
+    run_id = mock.runs[0]["containerId"]
+    blocks = [ObBlock([ObSpecification(f"HD {index}", "sci"),
+                       ObSpecification(f"HD {index+100}", "cal", f"HD {index}", "LN")],
+                      "UTs", "standalone", "low", run_id,
+                      (("standalone", "vm"), (f"HD {index}", "vm")))
+              for index in range(10)]
+    results = run_pipeline(blocks, connection)
+
+    assert all(ob_id is not None for _, ob_id in results)
+    assert len(mock.obs) == 20
+    assert len(mock.containers) == 12
+    assert Counter(map(len, mock.templates.values())) == {2: 20}
+
+
+def test_unknown_posts_are_not_retried():
+    mock = MockApiConnection(failure_rate=1.)
+    mock.createCB = lambda *args: mock.request("POST", "/containers/1/items")
+    with pytest.raises(p2api.P2Error):
+        ResilientConnection(mock).createCB(1, "CB")
+    assert mock.request_count == 1
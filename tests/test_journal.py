@@ -0,0 +1,82 @@
+from collections import Counter
+
+import p2api
+import pytest
+
+from p2obt.automate import create_obs_from_lists
+from p2obt.backend import OPTIONS
+from p2obt.backend.journal import Journal
+from p2obt.backend.upload import login
+
+TARGETS, CALIBRATORS = [f"HD {index}" for index in range(1, 6)],\
+        [f"HD {index}" for index in range(10, 60, 10)]
+
+
+@pytest.fixture
+def connection(tmp_path, monkeypatch):
+    """A connection to the stand-in for p2 without retries."""
+    monkeypatch.setattr(OPTIONS.catalogs.mock, "active", True)
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "active", False)
+    monkeypatch.setattr(OPTIONS.upload, "journal", tmp_path / "journal.jsonl")
+    monkeypatch.setattr(OPTIONS.upload.mock, "failure_rate", 0.)
+    monkeypatch.setattr(OPTIONS.upload.retry, "attempts", 1)
+    monkeypatch.setattr(OPTIONS.upload.retry, "rounds", 0)
+    return login(server="mock")
+
+
+def fail(method, failing):
+    """Makes a call of the stand-in fail if its arguments are failing."""
+    def wrapper(*args):
+        if failing(*args):
+            raise p2api.P2Error(503, "POST", "", "injected failure")
+        return method(*args)
+    return wrapper
+
+
+def upload(connection, resume=False):
+    """Uploads the OBs of the targets to the stand-in's run."""
+    run_id = connection.getRuns()[0][0]["containerId"]
+    return create_obs_from_lists(TARGETS, CALIBRATORS, [], [], "st", "vm", "UTs",
+                                 None, connection, run_id, None, resume=resume)
+
+
+def test_journal_is_read_when_resuming(tmp_path):
+    journal = Journal(tmp_path / "journal.jsonl")
+    journal.add_container(1, "HD 1", "vm", 2)
+    journal.add_ob(2, "SCI_HD_1", 3, "hash")
+    with open(journal.file, "a", encoding="utf-8") as journal_file:
+        journal_file.write('{"type": "ob", "cont')
+
+    resumed = Journal(journal.file, resume=True)
+    assert resumed.get_container(1, "HD 1", "vm") == 2
+    assert resumed.get_ob(2, "SCI_HD_1") == (3, "hash")
+    assert Journal(journal.file).get_ob(2, "SCI_HD_1") == (None, None)
+    assert Journal(journal.file, resume=True, clear=True).get_ob(2, "SCI_HD_1") == (None, None)
+    assert journal.file.read_text(encoding="utf-8") == ""
+
+
+def test_inaccessible_journal_is_deactivated(tmp_path):
+    (tmp_path / "file").touch()
+    with pytest.warns(UserWarning, match="journal"):
+        journal = Journal(tmp_path / "file" / "journal.jsonl", resume=True)
+    journal.add_container(1, "HD 1", "vm", 2)
+    assert not journal.active
+    assert journal.get_container(1, "HD 1", "vm") == 2
+
+
+def test_interrupted_upload_is_resumed(connection):
+    mock = connection.connection
+    mock.createFolder, mock.createTemplate = fail(
+            mock.createFolder, lambda _, name: name == "HD 4"), fail(
+            mock.createTemplate, lambda ob_id, _: mock.obs[ob_id]["name"] == "SCI_HD_2")
+    with pytest.raises(p2api.P2Error):
+        upload(connection)
+    uploaded = {ob["name"]: ob_id for ob_id, ob in mock.obs.items()}
+    assert "SCI_HD_1" in uploaded and "SCI_HD_4" not in uploaded
+
+    del mock.createFolder, mock.createTemplate
+    results = upload(connection, resume=True)
+    assert all(ob_id is not None for _, ob_id in results)
+    assert all(dict(results)[name] == ob_id for name, ob_id in uploaded.items())
+    assert Counter(ob["name"] for ob in mock.obs.values()) == {name: 1 for name, _ in results}
+    assert Counter(map(len, mock.templates.values())) == {2: 2*len(TARGETS)}
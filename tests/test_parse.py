@@ -0,0 +1,142 @@
+import pytest
+
+from p2obt.backend.parse import RunSettings, classify_run, classify_runs,\
+        get_night_plan_events, parse_file_section, parse_groups,\
+        parse_night_plan, stream_night_plan
+
+GROUPS = """
+11:40 cal_LN_HD138538   15 36 43.222  -66 19 01.33    65.7     10.6          4.11     K1.5III    2.47    1.70     30
+12:10 HD 104237         12 00 05.081  -78 11 34.56     8.6     13.4   4.59                               1.69     30  MR
+
+# If we get a full night, start here:
+13:40 cal_L_HD96918     11 08 35.390  -58 58 30.13    67.2     11.0          3.92       G0Ia0    2.39    1.41     30
+14:10 HD 98922          11 22 31.674  -53 22 11.46    16.6     31.4   4.28                               1.40     30  MR
+14:40 cal_N_HD102461    11 47 19.141  -57 41 47.39    80.4     13.2          5.44       K5III    2.97    1.46     30
+
+"""
+
+HEADER = """LST   source            coordinates                      L        N      K      V
+      Jun 6, formal night duration:  LST 11:40 - 22:21  =  10:41 h = 641 min
+"""
+
+# NOTE: The night plans cover runs and nights with and without headers
+# as well as groups before the first header and nights without groups
+NIGHT_PLANS = {
+    "runs and nights": f"""run 3, 109.2313.003, ATs large array, MATISSE, LR
+{HEADER}
+night 1, June 5:
+{GROUPS}
+night 2, June 6:
+{GROUPS.replace("HD 98922", "HD 100546")}
+run 4, 110.2474.004, UTs, GRA4MAT, MR
+night 1 - 27 December
+{GROUPS}
+""",
+    "no runs": f"""{HEADER}
+night 1, June 5:
+{GROUPS}
+night 2, June 6:
+
+calibrator_find,zoom=3,duration=30,'HD 100546',LST='12:40',/print
+""",
+    "no nights": f"""run 3, 109.2313.003, ATs large array, MATISSE, LR
+{GROUPS}
+run 4, 110.2474.004, UTs, GRA4MAT, MR
+{GROUPS}
+""",
+    "no headers": GROUPS,
+    "groups before headers": f"""{GROUPS.replace("HD 98922", "HD 100546")}
+run 3, 109.2313.003, ATs large array, MATISSE, LR
+{GROUPS.replace("HD 98922", "HD 163296")}
+night 1, June 5:
+{GROUPS}
+""",
+}
+
+
+def parse_sections(lines, run_identifier="run", night_identifier="night"):
+    """Parses a night plan by splitting it into its sections first
+    (as before it was streamed)."""
+    runs = {}
+    for run_id, run in parse_file_section(lines, run_identifier).items():
+        nights = {}
+        for night_id, night in parse_file_section(run, night_identifier).items():
+            night_content = parse_groups(night)
+            if night_content:
+                nights[night_id] = night_content
+        runs[run_id] = nights
+    return runs
+
+
+@pytest.mark.parametrize("plan", NIGHT_PLANS)
+def test_parse_night_plan_matches_sections(tmp_path, plan):
+    night_plan = tmp_path / "night_plan.txt"
+    night_plan.write_text(NIGHT_PLANS[plan], encoding="utf-8")
+    lines = NIGHT_PLANS[plan].splitlines(keepends=True)
+
+    assert parse_night_plan(night_plan) == parse_sections(lines)
+    assert parse_night_plan(night_plan, "run 4", "night 1")\
+        == parse_sections(lines, "run 4", "night 1")
+
+
+@pytest.mark.parametrize("plan", NIGHT_PLANS)
+def test_stream_night_plan_matches_parse_night_plan(tmp_path, plan):
+    night_plan = tmp_path / "night_plan.txt"
+    night_plan.write_text(NIGHT_PLANS[plan], encoding="utf-8")
+    events = list(stream_night_plan(NIGHT_PLANS[plan].splitlines(keepends=True)))
+
+    def get_groups(events):
+        return [event for event in events if event.science_target is not None]
+    assert get_groups(events) == get_groups(get_night_plan_events(parse_night_plan(night_plan)))
+    assert [event.run for event in events if event.night is None]\
+        == list(parse_night_plan(night_plan))
+
+
+def test_stream_night_plan_yields_groups_as_read():
+    def lines():
+        yield "run 1, 110.2474.004, UTs, MATISSE, LR\n"
+        yield "night 1\n"
+        yield from GROUPS.splitlines(keepends=True)
+        raise AssertionError("The night plan was read past the groups!")
+
+    events = stream_night_plan(lines())
+    assert [next(events) for _ in range(4)][2:] == [
+            ("run 1, 110.2474.004, UTs, MATISSE, LR", "night 1", "HD 104237",
+             [{"name": "HD138538", "order": "b", "tag": "LN"}]),
+            ("run 1, 110.2474.004, UTs, MATISSE, LR", "night 1", "HD 98922",
+             [{"name": "HD96918", "order": "b", "tag": "L"},
+              {"name": "HD102461", "order": "a", "tag": "N"}])]
+
+
+@pytest.mark.parametrize("run_name, run_settings", [
+    ("run 2, 111.253T.002 - UTs, both, med", ("UTs", "both", "MED", "111.253T.002")),
+    ("run 3, 109.2313.003 = 0109.C-0413(C), ATs large array MR",
+     ("large", None, "MED", "109.2313.003")),
+    ("Run 1: MATISSE LR 110.2474.004 small", ("small", "st", "LOW", "110.2474.004")),
+    ("RUN 4, gra4mat, extended, HR", ("extended", "gr", "HIGH", None)),
+    ("run 5, 112.25AB.001, UTs, GRA4MAT, high", ("UTs", "gr", "HIGH", "112.25AB.001")),
+    ("run 6, 105.20B1.001", (None, None, None, "105.20B1.001")),
+    ("full_run", (None, None, None, None))])
+def test_classify_run(run_name, run_settings):
+    assert classify_run(run_name) == RunSettings(*run_settings)
+
+
+def test_classify_runs_prompts_only_for_undetected_settings(monkeypatch):
+    prompts = []
+
+    def input(notice):
+        prompts.append(notice)
+        return "1"
+
+    monkeypatch.setattr("builtins.input", input)
+    run_settings = classify_runs(["run 2, 111.253T.002 - UTs, both, med",
+                                  "run 4, gra4mat, extended, HR",
+                                  "run 2, 111.253T.002 - UTs, both, med"], prog_id=False)
+    assert run_settings == {
+            "run 2, 111.253T.002 - UTs, both, med": ("UTs", "both", "MED", "111.253T.002"),
+            "run 4, gra4mat, extended, HR": ("extended", "gr", "HIGH", None)}
+    assert prompts == []
+
+    run_settings = classify_runs(["run 4, gra4mat, extended, HR"])
+    assert len(prompts) == 1
+    assert run_settings["run 4, gra4mat, extended, HR"].prog_id == "1"
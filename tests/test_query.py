@@ -0,0 +1,87 @@
+import importlib
+
+import astropy.units as u
+import numpy as np
+import pytest
+from astropy.table import MaskedColumn, Table
+
+from p2obt.backend import OPTIONS
+from p2obt.backend.mock import make_mock_catalog
+from p2obt.backend.query import get_best_matches, get_coordinates, query, query_many
+
+query_module = importlib.import_module("p2obt.backend.query")
+
+NAMES = ["HD 142666", "HD 100546", "HD 142666", "HD 163296"]
+
+
+@pytest.fixture(autouse=True)
+def options(monkeypatch):
+    """Uses the catalogs' stand-ins without the cache."""
+    monkeypatch.setattr(OPTIONS.catalogs.mock, "active", True)
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "active", False)
+    monkeypatch.setattr(OPTIONS.catalogs, "match_nearest", False)
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    """Replaces Gaia's stand-in with three entries per target
+    and counts the stand-ins' queries."""
+    queried = []
+
+    def query_mock_catalog(name, catalog):
+        queried.append((name, catalog))
+        if catalog == "gaia":
+            return make_gaia_table(name)
+        return make_mock_catalog(name, catalog)
+
+    monkeypatch.setattr(query_module, "query_mock_catalog", query_mock_catalog)
+    return queried
+
+
+def make_gaia_table(name: str) -> Table:
+    """Makes a table with an entry at the target's Simbad position,
+    one 3 arcsec and one 10 arcsec away from it."""
+    position = get_coordinates({name: make_mock_catalog(name, "simbad")})[name]
+    offsets = [0, 3, 10]*u.arcsec
+    return Table({"_RAJ2000": [position.ra.deg]*3,
+                  "_DEJ2000": (position.dec + offsets).deg,
+                  "Gmag": MaskedColumn([9., 7., 1.], mask=[False, False, True]),
+                  "pmRA": [1., 5., 3.],
+                  "pmDE": MaskedColumn([0., 0., 0.], mask=[True, True, True])})
+
+
+def test_query_takes_the_lowest_magnitudes_and_highest_values(queries):
+    target = query("HD 142666", catalogs=["simbad", "gaia"])
+    assert target["Gmag"] == 7.
+    assert target["pmRA"] == 5.
+    assert target["pmDE"] is np.ma.masked
+    assert target["SP_TYPE"] == make_mock_catalog("HD 142666", "simbad")["SP_TYPE"][0]
+
+
+def test_query_matches_the_nearest_entry_if_set(monkeypatch, queries):
+    monkeypatch.setattr(OPTIONS.catalogs, "match_nearest", True)
+    target = query("HD 142666", catalogs=["simbad", "gaia"])
+    assert target["Gmag"] == 9.
+    assert target["pmRA"] == 1.
+
+
+@pytest.mark.parametrize("match_nearest", [False, True])
+def test_query_many_matches_query(monkeypatch, queries, match_nearest):
+    monkeypatch.setattr(OPTIONS.catalogs, "match_nearest", match_nearest)
+    catalogs = ["simbad", "gaia", "two_mass", "wise"]
+    targets = query_many(NAMES, catalogs=catalogs)
+    assert len(queries) == 3*len(catalogs)
+
+    assert list(targets) == list(dict.fromkeys(NAMES))
+    for name in NAMES:
+        assert targets[name] == query(name, catalogs=catalogs)
+
+
+def test_best_matches_of_non_numeric_columns():
+    tables = {"HD 1": Table({"SP_TYPE": ["A0V", "K0III"], "RA": ["1", "2"]}),
+              "HD 2": Table({"SP_TYPE": MaskedColumn(["G2V"], mask=[True]), "RA": ["3"]}),
+              "HD 3": None}
+    best_matches = get_best_matches("simbad", tables)
+    assert best_matches["HD 1"] == {"SP_TYPE": "K0III", "RA": "2"}
+    assert best_matches["HD 2"]["SP_TYPE"] is np.ma.masked
+    assert best_matches["HD 3"] == {}
@@ -0,0 +1,91 @@
+import pytest
+
+from p2obt.automate import create_obs_from_lists
+from p2obt.backend import OPTIONS
+from p2obt.backend.pipeline import ObBlock, ObSpecification, run_pipeline
+from p2obt.backend.query import query_many
+from p2obt.backend.upload import login
+
+
+@pytest.fixture
+def connection(tmp_path, monkeypatch):
+    """A connection to the stand-in for p2 with the catalogs' stand-ins."""
+    monkeypatch.setattr(OPTIONS.catalogs.mock, "active", True)
+    monkeypatch.setattr(OPTIONS.catalogs.cache, "active", False)
+    monkeypatch.setattr(OPTIONS.upload, "journal", tmp_path / "journal.jsonl")
+    monkeypatch.setattr(OPTIONS.upload.mock, "failure_rate", 0.)
+    return login(server="mock")
+
+
+def upload(connection, targets, calibrators, sync=False):
+    """Uploads the OBs of the targets to the stand-in's run."""
+    run_id = connection.getRuns()[0][0]["containerId"]
+    return create_obs_from_lists(targets, calibrators, [], [], "st", "vm", "UTs",
+                                 None, connection, run_id, None, sync=sync)
+
+
+def get_tree(connection, container_id=None):
+    """Gets the names of the containers and OBs below a container."""
+    if container_id is None:
+        container_id = connection.getRuns()[0][0]["containerId"]
+    items, _ = connection.getItems(container_id)
+    return {item["name"]: None if item["itemType"] == "OB"
+            else get_tree(connection, item["containerId"]) for item in items}
+
+
+def test_sync_deletes_containers_of_renamed_targets(connection):
+    upload(connection, ["HD 1", "HD 2"], ["HD 10", "HD 20"])
+    results = upload(connection, ["HD 1", "HD 3"], ["HD 10", "HD 30"], sync=True)
+
+    assert all(ob_id is not None for _, ob_id in results)
+    assert get_tree(connection) == {"standalone": {
+        "HD 1": {"SCI_HD_1": None, "CAL_HD_10_HD_1_LN": None},
+        "HD 3": {"SCI_HD_3": None, "CAL_HD_30_HD_3_LN": None}}}
+    assert len(connection.connection.obs) == 4
+
+
+def test_sync_deletes_containers_of_removed_targets(connection):
+    upload(connection, ["HD 1", "HD 2"], ["HD 10", "HD 20"])
+    upload(connection, ["HD 1"], ["HD 10"], sync=True)
+
+    assert get_tree(connection) == {"standalone": {
+        "HD 1": {"SCI_HD_1": None, "CAL_HD_10_HD_1_LN": None}}}
+    assert len(connection.connection.obs) == 2
+    assert len(connection.connection.containers) == 3
+
+
+def sync_blocks(connection, blocks, missing_ra):
+    """Synchronizes the blocks with the coordinates of some targets missing."""
+    names = list(dict.fromkeys(ob.name for block in blocks for ob in block.obs))
+    targets = query_many(names)
+    for name in missing_ra:
+        del targets[name]["RA"]
+    return run_pipeline(blocks, connection, targets, sync=True)
+
+
+def get_blocks(connection, targets):
+    """Gets the blocks of the science targets and their calibrators."""
+    run_id = connection.getRuns()[0][0]["containerId"]
+    return [ObBlock([ObSpecification(target, "sci"),
+                     ObSpecification(calibrator, "cal", target, "LN")],
+                    "UTs", "standalone", "low", run_id,
+                    (("standalone", "vm"), (target, "vm")))
+            for target, calibrator in targets]
+
+
+def test_sync_keeps_obs_that_failed_composing(connection):
+    upload(connection, ["HD 1"], ["HD 10"])
+    sync_blocks(connection, get_blocks(connection, [("HD 1", "HD 10")]), ["HD 10"])
+
+    assert get_tree(connection) == {"standalone": {
+        "HD 1": {"SCI_HD_1": None, "CAL_HD_10_HD_1_LN": None}}}
+
+
+def test_sync_keeps_containers_if_a_block_failed_composing(connection):
+    upload(connection, ["HD 1", "HD 2"], ["HD 10", "HD 20"])
+    sync_blocks(connection, get_blocks(connection, [("HD 1", "HD 10")]),
+                ["HD 1", "HD 10"])
+
+    assert get_tree(connection) == {"standalone": {
+        "HD 1": {"SCI_HD_1": None, "CAL_HD_10_HD_1_LN": None},
+        "HD 2": {"SCI_HD_2": None, "CAL_HD_20_HD_2_LN": None}}}